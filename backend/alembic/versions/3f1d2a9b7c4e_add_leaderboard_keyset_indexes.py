@@ -0,0 +1,30 @@
+"""Add leaderboard keyset indexes
+
+Revision ID: 3f1d2a9b7c4e
+Revises: 07982f3c20bc
+Create Date: 2026-10-19 09:12:44.301522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1d2a9b7c4e'
+down_revision: Union[str, Sequence[str], None] = '07982f3c20bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_scores_score_id', 'scores', [sa.text('score DESC'), 'id'], unique=False)
+    op.create_index('ix_scores_mode_score_id', 'scores', ['mode', sa.text('score DESC'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scores_mode_score_id', table_name='scores')
+    op.drop_index('ix_scores_score_id', table_name='scores')
@@ -0,0 +1,34 @@
+"""Add score sketches
+
+Revision ID: 5d9c2e7a4b61
+Revises: 8b6e4f0d2a17
+Create Date: 2026-10-19 14:36:52.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9c2e7a4b61'
+down_revision: Union[str, Sequence[str], None] = '8b6e4f0d2a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('score_sketches',
+    sa.Column('mode', sa.String(), nullable=False),
+    sa.Column('buckets', sa.Text(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('mode')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('score_sketches')
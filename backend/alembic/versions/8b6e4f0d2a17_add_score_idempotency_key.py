@@ -0,0 +1,31 @@
+"""Add score idempotency key
+
+Revision ID: 8b6e4f0d2a17
+Revises: 3f1d2a9b7c4e
+Create Date: 2026-10-19 11:02:17.845310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b6e4f0d2a17'
+down_revision: Union[str, Sequence[str], None] = '3f1d2a9b7c4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scores', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_index('uq_scores_user_id_idempotency_key', 'scores', ['user_id', 'idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_scores_user_id_idempotency_key', table_name='scores')
+    with op.batch_alter_table('scores') as batch_op:
+        batch_op.drop_column('idempotency_key')
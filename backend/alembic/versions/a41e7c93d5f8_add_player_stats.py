@@ -0,0 +1,94 @@
+"""Add player stats
+
+Revision ID: a41e7c93d5f8
+Revises: 5d9c2e7a4b61
+Create Date: 2026-10-19 16:08:41.527730
+
+"""
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41e7c93d5f8'
+down_revision: Union[str, Sequence[str], None] = '5d9c2e7a4b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('games_played', sa.Integer(), nullable=False),
+    sa.Column('total_score', sa.BigInteger(), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=False),
+    sa.Column('last_played_on', sa.Date(), nullable=False),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_mode_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('mode', sa.String(), nullable=False),
+    sa.Column('games_played', sa.Integer(), nullable=False),
+    sa.Column('total_score', sa.BigInteger(), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'mode')
+    )
+    # Player history index; it also serves every lookup the user_id index did
+    op.create_index(
+        'ix_scores_user_id_date_id', 'scores',
+        ['user_id', sa.text('date DESC'), sa.text('id DESC')],
+        unique=False, postgresql_include=['score', 'mode']
+    )
+    op.drop_index(op.f('ix_scores_user_id'), table_name='scores')
+
+    # Backfill from existing scores
+    op.execute(
+        "INSERT INTO user_mode_stats (user_id, mode, games_played, total_score, best_score) "
+        "SELECT user_id, mode, count(*), sum(score), max(score) FROM scores GROUP BY user_id, mode"
+    )
+    scores = sa.table('scores', sa.column('user_id'), sa.column('score'), sa.column('date', sa.DateTime()))
+    user_stats = sa.table(
+        'user_stats', sa.column('user_id'), sa.column('games_played'), sa.column('total_score'),
+        sa.column('best_score'), sa.column('last_played_on'), sa.column('current_streak'), sa.column('longest_streak')
+    )
+    conn = op.get_bind()
+    result = conn.execution_options(yield_per=10_000).execute(
+        sa.select(scores.c.user_id, scores.c.score, scores.c.date).order_by(scores.c.user_id, scores.c.date)
+    )
+    rows = []
+    current = None
+    for user_id, score, played_at in result:
+        day = played_at.date()
+        if current is None or current['user_id'] != user_id:
+            current = {
+                'user_id': user_id, 'games_played': 0, 'total_score': 0, 'best_score': score,
+                'last_played_on': day, 'current_streak': 1, 'longest_streak': 1
+            }
+            rows.append(current)
+        elif day != current['last_played_on']:
+            consecutive = day - current['last_played_on'] == timedelta(days=1)
+            current['current_streak'] = current['current_streak'] + 1 if consecutive else 1
+            current['longest_streak'] = max(current['longest_streak'], current['current_streak'])
+            current['last_played_on'] = day
+        current['games_played'] += 1
+        current['total_score'] += score
+        current['best_score'] = max(current['best_score'], score)
+        if len(rows) > 10_000:
+            conn.execute(user_stats.insert(), rows[:-1])
+            del rows[:-1]
+    if rows:
+        conn.execute(user_stats.insert(), rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_scores_user_id'), 'scores', ['user_id'], unique=False)
+    op.drop_index('ix_scores_user_id_date_id', table_name='scores')
+    op.drop_table('user_mode_stats')
+    op.drop_table('user_stats')
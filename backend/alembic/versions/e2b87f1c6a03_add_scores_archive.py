@@ -0,0 +1,43 @@
+"""Add scores archive
+
+Revision ID: e2b87f1c6a03
+Revises: a41e7c93d5f8
+Create Date: 2026-10-19 17:21:05.664913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b87f1c6a03'
+down_revision: Union[str, Sequence[str], None] = 'a41e7c93d5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scores_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('mode', sa.String(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('idempotency_key', sa.String(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_scores_archive_user_id_date_id', 'scores_archive',
+        ['user_id', sa.text('date DESC'), sa.text('id DESC')], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scores_archive_user_id_date_id', table_name='scores_archive')
+    op.drop_table('scores_archive')
@@ -0,0 +1,67 @@
+"""Never reuse score ids on SQLite
+
+Revision ID: f4c8a2d61e97
+Revises: e2b87f1c6a03
+Create Date: 2026-10-19 21:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8a2d61e97'
+down_revision: Union[str, Sequence[str], None] = 'e2b87f1c6a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_scores_score_id', [sa.text('score DESC'), 'id'], False),
+    ('ix_scores_mode_score_id', ['mode', sa.text('score DESC'), 'id'], False),
+    ('uq_scores_user_id_idempotency_key', ['user_id', 'idempotency_key'], True),
+    ('ix_scores_user_id_date_id', ['user_id', sa.text('date DESC'), sa.text('id DESC')], False),
+)
+COLUMNS = 'id, user_id, username, score, mode, date, idempotency_key'
+
+
+def _rebuild_scores(autoincrement: bool) -> None:
+    op.create_table('scores_rebuilt',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('mode', sa.String(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('idempotency_key', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=autoincrement
+    )
+    op.execute(f'INSERT INTO scores_rebuilt ({COLUMNS}) SELECT {COLUMNS} FROM scores')
+    op.drop_table('scores')
+    op.rename_table('scores_rebuilt', 'scores')
+    for name, columns, unique in INDEXES:
+        op.create_index(name, 'scores', columns, unique=unique)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite reuses the highest rowid once its row is deleted, so archiving the
+    # newest score let the next one take its id. Postgres ids come from a sequence.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_scores(autoincrement=True)
+    # Continue after every id handed out so far, archived ones included
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'scores'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'scores', max("
+        "coalesce((SELECT max(id) FROM scores), 0), coalesce((SELECT max(id) FROM scores_archive), 0))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_scores(autoincrement=False)
@@ -1,9 +1,21 @@
 """Shared API dependencies."""
 
+import hmac
 from typing import Optional
+from fastapi import Header
+from app.core.config import settings
 from app.models.domain import User
 from app.services import database as db
 
 def get_current_user() -> Optional[User]:
     """Get the current authenticated user."""
     return db.current_user
+
+def is_admin(x_admin_token: Optional[str] = Header(None)) -> bool:
+    """Check the X-Admin-Token header against the configured admin token.
+
+    Always False when no ADMIN_TOKEN is configured.
+    """
+    if not settings.ADMIN_TOKEN or not x_admin_token:
+        return False
+    return hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN)
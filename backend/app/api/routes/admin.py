@@ -0,0 +1,107 @@
+"""Admin routes."""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.dependencies import is_admin
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.profiling import profiler
+from app.models.domain import GameMode
+from app.models.schemas import ApiResponse
+from app.services import database as db
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/profile")
+async def get_profile(admin: bool = Depends(is_admin)) -> ApiResponse:
+    """Get recent sampled request breakdowns."""
+    if not admin:
+        return ApiResponse(
+            success=False,
+            error="Not authorized",
+            data=None
+        )
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data={
+            "sampleRate": settings.PROFILE_SAMPLE_RATE,
+            "samples": profiler.samples,
+            "recent": list(profiler.recent)
+        }
+    )
+
+@router.post("/profile/dump")
+async def dump_profile(admin: bool = Depends(is_admin)) -> ApiResponse:
+    """Write aggregated collapsed stacks to PROFILE_DIR and reset them."""
+    if not admin:
+        return ApiResponse(
+            success=False,
+            error="Not authorized",
+            data=None
+        )
+
+    samples = profiler.samples
+    path = profiler.dump(settings.PROFILE_DIR)
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data={"path": path, "samples": samples}
+    )
+
+async def _ndjson_chunks(batches):
+    columns = db.EXPORT_COLUMNS
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=datetime.isoformat, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+async def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(db.EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+@router.get("/scores/export")
+async def export_scores(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    mode: Optional[GameMode] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin: bool = Depends(is_admin),
+    db_session: AsyncSession = Depends(get_db)
+):
+    """Stream all scores as NDJSON or CSV, optionally filtered by mode and date range."""
+    if not admin:
+        return ApiResponse(
+            success=False,
+            error="Not authorized",
+            data=None
+        )
+
+    batches = db.stream_scores(db_session, mode, since, until)
+    if fmt == "csv":
+        return StreamingResponse(
+            _csv_chunks(batches),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="scores.csv"'}
+        )
+    return StreamingResponse(
+        _ndjson_chunks(batches),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="scores.ndjson"'}
+    )
@@ -0,0 +1,96 @@
+"""Arena routes."""
+
+from fastapi import APIRouter, Depends, Cookie, Query
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import ApiResponse, ArenaTurn
+from app.core.profiling import ProfiledRoute
+from app.services import arena, database as db
+from app.core.config import settings
+from app.core.database import get_db
+
+router = APIRouter(prefix="/arena", tags=["arena"], route_class=ProfiledRoute)
+
+def _disabled() -> ApiResponse:
+    # Without the tick loop nothing moves; it is off with several workers, which would each hold a board
+    return ApiResponse(
+        success=False,
+        error="The arena is disabled",
+        data=None
+    )
+
+@router.post("/join")
+async def join_arena(
+    db_session: AsyncSession = Depends(get_db),
+    snake_session: Optional[str] = Cookie(None)
+) -> ApiResponse:
+    """Put the current user's snake on the shared board (or return it if already playing)."""
+    if settings.ARENA_TICK_SECONDS <= 0:
+        return _disabled()
+    user = await db.get_session_user(db_session, snake_session) if snake_session else None
+    if not user:
+        return ApiResponse(
+            success=False,
+            error="Must be logged in to join the arena",
+            data=None
+        )
+
+    snake = arena.join(user)
+    if snake is None:
+        return ApiResponse(
+            success=False,
+            error="Arena is full",
+            data=None
+        )
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=arena.get_arena().snake_state(snake).model_dump()
+    )
+
+@router.post("/turn")
+async def turn(
+    move: ArenaTurn,
+    db_session: AsyncSession = Depends(get_db),
+    snake_session: Optional[str] = Cookie(None)
+) -> ApiResponse:
+    """Steer the current user's snake; takes effect on the next tick."""
+    if settings.ARENA_TICK_SECONDS <= 0:
+        return _disabled()
+    user = await db.get_session_user(db_session, snake_session) if snake_session else None
+    if not user or not arena.get_arena().turn(user.id, move.direction):
+        return ApiResponse(
+            success=False,
+            error="Not playing in the arena",
+            data=None
+        )
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=None
+    )
+
+@router.get("/state")
+async def get_state(
+    x: Optional[int] = Query(None, ge=0),
+    y: Optional[int] = Query(None, ge=0),
+    radius: Optional[int] = Query(None, ge=1, le=256)
+) -> ApiResponse:
+    """Get the board: every snake and food item, or those around (x, y) when a radius is given."""
+    if settings.ARENA_TICK_SECONDS <= 0:
+        return _disabled()
+    board = arena.get_arena()
+    if radius is not None and (x is None or y is None):
+        return ApiResponse(
+            success=False,
+            error="A viewport needs x, y and radius",
+            data=None
+        )
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=board.state(x, y, radius).model_dump()
+    )
@@ -1,14 +1,15 @@
 """Authentication routes."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends, Response, Cookie
+from fastapi import APIRouter, Depends, Response, Cookie, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.schemas import AuthCredentials, ApiResponse
-from app.utils.security import verify_password
+from app.utils.security import verify_password_async
+from app.core.profiling import ProfiledRoute
 from app.services import database as db
 from app.core.database import get_db
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=ProfiledRoute)
 
 @router.post("/login")
 async def login(
@@ -28,7 +29,7 @@ async def login(
     
     # Validate password (in production, use proper password hashing)
     # Verify password using hashed value
-    if not verify_password(credentials.password, user.password):
+    if not await verify_password_async(credentials.password, user.password):
         return ApiResponse(
             success=False,
             error="Invalid email or password",
@@ -36,7 +37,7 @@ async def login(
         )
     
     # Create session
-    token = await db.create_session(user.id)
+    token = await db.create_session(user.id, user.username)
     
     # Set cookie
     response.set_cookie(
@@ -60,30 +61,21 @@ async def signup(
     db_session: AsyncSession = Depends(get_db)
 ) -> ApiResponse:
     """Register a new user."""
-    # Check if email already exists
-    if await db.get_user_by_email(db_session, credentials.email):
-        return ApiResponse(
-            success=False,
-            error="Email already exists",
-            data=None
-        )
-    
-    # Check if username already exists
-    if credentials.username and await db.get_user_by_username(db_session, credentials.username):
+    # Generate default username if not provided
+    username = credentials.username or credentials.email.split('@')[0]
+
+    # One insert; existing emails/usernames are caught by the unique indexes
+    try:
+        new_user = await db.create_user(db_session, credentials.email, username, credentials.password)
+    except db.UserExistsError as exc:
         return ApiResponse(
             success=False,
-            error="Username already taken",
+            error=str(exc),
             data=None
         )
     
-    # Create new user
-    # Generate default username if not provided
-    username = credentials.username or credentials.email.split('@')[0]
-    
-    new_user = await db.create_user(db_session, credentials.email, username, credentials.password)
-    
     # Create session
-    token = await db.create_session(new_user.id)
+    token = await db.create_session(new_user.id, new_user.username)
     
     # Set cookie
     response.set_cookie(
@@ -100,6 +92,20 @@ async def signup(
         data=new_user.model_dump(exclude={'password'}, by_alias=True)
     )
 
+@router.get("/username-available")
+async def username_available(
+    username: str = Query(..., min_length=1, max_length=64),
+    db_session: AsyncSession = Depends(get_db)
+) -> ApiResponse:
+    """Check whether a username is free to sign up with."""
+    available = await db.is_username_available(db_session, username)
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data={"username": username, "available": available}
+    )
+
 @router.post("/logout")
 async def logout(
     response: Response,
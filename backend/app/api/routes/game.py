@@ -1,22 +1,28 @@
 """Game routes."""
 
-from fastapi import APIRouter, Depends, Cookie
+from fastapi import APIRouter, Depends, Cookie, Header, Query, Response
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.schemas import ApiResponse, ScoreSubmission
+from app.models.schemas import ApiResponse, ScoreSubmission, ScoreBatchSubmission
 from app.models.domain import GameMode
+from app.core.profiling import ProfiledRoute
 from app.services import database as db, game
 from app.core.database import get_db
 
-router = APIRouter(prefix="/game", tags=["game"])
+router = APIRouter(prefix="/game", tags=["game"], route_class=ProfiledRoute)
 
 @router.post("/score")
 async def submit_score(
     submission: ScoreSubmission,
     db_session: AsyncSession = Depends(get_db),
-    snake_session: Optional[str] = Cookie(None)
+    snake_session: Optional[str] = Cookie(None),
+    idempotency_key: Optional[str] = Header(None, max_length=128)
 ) -> ApiResponse:
-    """Submit a game score."""
+    """Submit a game score.
+
+    Retries carrying the same ``Idempotency-Key`` header (or ``gameId``)
+    return the originally recorded entry.
+    """
     if not snake_session:
         return ApiResponse(
             success=False,
@@ -24,7 +30,7 @@ async def submit_score(
             data=None
         )
         
-    user = await db.get_user_by_session_token(db_session, snake_session)
+    user = await db.get_session_user(db_session, snake_session)
     if not user:
         return ApiResponse(
             success=False,
@@ -32,7 +38,9 @@ async def submit_score(
             data=None
         )
     
-    entry = await game.submit_game_score(db_session, user, submission.score, submission.mode)
+    entry = await game.submit_game_score(
+        db_session, user, submission.score, submission.mode, idempotency_key or submission.gameId
+    )
     
     return ApiResponse(
         success=True,
@@ -40,16 +48,88 @@ async def submit_score(
         data=entry.model_dump()
     )
 
+@router.post("/scores/batch")
+async def submit_scores(
+    batch: ScoreBatchSubmission,
+    db_session: AsyncSession = Depends(get_db),
+    snake_session: Optional[str] = Cookie(None)
+) -> ApiResponse:
+    """Submit up to 100 game scores in one request.
+
+    Entries are returned in submission order; items whose ``gameId`` was
+    already recorded return the original entry.
+    """
+    if not snake_session:
+        return ApiResponse(
+            success=False,
+            error="Must be logged in to submit score",
+            data=None
+        )
+
+    user = await db.get_session_user(db_session, snake_session)
+    if not user:
+        return ApiResponse(
+            success=False,
+            error="Must be logged in to submit score",
+            data=None
+        )
+
+    entries = await game.submit_game_scores(
+        db_session, user, [(s.score, s.mode, s.gameId) for s in batch.scores]
+    )
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=[e.model_dump() for e in entries]
+    )
+
 @router.get("/leaderboard")
 async def get_leaderboard(
+    response: Response,
     mode: Optional[GameMode] = None,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    around_user: Optional[str] = None,
     db_session: AsyncSession = Depends(get_db)
 ) -> ApiResponse:
-    """Get leaderboard entries, optionally filtered by game mode."""
-    entries = await game.get_game_leaderboard(db_session, mode)
+    """Get leaderboard entries, optionally filtered by game mode.
+
+    When a full page is returned, the cursor for the next page is sent in
+    the ``X-Next-Cursor`` header so the body stays a plain list of entries.
+    """
+    try:
+        entries = await game.get_game_leaderboard(db_session, mode, limit, cursor, around_user)
+    except ValueError as exc:
+        return ApiResponse(
+            success=False,
+            error=str(exc),
+            data=None
+        )
+
+    if len(entries) == limit:
+        response.headers["X-Next-Cursor"] = db.encode_leaderboard_cursor(entries[-1])
     
     return ApiResponse(
         success=True,
         error=None,
         data=[e.model_dump() for e in entries]
     )
+
+@router.get("/distribution")
+async def get_distribution(
+    mode: GameMode = GameMode.WALLS,
+    db_session: AsyncSession = Depends(get_db)
+) -> ApiResponse:
+    """Get the score distribution for a game mode.
+
+    Quantiles come from a streaming histogram, accurate to within 1% of the
+    score.
+    """
+    distribution = await game.get_score_distribution(db_session, mode)
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=distribution
+    )
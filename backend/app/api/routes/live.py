@@ -2,14 +2,15 @@
 
 from fastapi import APIRouter
 from app.models.schemas import ApiResponse
-from app.services import database as db
+from app.core.profiling import ProfiledRoute
+from app.services import database as db, live_shards
 
-router = APIRouter(prefix="/live", tags=["live"])
+router = APIRouter(prefix="/live", tags=["live"], route_class=ProfiledRoute)
 
 @router.get("/players")
 async def get_active_players() -> ApiResponse:
     """Get list of active players."""
-    players = db.get_active_players()
+    players = db.get_active_players() + live_shards.get_players()
     
     return ApiResponse(
         success=True,
@@ -20,7 +21,7 @@ async def get_active_players() -> ApiResponse:
 @router.get("/players/{player_id}")
 async def get_player_stream(player_id: str) -> ApiResponse:
     """Get specific player's game stream."""
-    player = db.get_player_by_id(player_id)
+    player = live_shards.get_player(player_id) or db.get_player_by_id(player_id)
     
     if not player:
         return ApiResponse(
@@ -0,0 +1,84 @@
+"""Player routes."""
+
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import ApiResponse
+from app.core.profiling import ProfiledRoute
+from app.services import database as db
+from app.core.database import get_db
+
+router = APIRouter(prefix="/players", tags=["players"], route_class=ProfiledRoute)
+
+# Games returned with a player's stats, and the default history page size
+HISTORY_PAGE_SIZE = 10
+
+@router.get("/search")
+async def search_players(
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=50),
+    db_session: AsyncSession = Depends(get_db)
+) -> ApiResponse:
+    """Find players by username prefix (case-insensitive), best high score first."""
+    players = await db.search_players(db_session, q, limit)
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=[p.model_dump() for p in players]
+    )
+
+@router.get("/{player_id}/stats")
+async def get_player_stats(
+    player_id: str,
+    response: Response,
+    db_session: AsyncSession = Depends(get_db)
+) -> ApiResponse:
+    """Get a player's averages, best scores per mode, streaks and latest games.
+
+    When ``recentGames`` is a full page, the cursor for the rest of the
+    history is sent in the ``X-Next-Cursor`` header.
+    """
+    stats = await db.get_player_stats(db_session, player_id, HISTORY_PAGE_SIZE)
+    if not stats:
+        return ApiResponse(
+            success=False,
+            error="Player not found",
+            data=None
+        )
+
+    if len(stats.recentGames) == HISTORY_PAGE_SIZE:
+        response.headers["X-Next-Cursor"] = db.encode_history_cursor(stats.recentGames[-1])
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=stats.model_dump()
+    )
+
+@router.get("/{player_id}/history")
+async def get_player_history(
+    player_id: str,
+    response: Response,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db_session: AsyncSession = Depends(get_db)
+) -> ApiResponse:
+    """Get a player's games, newest first, with the next page cursor in ``X-Next-Cursor``."""
+    try:
+        games = await db.get_player_history(db_session, player_id, limit, cursor)
+    except ValueError as exc:
+        return ApiResponse(
+            success=False,
+            error=str(exc),
+            data=None
+        )
+
+    if len(games) == limit:
+        response.headers["X-Next-Cursor"] = db.encode_history_cursor(games[-1])
+
+    return ApiResponse(
+        success=True,
+        error=None,
+        data=[g.model_dump() for g in games]
+    )
@@ -0,0 +1,105 @@
+"""Gzip compression for large API responses.
+
+Only routes that opt in are considered (large JSON such as the leaderboard
+and live players), and only bodies of at least ``minimum_size`` bytes that
+do not already carry a ``Content-Encoding``. Pollers mostly receive the same
+payload over and over, so compressed bodies are kept in a small LRU cache
+keyed by a digest of the uncompressed body: hashing is cheaper than
+compressing, and identical responses are compressed once.
+"""
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from app.core import metrics
+from app.core.static import accepted_encodings
+
+COMPRESSION_BYTES = metrics.registry.register(metrics.Counter(
+    "snake_compression_bytes_total", "Response bytes before and after compression.", ("stage",)
+))
+COMPRESSION_CACHE = metrics.registry.register(metrics.Counter(
+    "snake_compression_cache_total", "Compressed body cache lookups.", ("result",)
+))
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by the digest of the original body."""
+
+    def __init__(self, maxsize: int, level: int):
+        self.maxsize = maxsize
+        self.level = level
+        self._bodies: OrderedDict[bytes, bytes] = OrderedDict()
+
+    def compress(self, body: bytes) -> bytes:
+        key = hashlib.sha256(body).digest()
+        compressed = self._bodies.get(key)
+        if compressed is not None:
+            self._bodies.move_to_end(key)
+            COMPRESSION_CACHE.inc(("hit",))
+            return compressed
+        COMPRESSION_CACHE.inc(("miss",))
+        compressed = gzip.compress(body, compresslevel=self.level, mtime=0)
+        self._bodies[key] = compressed
+        if len(self._bodies) > self.maxsize:
+            self._bodies.popitem(last=False)
+        return compressed
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+class CompressionMiddleware:
+    """ASGI middleware gzip-compressing responses of opted-in routes."""
+
+    def __init__(self, app, paths: set[str], minimum_size: int = 1024, level: int = 1, cache_size: int = 256):
+        self.app = app
+        self.paths = paths
+        self.minimum_size = minimum_size
+        self.cache = CompressedBodyCache(cache_size, level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        accept = next((v for k, v in scope["headers"] if k == b"accept-encoding"), b"")
+        if "gzip" not in accepted_encodings(accept.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            body = message.get("body", b"")
+            headers = start["headers"]
+            # Streamed, small, non-200 or already encoded responses go out untouched
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or start["status"] != 200
+                or any(k.lower() == b"content-encoding" for k, _ in headers)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self.cache.compress(body)
+            COMPRESSION_BYTES.inc(("in",), len(body))
+            COMPRESSION_BYTES.inc(("out",), len(compressed))
+            headers = [(k, v) for k, v in headers if k.lower() not in (b"content-length", b"vary")]
+            vary = b", ".join([v for k, v in start["headers"] if k.lower() == b"vary"] + [b"Accept-Encoding"])
+            headers += [
+                (b"content-encoding", b"gzip"),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
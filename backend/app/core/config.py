@@ -35,6 +35,80 @@ class Settings(BaseSettings):
     # Allow Codespaces domains
     CORS_ORIGIN_REGEX: str = r"https://.*\.app\.github\.dev|https://.*\.github\.dev"
     
+    # Sessions: "memory" keeps random tokens in process memory; "signed" issues
+    # HMAC-signed expiring tokens verified without any storage lookup
+    SESSION_MODE: str = "memory"
+    SESSION_SECRET: str = ""
+    SESSION_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Rate limiting and admission control
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Max concurrent bcrypt-bound requests (login + signup) before shedding with 429;
+    # also the size of the thread pool bcrypt runs in
+    BCRYPT_CONCURRENCY: int = 8
+
+    # Gzip for large responses of opted-in routes (leaderboard, live players); level 0 disables it.
+    # Level 1 gets ~90% of the size reduction of level 9 on our JSON at a fraction of the CPU
+    COMPRESSION_LEVEL: int = 1
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # Bloom filter sizing for GET /auth/username-available (grows to 2x the user count at load)
+    USERNAME_FILTER_CAPACITY: int = 1_000_000
+
+    # How often per-mode score histograms are merged into score_sketches
+    SKETCH_FLUSH_SECONDS: float = 60.0
+
+    # Retention (python -m app.retention): scores older than RETENTION_DAYS move to
+    # scores_archive unless among the player's best RETENTION_USER_TOP_K or their
+    # mode's best RETENTION_MODE_TOP_N
+    RETENTION_DAYS: int = 90
+    RETENTION_USER_TOP_K: int = 10
+    RETENTION_MODE_TOP_N: int = 10_000
+
+    # Warm restarts: in-memory state (sessions, live games, indexes) is saved here on
+    # shutdown and every SNAPSHOT_INTERVAL_SECONDS, and restored on startup. Empty disables it.
+    # Live games and indexes are only restored from snapshots younger than SNAPSHOT_MAX_AGE_SECONDS
+    SNAPSHOT_PATH: str = "./snake_arena.snapshot"
+    SNAPSHOT_INTERVAL_SECONDS: float = 60.0
+    SNAPSHOT_MAX_AGE_SECONDS: float = 3600.0
+
+    # Shared-board arena (app.services.arena); a tick interval of 0 disables it (required with EVENT_BUS_SOCKET)
+    ARENA_WIDTH: int = 256
+    ARENA_HEIGHT: int = 256
+    ARENA_FOOD: int = 500
+    ARENA_MAX_SNAKES: int = 1000
+    ARENA_TICK_SECONDS: float = 0.1
+
+    # Server-side bot games shown in the Live view (app.services.bots); 0 disables them.
+    # The loop wakes every BOT_TICK_SECONDS and spends at most BOT_BUDGET_SECONDS of it
+    # stepping bots; their live states are republished every BOT_PUBLISH_SECONDS
+    BOTS: int = 20
+    BOT_BOARD_SIZE: int = 20
+    BOT_TICK_SECONDS: float = 0.05
+    BOT_BUDGET_SECONDS: float = 0.005
+    BOT_PUBLISH_SECONDS: float = 1.0
+    # With LIVE_WORKERS > 0 the bot games run in that many worker processes, sharded by
+    # player id, and are read from shared memory instead of running on the event loop
+    LIVE_WORKERS: int = 0
+
+    # Unix socket of the event bus that keeps uvicorn workers in sync (live players,
+    # sessions, signups, new scores); empty disables it. Set it when running more than one worker.
+    # Live players reported by another worker are dropped if not refreshed for the TTL
+    EVENT_BUS_SOCKET: str = ""
+    EVENT_BUS_PLAYERS_TTL_SECONDS: float = 10.0
+
+    # Remembered idempotent score submissions (per process)
+    IDEMPOTENCY_CACHE_SIZE: int = 50_000
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+
+    # Admin endpoints are disabled unless a token is configured
+    ADMIN_TOKEN: str = ""
+
+    # Sampling profiler: fraction of requests to profile (0 disables it entirely)
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: str = "./profiles"
+    
     @property
     def CORS_ORIGINS(self) -> list[str]:
         """Parse ALLOWED_ORIGINS into a list."""
@@ -1,27 +1,55 @@
 """Database configuration."""
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from time import perf_counter
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.core import metrics, profiling
 
-# Create async engine
-# check_same_thread=False is needed for SQLite
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True,
-    connect_args=connect_args
-)
-
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False
-)
+# The engine is created on first use rather than at import time: building it
+# loads the DB driver and dialect, which dominates cold-start import cost.
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+def get_engine() -> AsyncEngine:
+    """Get the application engine, creating it on first call."""
+    global _engine
+    if _engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        # check_same_thread=False is needed for SQLite
+        connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+
+        _engine = create_async_engine(
+            settings.DATABASE_URL,
+            echo=False,
+            future=True,
+            connect_args=connect_args
+        )
+        metrics.instrument_engine(_engine.sync_engine)
+        profiling.instrument_engine(_engine.sync_engine)
+    return _engine
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Get the async session factory bound to the application engine."""
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False
+        )
+    return _sessionmaker
+
+async def dispose_engine() -> None:
+    """Dispose the engine if it was ever created."""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
 
 # Base class for models
 class Base(DeclarativeBase):
@@ -30,7 +58,9 @@ class Base(DeclarativeBase):
 # Dependency for FastAPI
 async def get_db():
     """Get database session."""
-    async with AsyncSessionLocal() as session:
+    start = perf_counter()
+    async with get_sessionmaker()() as session:
+        profiling.record(("dependencies", "get_db"), perf_counter() - start)
         try:
             yield session
         finally:
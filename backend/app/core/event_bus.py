@@ -0,0 +1,215 @@
+"""Event bus between the workers of one host.
+
+With ``uvicorn --workers N`` every worker has its own in-memory state: live
+players, login sessions, the username filter and the player search index.
+Workers keep each other current by publishing events (live player states,
+logins and logouts, signups, new scores) on a local broker. There is no
+outside service: the first worker to take an exclusive lock on
+``<socket>.lock`` becomes the broker and listens on a Unix-domain socket.
+Every worker, the broker's own included, connects to it as a client. The
+broker forwards each frame it receives to every other connection unchanged,
+without decoding it. If the broker's worker exits, the others reconnect, and
+whichever gets the lock next takes over.
+
+A worker that connects or reconnects has missed earlier events, so it
+publishes a ``sync`` event. The broker's worker answers with its current
+state, and every worker answers a new broker (see the handlers in
+app.services.database).
+
+Publishing is synchronous and cheap. Events are queued and sent as one
+frame (a 4-byte length, then JSON) once ``batch_size`` events are waiting
+or ``batch_delay`` seconds after the first, so a burst of events costs one
+write and one read per worker. Events published while the worker is not
+connected are dropped: the player states they carry are republished
+periodically, and the indexes they update are rebuilt from the database on
+restart. Slow subscribers are disconnected rather than buffered without
+bound; they reconnect.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+from collections import defaultdict
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, Any], None]
+
+_LENGTH = struct.Struct(">I")
+# Bytes queued for a subscriber beyond which the broker drops it
+MAX_SUBSCRIBER_BUFFER = 16 * 2**20
+
+# Handlers by event kind, called with the publishing worker's id and the event data
+handlers: dict[str, list[Handler]] = defaultdict(list)
+
+def subscribe(kind: str, handler: Handler) -> None:
+    handlers[kind].append(handler)
+
+class Bus:
+    """One worker's connection to the broker, and the broker itself when elected."""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 256,
+        batch_delay: float = 0.002,
+        handlers: dict[str, list[Handler]] = handlers,
+        worker_id: Optional[str] = None
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.handlers = handlers
+        self.worker_id = worker_id or str(os.getpid())
+        self.is_broker = False
+        self.connected = asyncio.Event()
+        self._elected = asyncio.Event()
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: list[tuple[str, Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        self._flush()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        if self._server is not None:
+            self._server.close()
+            for subscriber in list(self._subscribers):
+                subscriber.close()
+            await self._server.wait_closed()
+            with suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+
+    def publish(self, kind: str, data: Any) -> None:
+        """Queue an event for the other workers."""
+        self._pending.append((kind, data))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        events, self._pending = self._pending, []
+        if events and self._writer is not None:
+            payload = json.dumps({"worker": self.worker_id, "events": events}).encode()
+            self._writer.write(_LENGTH.pack(len(payload)) + payload)
+
+    async def when_broker(self, run: Callable[[], Awaitable]) -> None:
+        """Wait until this worker hosts the broker, then run ``run()``."""
+        await self._elected.wait()
+        await run()
+
+    def _try_lock(self) -> bool:
+        import fcntl
+
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            if not self.is_broker and self._try_lock():
+                # Holding the lock, any socket file left is from a broker that died
+                if os.path.exists(self.path):
+                    os.unlink(self.path)
+                self._server = await asyncio.start_unix_server(self._forward, self.path)
+                self.is_broker = True
+                self._elected.set()
+                logger.info("Worker %s is the event bus broker", self.worker_id)
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.5)
+                continue
+            self.connected.set()
+            # Ask the others for the state published before this connection
+            self.publish("sync", {"broker": self.is_broker})
+            try:
+                while True:
+                    self._dispatch(await _read_frame(reader))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.warning("Lost connection to the event bus broker; reconnecting")
+            finally:
+                self.connected.clear()
+                self._writer.close()
+                self._writer = None
+            await asyncio.sleep(0.1)
+
+    def _dispatch(self, payload: bytes) -> None:
+        batch = json.loads(payload)
+        worker = batch["worker"]
+        for kind, data in batch["events"]:
+            for handler in self.handlers.get(kind, ()):
+                try:
+                    handler(worker, data)
+                except Exception:
+                    logger.exception("Event bus handler for %r failed", kind)
+
+    async def _forward(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Broker side of one worker's connection."""
+        self._subscribers.add(writer)
+        try:
+            while True:
+                payload = await _read_frame(reader)
+                frame = _LENGTH.pack(len(payload)) + payload
+                for subscriber in list(self._subscribers):
+                    if subscriber is writer:
+                        continue
+                    if subscriber.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER:
+                        logger.warning("Dropping a slow event bus subscriber")
+                        self._subscribers.discard(subscriber)
+                        subscriber.close()
+                        continue
+                    subscriber.write(frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+# This worker's bus, when EVENT_BUS_SOCKET is set
+bus: Optional[Bus] = None
+
+def start(path: str) -> Bus:
+    global bus
+    bus = Bus(path)
+    bus.start()
+    return bus
+
+async def stop() -> None:
+    global bus
+    if bus is not None:
+        await bus.close()
+        bus = None
+
+def publish(kind: str, data: Any) -> None:
+    """Send an event to the other workers (no-op without a bus)."""
+    if bus is not None:
+        bus.publish(kind, data)
@@ -0,0 +1,192 @@
+"""Prometheus-style metrics.
+
+Metrics are plain Python objects updated from the event loop thread, so
+recording a sample is a dict lookup and a couple of integer increments with
+no locking. ``registry.render()`` produces the Prometheus text exposition
+format served at ``/api/metrics``.
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Iterable
+
+# Latency buckets in seconds, from sub-millisecond DB queries up to slow bcrypt calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for values, total in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, values)} {total}"
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.callback = callback
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.callback()}"
+
+class _Series:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+
+class Histogram:
+    """Fixed-bucket histogram, optionally split by labels."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], _Series] = {}
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # The last slot counts observations above the largest bucket
+            series = self._series[labels] = _Series(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series.counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, values)} {series.sum}"
+            yield f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}"
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "snake_http_request_duration_seconds", "HTTP request latency by route template.", ("route", "method")
+))
+REQUESTS = registry.register(Counter(
+    "snake_http_requests_total", "HTTP requests by route template and status.", ("route", "method", "status")
+))
+DB_QUERY_DURATION = registry.register(Histogram(
+    "snake_db_query_duration_seconds", "Database statement execution time.", ("statement",)
+))
+BCRYPT_DURATION = registry.register(Histogram(
+    "snake_bcrypt_duration_seconds", "Password hashing and verification time.", ("operation",)
+))
+
+_STATEMENT_KINDS = {"select", "insert", "update", "delete"}
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    kind = statement.lstrip()[:6].lower()
+    DB_QUERY_DURATION.observe(
+        perf_counter() - context._metrics_start,
+        (kind if kind in _STATEMENT_KINDS else "other",)
+    )
+
+def instrument_engine(sync_engine) -> None:
+    """Record statement timings for an engine via SQLAlchemy cursor events."""
+    from sqlalchemy import event
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+def route_template(scope) -> str:
+    """Return the matched route template for a finished request.
+
+    Recent FastAPI versions resolve included routers lazily and keep the full
+    prefixed template on the effective route context; older versions put it
+    on the route object itself.
+    """
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    return getattr(scope.get("route"), "path", "unmatched")
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request latency and status counts.
+
+    Requests are labelled by route template (e.g. ``/api/live/players/{player_id}``)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            path = route_template(scope)
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, (path, method))
+            REQUESTS.inc((path, method, str(status)))
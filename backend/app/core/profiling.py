@@ -0,0 +1,185 @@
+"""Sampling request profiler.
+
+When enabled (``PROFILE_SAMPLE_RATE > 0``), ``ProfilingMiddleware`` picks a
+fraction of requests and records how their time splits between dependency
+resolution, ``get_db``, the endpoint (service) call, DB queries, bcrypt and
+response serialization. Samples are aggregated into collapsed stacks
+(``route;phase;subphase microseconds``) that ``dump()`` writes to disk in the
+format flamegraph tools read.
+
+Instrumentation points check a context variable and return immediately for
+unsampled requests, and the middleware is not installed at all when the
+sample rate is zero.
+"""
+
+import functools
+import inspect
+import os
+import random
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from time import perf_counter
+from typing import Optional
+from fastapi.routing import APIRoute
+from app.core.metrics import route_template
+
+class RequestProfile:
+    """Span timings collected for one sampled request."""
+    __slots__ = ("start", "handler_start", "endpoint_start", "endpoint_end", "handler_end", "spans")
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.handler_start = self.endpoint_start = self.endpoint_end = self.handler_end = None
+        # Nested timings, e.g. ("dependencies", "get_db") or ("service", "db")
+        self.spans: Counter[tuple[str, ...]] = Counter()
+
+    def add(self, path: tuple[str, ...], seconds: float) -> None:
+        self.spans[path] += seconds
+
+    def breakdown(self, total: float) -> dict[tuple[str, ...], float]:
+        """Return exclusive time per span path, in seconds."""
+        result: dict[tuple[str, ...], float] = dict(self.spans)
+        if self.handler_start is not None and self.handler_end is not None:
+            handler = self.handler_end - self.handler_start
+            if self.endpoint_start is not None and self.endpoint_end is not None:
+                service = self.endpoint_end - self.endpoint_start
+                dependencies = self.endpoint_start - self.handler_start
+                result[("dependencies",)] = dependencies - self._nested("dependencies")
+                result[("service",)] = service - self._nested("service")
+                result[("serialization",)] = self.handler_end - self.endpoint_end
+            else:
+                result[("handler",)] = handler
+            total -= handler
+        result[("middleware",)] = total
+        return {path: seconds for path, seconds in result.items() if seconds > 0}
+
+    def _nested(self, parent: str) -> float:
+        return sum(seconds for path, seconds in self.spans.items() if path[0] == parent)
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, or None if it is not being sampled."""
+    return _current.get()
+
+def record(path: tuple[str, ...], seconds: float) -> None:
+    """Add a timing to the current request's profile, if it is sampled."""
+    profile = _current.get()
+    if profile is not None:
+        profile.add(path, seconds)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profile_start = perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is not None:
+        profile.add(("service", "db"), perf_counter() - context._profile_start)
+
+def instrument_engine(sync_engine) -> None:
+    """Attribute statement time to the sampled request that issued it."""
+    from sqlalchemy import event
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+class Profiler:
+    """Aggregates sampled request profiles into collapsed stacks."""
+
+    def __init__(self, recent: int = 100):
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.recent: deque[dict] = deque(maxlen=recent)
+
+    def add(self, label: str, profile: RequestProfile, total: float) -> None:
+        breakdown = profile.breakdown(total)
+        for path, seconds in breakdown.items():
+            self.stacks[";".join((label, *path))] += round(seconds * 1e6)
+        self.samples += 1
+        self.recent.append({
+            "route": label,
+            "totalMs": round(total * 1000, 3),
+            "spansMs": {"/".join(path): round(seconds * 1000, 3) for path, seconds in breakdown.items()},
+        })
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {micros}\n" for stack, micros in sorted(self.stacks.items()))
+
+    def dump(self, directory: str) -> str:
+        """Write collapsed stacks to ``directory`` and reset the aggregate."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.folded")
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        self.stacks.clear()
+        self.samples = 0
+        return path
+
+profiler = Profiler()
+
+class ProfilingMiddleware:
+    """ASGI middleware sampling a fraction of HTTP requests into ``profiler``."""
+
+    def __init__(self, app, sample_rate: float):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            total = perf_counter() - profile.start
+            profiler.add(f"{scope['method']} {route_template(scope)}", profile, total)
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that marks handler and endpoint boundaries for sampled requests.
+
+    The time between the handler starting and the endpoint being called is
+    dependency resolution; the time after the endpoint returns is response
+    validation and serialization.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _mark_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            profile = _current.get()
+            if profile is None:
+                return await handler(request)
+            profile.handler_start = perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                profile.handler_end = perf_counter()
+
+        return profiled_handler
+
+def _mark_endpoint(endpoint):
+    # Only coroutine endpoints are wrapped; FastAPI runs sync ones in a threadpool
+    if not inspect.iscoroutinefunction(endpoint) or getattr(endpoint, "_profiled", False):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def marked(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return await endpoint(*args, **kwargs)
+        profile.endpoint_start = perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            profile.endpoint_end = perf_counter()
+
+    marked._profiled = True
+    return marked
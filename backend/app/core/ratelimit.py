@@ -0,0 +1,189 @@
+"""Admission control and per-client rate limiting.
+
+``RateLimitMiddleware`` applies a token bucket per client (the user of a
+verified session cookie, or the client IP otherwise) with a separate budget
+per route, and caps how many requests to expensive routes (bcrypt
+login/signup) may be in flight at once. Login and signup are always limited
+per IP, so minting sessions does not buy more attempts. Rejected requests get
+a 429 with ``Retry-After``.
+
+Buckets live in an insertion-ordered dict kept in least-recently-used order,
+so each request is O(1): buckets idle long enough to have refilled completely
+are dropped from the front (a full bucket is the same as no bucket), and the
+table never grows past ``max_keys``.
+"""
+
+import json
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Callable, Optional
+
+class TokenBucketLimiter:
+    """Token buckets keyed by client, refilling at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # Time for an empty bucket to refill completely; idle buckets older than this are dropped
+        self.idle_ttl = burst / rate
+        # key -> [tokens, last_update], least recently used first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take one token for ``key``; return 0 if allowed, else seconds until one is available."""
+        now = monotonic() if now is None else now
+        buckets = self._buckets
+
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [float(self.burst), now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            buckets.move_to_end(key)
+
+        # Expire at most a couple of idle buckets per call to keep the cost constant
+        for _ in range(2):
+            oldest_key, oldest = next(iter(buckets.items()))
+            if oldest_key == key or now - oldest[1] < self.idle_ttl:
+                break
+            buckets.popitem(last=False)
+        if len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class ConcurrencyLimiter:
+    """Caps the number of in-flight requests sharing an expensive resource."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+@dataclass
+class RouteLimit:
+    """Rate budget for one route, plus an optional shared concurrency cap."""
+    rate: float
+    burst: int
+    concurrency: Optional[ConcurrencyLimiter] = None
+    max_keys: int = 100_000
+    # Key by client IP even for logged-in clients
+    by_address: bool = False
+    limiter: TokenBucketLimiter = field(init=False)
+
+    def __post_init__(self):
+        self.limiter = TokenBucketLimiter(self.rate, self.burst, self.max_keys)
+
+def default_limits(prefix: str, bcrypt_concurrency: int, max_keys: int) -> tuple[dict[str, RouteLimit], RouteLimit]:
+    """Per-route budgets and the default budget for all other API routes."""
+    bcrypt = ConcurrencyLimiter(bcrypt_concurrency)
+    routes = {
+        f"{prefix}/auth/login": RouteLimit(rate=0.2, burst=10, concurrency=bcrypt, max_keys=max_keys, by_address=True),
+        f"{prefix}/auth/signup": RouteLimit(rate=0.1, burst=5, concurrency=bcrypt, max_keys=max_keys, by_address=True),
+        f"{prefix}/game/score": RouteLimit(rate=2, burst=20, max_keys=max_keys),
+        f"{prefix}/game/scores/batch": RouteLimit(rate=0.2, burst=5, max_keys=max_keys),
+        f"{prefix}/game/leaderboard": RouteLimit(rate=20, burst=60, max_keys=max_keys),
+        f"{prefix}/live/players": RouteLimit(rate=20, burst=60, max_keys=max_keys),
+    }
+    return routes, RouteLimit(rate=50, burst=100, max_keys=max_keys)
+
+def _session_cookie(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            for part in value.decode("latin-1").split(";"):
+                key, _, token = part.strip().partition("=")
+                if key == "snake_session" and token:
+                    return token
+    return None
+
+def _client_key(scope, session_user: Optional[Callable[[str], Optional[str]]]) -> str:
+    # An unverified cookie must not pick the bucket: a fresh random one per
+    # request would get a fresh budget and could flush real clients' buckets
+    if session_user is not None:
+        token = _session_cookie(scope)
+        user_id = session_user(token) if token else None
+        if user_id:
+            return "u:" + user_id
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+async def _reject(send, retry_after: float) -> None:
+    body = json.dumps({"success": False, "error": "Too many requests", "data": None}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing per-client budgets on API routes.
+
+    ``session_user`` maps a session token to its user id, or None if the
+    token is not valid; without it clients are keyed by IP only.
+    """
+
+    def __init__(
+        self,
+        app,
+        routes: dict[str, RouteLimit],
+        default: RouteLimit,
+        prefix: str,
+        session_user: Optional[Callable[[str], Optional[str]]] = None
+    ):
+        self.app = app
+        self.routes = routes
+        self.default = default
+        self.prefix = prefix
+        self.session_user = session_user
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        limit = self.routes.get(path)
+        if limit is None:
+            if not path.startswith(self.prefix):
+                await self.app(scope, receive, send)
+                return
+            limit = self.default
+
+        retry_after = limit.limiter.acquire(_client_key(scope, None if limit.by_address else self.session_user))
+        if retry_after:
+            await _reject(send, retry_after)
+            return
+
+        concurrency = limit.concurrency
+        if concurrency is None:
+            await self.app(scope, receive, send)
+            return
+        if not concurrency.try_acquire():
+            await _reject(send, 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            concurrency.release()
@@ -0,0 +1,150 @@
+"""Precompressed, cache-friendly serving of the built frontend.
+
+The whole build is read into memory once, with gzip (and brotli, when the
+optional ``brotli`` package is installed) variants computed up front, so a
+request is a dict lookup plus header negotiation:
+
+- ``/assets/*`` files carry content hashes in their names and are served
+  with a one-year ``immutable`` ``Cache-Control``.
+- ``index.html`` and other top-level files use ``no-cache`` so clients
+  revalidate, cheaply, via ``ETag`` / ``If-None-Match``.
+- Any other non-API path gets the in-memory ``index.html`` (SPA fallback).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+from fastapi import FastAPI, Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Compressing tiny or already-compressed files is not worth the bytes or CPU
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+
+@dataclass(slots=True)
+class StaticAsset:
+    """One file with its precomputed encodings."""
+    content_type: str
+    cache_control: str
+    etag: str
+    # Content-Encoding ("identity", "gzip", "br") -> body
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+def _compressible(content_type: str, size: int) -> bool:
+    return size >= MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES)
+
+def load_asset(path: str, cache_control: str) -> StaticAsset:
+    """Read a file and precompute its compressed variants."""
+    with open(path, "rb") as f:
+        body = f.read()
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    asset = StaticAsset(
+        content_type=content_type,
+        cache_control=cache_control,
+        etag=hashlib.sha256(body).hexdigest()[:20],
+        bodies={"identity": body}
+    )
+    if _compressible(content_type, len(body)):
+        variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        for encoding, compressed in variants.items():
+            if len(compressed) < len(body):
+                asset.bodies[encoding] = compressed
+    return asset
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+class StaticSite:
+    """In-memory copy of a frontend build directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.files: dict[str, StaticAsset] = {}
+        self.loaded = False
+
+    def load(self) -> None:
+        files = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                cache_control = IMMUTABLE if relative.startswith("assets/") else REVALIDATE
+                files[relative] = load_asset(path, cache_control)
+        self.files = files
+        self.loaded = True
+
+    def get(self, relative: str) -> Optional[StaticAsset]:
+        if not self.loaded:
+            self.load()
+        return self.files.get(relative)
+
+    def respond(self, request: Request, asset: StaticAsset) -> Response:
+        """Serve the best encoding the client accepts, or 304 if its copy is current."""
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in accepted and e in asset.bodies), "identity")
+        etag = f'"{asset.etag}"' if encoding == "identity" else f'"{asset.etag}-{encoding}"'
+
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+            return Response(status_code=304, headers=headers)
+
+        body = asset.bodies[encoding]
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(content=body, media_type=asset.content_type, headers=headers)
+
+def mount_spa(app: FastAPI, directory: str, api_prefix: str) -> StaticSite:
+    """Register asset and SPA fallback routes serving ``directory`` from memory."""
+    site = StaticSite(directory)
+
+    @app.api_route("/assets/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_asset(path: str, request: Request):
+        """Serve a hashed build asset."""
+        asset = site.get(f"assets/{path}")
+        if asset is None:
+            return Response(status_code=404)
+        return site.respond(request, asset)
+
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_spa(full_path: str, request: Request):
+        """Serve top-level build files, or index.html for any other path."""
+        # API requests should already be handled by routers above
+        if full_path.startswith(api_prefix.lstrip("/")):
+            return {"detail": "Not Found"}
+        asset = site.get(full_path) if full_path and "/" not in full_path else None
+        asset = asset or site.get("index.html")
+        if asset is None:
+            return Response(status_code=404)
+        return site.respond(request, asset)
+
+    return site
@@ -1,19 +1,133 @@
 """FastAPI application."""
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from functools import partial
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.routes import auth, game, live
+from app.core.database import dispose_engine, get_sessionmaker
+from app.core import compression, event_bus, metrics, profiling, ratelimit, static
+from app.api.routes import admin, arena, auth, game, live, players
+from app.services import bots, database as db, live_shards, percentiles, snapshot
+from app.services.arena import run as run_arena
 import os
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan.
+
+    Nothing heavy happens at import time; the engine and password hashing
+    context are built on first use and torn down here on shutdown. The
+    frontend build, if present, is read and precompressed on startup. Score
+    percentile histograms are persisted periodically and on shutdown, and
+    in-memory state is restored from the last snapshot and saved again
+    periodically and on shutdown. The username filter and player index are
+    then built if the snapshot did not restore them. The arena tick loop and the bot players
+    run in the background, the bots in worker processes if LIVE_WORKERS is set.
+    With several uvicorn workers, the event bus keeps their in-memory state in
+    sync and only the worker hosting its broker runs the bots and saves
+    snapshots; the others restore everything but its live games. The arena has
+    one board per process, so it cannot be enabled together with the bus.
+    """
+    if settings.EVENT_BUS_SOCKET and settings.ARENA_TICK_SECONDS > 0:
+        raise RuntimeError(
+            "The arena keeps its board in one process; set ARENA_TICK_SECONDS=0 to run several workers"
+        )
+    if spa is not None:
+        spa.load()
+    tasks = [asyncio.create_task(percentiles.run_flusher(settings.SKETCH_FLUSH_SECONDS))]
+    if settings.ARENA_TICK_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_arena(settings.ARENA_TICK_SECONDS)))
+    bus = event_bus.start(settings.EVENT_BUS_SOCKET) if settings.EVENT_BUS_SOCKET else None
+    if settings.SNAPSHOT_PATH:
+        async with get_sessionmaker()() as session:
+            await snapshot.restore(
+                session, settings.SNAPSHOT_PATH, settings.SNAPSHOT_MAX_AGE_SECONDS, live_games=bus is None
+            )
+        run_snapshotter = partial(snapshot.run_snapshotter, settings.SNAPSHOT_PATH, settings.SNAPSHOT_INTERVAL_SECONDS)
+        tasks.append(asyncio.create_task(bus.when_broker(run_snapshotter) if bus is not None else run_snapshotter()))
+    try:
+        # After the restore, which may already have loaded them
+        async with get_sessionmaker()() as session:
+            await db.warm_indexes(session)
+    except Exception:
+        logger.exception("Failed to warm the indexes; they will be built on first use")
+    if settings.BOTS > 0:
+        # After the restore, which replaces the live player list
+        if settings.LIVE_WORKERS > 0:
+            run_bots = partial(
+                live_shards.run,
+                settings.BOTS,
+                settings.LIVE_WORKERS,
+                settings.BOT_BOARD_SIZE,
+                settings.BOT_PUBLISH_SECONDS
+            )
+        else:
+            run_bots = partial(
+                bots.run,
+                settings.BOTS,
+                settings.BOT_BOARD_SIZE,
+                settings.BOT_TICK_SECONDS,
+                settings.BOT_BUDGET_SECONDS,
+                settings.BOT_PUBLISH_SECONDS
+            )
+        tasks.append(asyncio.create_task(bus.when_broker(run_bots) if bus is not None else run_bots()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await event_bus.stop()
+    try:
+        async with get_sessionmaker()() as session:
+            await percentiles.flush(session)
+    except Exception:
+        logger.exception("Failed to persist score percentiles")
+    if settings.SNAPSHOT_PATH and (bus is None or bus.is_broker):
+        try:
+            snapshot.save(settings.SNAPSHOT_PATH)
+        except Exception:
+            logger.exception("Failed to write snapshot %s", settings.SNAPSHOT_PATH)
+    await dispose_engine()
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    description=settings.DESCRIPTION
+    description=settings.DESCRIPTION,
+    lifespan=lifespan
 )
 
+# Per-client rate limits; inside CORS so 429 responses still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    route_limits, default_limit = ratelimit.default_limits(
+        settings.API_PREFIX, settings.BCRYPT_CONCURRENCY, settings.RATE_LIMIT_MAX_KEYS
+    )
+    app.add_middleware(
+        ratelimit.RateLimitMiddleware,
+        routes=route_limits,
+        default=default_limit,
+        prefix=settings.API_PREFIX,
+        session_user=db.session_user_id
+    )
+
+# Compress large, frequently polled JSON responses
+if settings.COMPRESSION_LEVEL > 0:
+    app.add_middleware(
+        compression.CompressionMiddleware,
+        paths={
+            f"{settings.API_PREFIX}/game/leaderboard",
+            f"{settings.API_PREFIX}/live/players",
+            f"{settings.API_PREFIX}/arena/state",
+        },
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        level=settings.COMPRESSION_LEVEL
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,30 +136,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
 
+# Opt-in request sampling; not installed at all when the rate is zero
+if settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(profiling.ProfilingMiddleware, sample_rate=settings.PROFILE_SAMPLE_RATE)
+
+# Outermost, so request latency includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_PREFIX)
 app.include_router(game.router, prefix=settings.API_PREFIX)
 app.include_router(live.router, prefix=settings.API_PREFIX)
+app.include_router(players.router, prefix=settings.API_PREFIX)
+app.include_router(arena.router, prefix=settings.API_PREFIX)
+app.include_router(admin.router, prefix=settings.API_PREFIX)
 
 @app.get(f"{settings.API_PREFIX}/health")
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
 
-# Serve static files and SPA fallback
+@app.get(f"{settings.API_PREFIX}/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+# Serve static files and SPA fallback from memory
 # Only serve if static directory exists (e.g. in production Docker)
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 
-if os.path.isdir(STATIC_DIR):
-    app.mount("/assets", StaticFiles(directory=os.path.join(STATIC_DIR, "assets")), name="assets")
-    
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        """Serve SPA index.html for any other path."""
-        # API requests should already be handled by routers above
-        if full_path.startswith("api"):
-            return {"detail": "Not Found"}
-        return FileResponse(os.path.join(STATIC_DIR, "index.html"))
-
+spa = static.mount_spa(app, STATIC_DIR, settings.API_PREFIX) if os.path.isdir(STATIC_DIR) else None
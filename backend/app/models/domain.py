@@ -1,6 +1,7 @@
 """Domain models for the application."""
 
 from enum import Enum
+from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, ConfigDict
 from pydantic.alias_generators import to_camel
@@ -16,6 +17,8 @@ class GameMode(str, Enum):
     """Game mode."""
     WALLS = 'walls'
     PASS_THROUGH = 'pass-through'
+    # Shared board with every other player (see app.services.arena)
+    ARENA = 'arena'
 
 class GameStatus(str, Enum):
     """Game status."""
@@ -39,6 +42,22 @@ class GameState(BaseModel):
     mode: GameMode
     speed: int
 
+class ArenaSnake(BaseModel):
+    """A snake on the shared arena board, head last."""
+    id: str
+    username: str
+    score: int
+    direction: Direction
+    body: list[Position]
+
+class ArenaState(BaseModel):
+    """Snakes and food on the arena board at a tick."""
+    width: int
+    height: int
+    tick: int
+    snakes: list[ArenaSnake]
+    food: list[Position]
+
 class User(BaseModel):
     """User model."""
     model_config = ConfigDict(
@@ -55,6 +74,11 @@ class User(BaseModel):
     games_played: int
     created_at: datetime
 
+class SessionUser(BaseModel):
+    """Identity carried by a session token."""
+    id: str
+    username: str
+
 class LeaderboardEntry(BaseModel):
     """Leaderboard entry."""
     id: str
@@ -63,6 +87,42 @@ class LeaderboardEntry(BaseModel):
     mode: GameMode
     date: str  # YYYY-MM-DD
     rank: int
+    # Percentage of scores in this mode below this one, set on submission
+    percentile: Optional[float] = None
+
+class PlayerMatch(BaseModel):
+    """Player search result."""
+    id: str
+    username: str
+    highScore: int
+
+class ModeStats(BaseModel):
+    """A player's aggregates for one game mode."""
+    mode: GameMode
+    gamesPlayed: int
+    averageScore: float
+    bestScore: int
+
+class GameRecord(BaseModel):
+    """One game in a player's history."""
+    id: str
+    score: int
+    mode: GameMode
+    playedAt: datetime
+
+class PlayerStats(BaseModel):
+    """Player profile with aggregates and the most recent games."""
+    id: str
+    username: str
+    gamesPlayed: int
+    averageScore: float
+    bestScore: int
+    # Consecutive days played, ending today or yesterday (0 otherwise)
+    currentStreak: int
+    longestStreak: int
+    lastPlayed: Optional[str] = None  # YYYY-MM-DD
+    modes: list[ModeStats]
+    recentGames: list[GameRecord]
 
 class ActivePlayer(BaseModel):
     """Active player in a game."""
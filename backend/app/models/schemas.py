@@ -2,8 +2,8 @@
 
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
-from app.models.domain import GameMode
+from pydantic import BaseModel, EmailStr, Field
+from app.models.domain import Direction, GameMode
 
 class AuthCredentials(BaseModel):
     """Authentication credentials."""
@@ -24,6 +24,16 @@ class ScoreSubmission(BaseModel):
     """Score submission request."""
     score: int
     mode: GameMode
+    # Client-generated game id; retries with the same id are not recorded twice
+    gameId: Optional[str] = Field(None, max_length=128)
+
+class ScoreBatchSubmission(BaseModel):
+    """Batch of score submissions, e.g. from a tournament server or offline sync."""
+    scores: list[ScoreSubmission] = Field(..., min_length=1, max_length=100)
+
+class ArenaTurn(BaseModel):
+    """Direction change for the caller's arena snake, applied on the next tick."""
+    direction: Direction
 
 class ApiResponse(BaseModel):
     """Standard API response wrapper."""
@@ -1,7 +1,8 @@
 """SQLAlchemy models."""
 
-from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, func
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import String, Integer, BigInteger, Date, DateTime, Text, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -22,8 +23,80 @@ class Score(Base):
     __tablename__ = "scores"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[str] = mapped_column(String, index=True)
+    user_id: Mapped[str] = mapped_column(String)
     username: Mapped[str] = mapped_column(String)
     score: Mapped[int] = mapped_column(Integer)
     mode: Mapped[str] = mapped_column(String)
     date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    # Client-supplied key making retried submissions idempotent per user
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # Keyset pagination indexes matching leaderboard order (score DESC, id ASC)
+    __table_args__ = (
+        Index("ix_scores_score_id", score.desc(), id),
+        Index("ix_scores_mode_score_id", mode, score.desc(), id),
+        Index("uq_scores_user_id_idempotency_key", user_id, idempotency_key, unique=True),
+        # Player history, newest first. On Postgres the migration also INCLUDEs score and
+        # mode; the option is left out here because dialect options load the dialect package
+        # (and its driver modules) at import time
+        Index("ix_scores_user_id_date_id", user_id, date.desc(), id.desc()),
+    )
+
+@event.listens_for(Score.__table__, "before_create")
+def _never_reuse_score_ids(table, connection, **kw):
+    # SQLite hands out max(rowid) + 1, so archiving the newest score would let the next
+    # one take its id; AUTOINCREMENT never reuses. Set here rather than as a table option
+    # because dialect options load the dialect package at import time (Postgres ids come
+    # from a sequence and are never reused anyway)
+    if connection.dialect.name == "sqlite":
+        table.dialect_kwargs["sqlite_autoincrement"] = True
+
+class ScoreArchive(Base):
+    """Scores moved out of ``scores`` by the retention job (app.retention)."""
+    __tablename__ = "scores_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[str] = mapped_column(String)
+    username: Mapped[str] = mapped_column(String)
+    score: Mapped[int] = mapped_column(Integer)
+    mode: Mapped[str] = mapped_column(String)
+    date: Mapped[datetime] = mapped_column(DateTime)
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_scores_archive_user_id_date_id", user_id, date.desc(), id.desc()),
+    )
+
+class ScoreSketch(Base):
+    """Persisted per-mode score histogram (see app.services.percentiles)."""
+    __tablename__ = "score_sketches"
+
+    mode: Mapped[str] = mapped_column(String, primary_key=True)
+    # JSON object of histogram bucket index -> count
+    buckets: Mapped[str] = mapped_column(Text)
+    total: Mapped[int] = mapped_column(Integer)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+class UserStats(Base):
+    """Per-player aggregates, updated with each recorded score."""
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    games_played: Mapped[int] = mapped_column(Integer)
+    total_score: Mapped[int] = mapped_column(BigInteger)
+    best_score: Mapped[int] = mapped_column(Integer)
+    last_played_on: Mapped[date] = mapped_column(Date)
+    # Consecutive days played, up to and including last_played_on
+    current_streak: Mapped[int] = mapped_column(Integer)
+    longest_streak: Mapped[int] = mapped_column(Integer)
+
+class UserModeStats(Base):
+    """Per-player, per-mode aggregates, updated with each recorded score."""
+    __tablename__ = "user_mode_stats"
+
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    mode: Mapped[str] = mapped_column(String, primary_key=True)
+    games_played: Mapped[int] = mapped_column(Integer)
+    total_score: Mapped[int] = mapped_column(BigInteger)
+    best_score: Mapped[int] = mapped_column(Integer)
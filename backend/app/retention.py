@@ -0,0 +1,150 @@
+"""Score retention job.
+
+Moves scores older than ``RETENTION_DAYS`` into ``scores_archive`` unless
+they are among the player's ``RETENTION_USER_TOP_K`` best or their mode's
+``RETENTION_MODE_TOP_N`` best, so leaderboard and rank queries only pay for
+a bounded hot table. Players are processed in batches, each in its own
+short transaction, so the job can run next to live traffic. With
+``--dry-run`` nothing is changed and the counts are only reported.
+
+Usage:
+    python -m app.retention --dry-run
+    python -m app.retention --days 30 --user-top-k 5 --mode-top-n 1000 --batch-users 500
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import DateTime, and_, delete, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from app.core.config import settings
+from app.core.database import dispose_engine, get_engine
+from app.models.sql import Score, ScoreArchive
+
+async def mode_thresholds(conn: AsyncConnection, top_n: int) -> dict[str, tuple[int, int]]:
+    """The ``(score, id)`` of each mode's ``top_n``-th best score.
+
+    Modes with fewer scores are left out: all of their scores are kept.
+    """
+    modes = (await conn.execute(select(Score.mode).distinct())).scalars().all()
+    thresholds = {}
+    for mode in modes:
+        row = (await conn.execute(
+            select(Score.score, Score.id)
+            .where(Score.mode == mode)
+            .order_by(Score.score.desc(), Score.id)
+            .offset(top_n - 1)
+            .limit(1)
+        )).first()
+        if row is not None:
+            thresholds[mode] = tuple(row)
+    return thresholds
+
+def archivable(
+    first_user: str,
+    last_user: str,
+    cutoff: datetime,
+    user_top_k: int,
+    thresholds: dict[str, tuple[int, int]]
+):
+    """Select the ids of archivable scores of users ``first_user`` .. ``last_user``."""
+    ranked = select(
+        Score.id,
+        Score.score,
+        Score.mode,
+        Score.date,
+        func.row_number().over(partition_by=Score.user_id, order_by=(Score.score.desc(), Score.id)).label("user_rank")
+    ).where(Score.user_id >= first_user, Score.user_id <= last_user).subquery()
+    # Ranked below the mode's top N in leaderboard order (score DESC, id ASC)
+    below_mode_top = or_(*(
+        and_(ranked.c.mode == mode, or_(ranked.c.score < score, and_(ranked.c.score == score, ranked.c.id > score_id)))
+        for mode, (score, score_id) in thresholds.items()
+    ))
+    return select(ranked.c.id).where(ranked.c.date < cutoff, ranked.c.user_rank > user_top_k, below_mode_top)
+
+# Ids per IN list, well under SQLite's bound parameter limit
+_CHUNK = 1000
+
+async def archive_scores(conn: AsyncConnection, ids: list[int], archived_at: datetime) -> None:
+    """Copy scores to ``scores_archive`` and delete them from ``scores``."""
+    columns = [column.name for column in Score.__table__.columns]
+    for offset in range(0, len(ids), _CHUNK):
+        chunk = ids[offset:offset + _CHUNK]
+        await conn.execute(insert(ScoreArchive).from_select(
+            [*columns, "archived_at"],
+            select(*Score.__table__.columns, literal(archived_at, DateTime)).where(Score.id.in_(chunk))
+        ))
+        await conn.execute(delete(Score).where(Score.id.in_(chunk)))
+
+async def run_retention(
+    engine: AsyncEngine,
+    days: int = settings.RETENTION_DAYS,
+    user_top_k: int = settings.RETENTION_USER_TOP_K,
+    mode_top_n: int = settings.RETENTION_MODE_TOP_N,
+    batch_users: int = 1000,
+    dry_run: bool = False,
+    now: Optional[datetime] = None,
+    progress: bool = True
+) -> tuple[int, int]:
+    """Archive old scores; return (scores archived, or archivable on a dry run, and hot scores left).
+
+    Mode thresholds are taken once at the start; scores submitted during the
+    run can only raise them, so they never cause a top-N score to move.
+    """
+    now = now or datetime.now()
+    cutoff = now - timedelta(days=days)
+    async with engine.connect() as conn:
+        hot = await conn.scalar(select(func.count()).select_from(Score))
+        thresholds = await mode_thresholds(conn, mode_top_n)
+    if progress:
+        print(f"{hot:,} hot scores; archiving scores before {cutoff:%Y-%m-%d} outside each "
+              f"player's top {user_top_k} and each mode's top {mode_top_n}{' (dry run)' if dry_run else ''}")
+
+    archived = users = 0
+    last_user = None
+    start = time.perf_counter()
+    while thresholds:
+        async with engine.begin() as conn:
+            query = select(Score.user_id).distinct().order_by(Score.user_id).limit(batch_users)
+            if last_user is not None:
+                query = query.where(Score.user_id > last_user)
+            batch = (await conn.execute(query)).scalars().all()
+            if not batch:
+                break
+            ids = (await conn.execute(archivable(batch[0], batch[-1], cutoff, user_top_k, thresholds))).scalars().all()
+            if ids and not dry_run:
+                await archive_scores(conn, ids, now)
+        last_user = batch[-1]
+        users += len(batch)
+        archived += len(ids)
+        if progress:
+            print(f"  {users:>10,} players  {archived:>12,} scores {'archivable' if dry_run else 'archived'}  "
+                  f"{archived / (time.perf_counter() - start):>10,.0f} scores/s", flush=True)
+
+    if progress:
+        print(f"{'Would archive' if dry_run else 'Archived'} {archived:,} of {hot:,} scores; {hot - archived:,} hot")
+    return archived, hot - archived
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=settings.RETENTION_DAYS, help="keep every score newer than this")
+    parser.add_argument("--user-top-k", type=int, default=settings.RETENTION_USER_TOP_K, help="best scores kept per player")
+    parser.add_argument("--mode-top-n", type=int, default=settings.RETENTION_MODE_TOP_N, help="best scores kept per mode")
+    parser.add_argument("--batch-users", type=int, default=1000, help="players per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be archived without moving anything")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await run_retention(
+                get_engine(), args.days, args.user_top_k, args.mode_top_n, args.batch_users, args.dry_run
+            )
+        finally:
+            await dispose_engine()
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,27 @@
-"""Database seeding script."""
+"""Database seeding script.
 
+Without arguments, inserts a few demo users and scores into an empty
+database. With ``--users``, generates synthetic users and scores in bulk for
+load and scale testing.
+
+Usage:
+    python -m app.seed
+    python -m app.seed --users 1000000 --scores-per-user 5 --batch-size 20000 --seed 1
+"""
+
+import argparse
 import asyncio
-from datetime import datetime
-from sqlalchemy import select
-from app.core.database import AsyncSessionLocal
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.database import dispose_engine, get_engine, get_sessionmaker
 from app.models.sql import User, Score
+from app.services import player_stats
 from app.utils.security import hash_password
 
 
@@ -12,7 +29,7 @@ from app.models.domain import GameMode
 
 async def seed_data():
     """Seed database with initial data."""
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         # Check if data exists
         result = await session.execute(select(User))
         if result.first():
@@ -62,9 +79,165 @@ async def seed_data():
         ]
         
         session.add_all(scores)
+        await session.flush()
+        conn = await session.connection()
+        await conn.run_sync(player_stats.rebuild)
         
         await session.commit()
         print("Database seeded successfully!")
 
+# Score distributions per mode: lognormal (mu, sigma) of points, in food steps of 10.
+# Pass-through games last longer since walls don't end them.
+SCORE_DISTRIBUTIONS = {
+    GameMode.WALLS: (5.4, 0.8),
+    GameMode.PASS_THROUGH: (5.9, 0.7),
+}
+MODE_WEIGHTS = {GameMode.WALLS: 0.6, GameMode.PASS_THROUGH: 0.4}
+MAX_SCORE = 99_990
+
+def generate_batch(
+    rng: random.Random,
+    tag: str,
+    start: int,
+    count: int,
+    scores_per_user: float,
+    password_hash: str,
+    now: datetime,
+    days: int
+) -> tuple[list[dict], list[dict]]:
+    """Build user and score rows for users ``start`` .. ``start + count``.
+
+    Games per user are geometric with mean ``scores_per_user``, so most
+    players have a handful of games and a few have hundreds. A user's
+    ``high_score`` and ``games_played`` match their generated scores.
+    """
+    modes = list(MODE_WEIGHTS)
+    weights = list(MODE_WEIGHTS.values())
+    span = days * 86400
+    p = 1 / (scores_per_user + 1)
+    log_keep = math.log(1 - p)
+
+    users, scores = [], []
+    for n in range(start, start + count):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        username = f"{tag}_{n}"
+        created_at = now - timedelta(seconds=rng.randrange(span))
+        games = int(math.log(1 - rng.random()) / log_keep)
+        high_score = 0
+        for mode in rng.choices(modes, weights, k=games):
+            mu, sigma = SCORE_DISTRIBUTIONS[mode]
+            score = min(MAX_SCORE, int(rng.lognormvariate(mu, sigma)) // 10 * 10)
+            high_score = max(high_score, score)
+            scores.append({
+                "user_id": user_id,
+                "username": username,
+                "score": score,
+                "mode": mode.value,
+                "date": created_at + (now - created_at) * rng.random(),
+            })
+        users.append({
+            "id": user_id,
+            "username": username,
+            "email": f"{username}@seed.example.com",
+            "password": password_hash,
+            "high_score": high_score,
+            "games_played": games,
+            "created_at": created_at,
+        })
+    return users, scores
+
+async def _copy_rows(conn, table, rows: list[dict]) -> None:
+    """Bulk load with Postgres COPY through the asyncpg connection."""
+    columns = list(rows[0])
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name, records=[tuple(row[c] for c in columns) for row in rows], columns=columns
+    )
+
+async def seed_synthetic(
+    engine: AsyncEngine,
+    users: int,
+    scores_per_user: float = 5.0,
+    batch_size: int = 10_000,
+    password: str = "password123",
+    days: int = 365,
+    tag: Optional[str] = None,
+    seed: Optional[int] = None,
+    progress: bool = True
+) -> tuple[int, int]:
+    """Insert ``users`` synthetic users and their scores; return (users, scores) inserted.
+
+    Every user shares one precomputed password hash. Rows are inserted with
+    ``executemany`` (or ``COPY`` on Postgres), committing once per batch of
+    ``batch_size`` users. ``user_stats`` is rebuilt from ``scores`` at the end.
+    """
+    rng = random.Random(seed)
+    tag = tag or f"seed{rng.getrandbits(24):06x}"
+    password_hash = hash_password(password)
+    use_copy = engine.dialect.name == "postgresql"
+    now = datetime.now()
+
+    inserted_users = inserted_scores = 0
+    start = time.perf_counter()
+    for offset in range(0, users, batch_size):
+        user_rows, score_rows = generate_batch(
+            rng, tag, offset, min(batch_size, users - offset), scores_per_user, password_hash, now, days
+        )
+        async with engine.begin() as conn:
+            for table, rows in ((User.__table__, user_rows), (Score.__table__, score_rows)):
+                if not rows:
+                    continue
+                if use_copy:
+                    await _copy_rows(conn, table, rows)
+                else:
+                    await conn.execute(insert(table), rows)
+        inserted_users += len(user_rows)
+        inserted_scores += len(score_rows)
+
+        if progress:
+            elapsed = time.perf_counter() - start
+            rows_per_second = (inserted_users + inserted_scores) / elapsed
+            print(
+                f"  {inserted_users:>10,}/{users:,} users  {inserted_scores:>12,} scores  "
+                f"{rows_per_second:>10,.0f} rows/s",
+                flush=True
+            )
+
+    # Player aggregates are maintained by the API; rebuild them for the bulk-loaded rows
+    async with engine.begin() as conn:
+        await conn.run_sync(player_stats.rebuild)
+
+    if progress:
+        elapsed = time.perf_counter() - start
+        total = inserted_users + inserted_scores
+        print(f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s), tag '{tag}'")
+    return inserted_users, inserted_scores
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, help="generate this many synthetic users (default: demo data)")
+    parser.add_argument("--scores-per-user", type=float, default=5.0, help="mean games per user")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="users per transaction")
+    parser.add_argument("--password", default="password123", help="password shared by all synthetic users")
+    parser.add_argument("--days", type=int, default=365, help="spread accounts and scores over this many days")
+    parser.add_argument("--tag", help="username prefix (random by default, so runs don't collide)")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible data")
+    args = parser.parse_args()
+
+    if args.users is None:
+        asyncio.run(seed_data())
+        return
+
+    async def run():
+        try:
+            await seed_synthetic(
+                get_engine(), args.users, args.scores_per_user, args.batch_size,
+                args.password, args.days, args.tag, args.seed
+            )
+        finally:
+            await dispose_engine()
+
+    asyncio.run(run())
+
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    main()
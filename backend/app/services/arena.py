@@ -0,0 +1,307 @@
+"""Shared-board multiplayer arena.
+
+Every snake in the arena lives on one large board. The board is an
+occupancy grid (one int per cell: empty, food, or the slot of the snake on
+it), so collision checks are a single lookup for each moving head, and a
+tick touches only the cells that change: each head, each tail that moves
+on, and the bodies of snakes that die. Cost grows with the number of snakes,
+not with its square and not with the board size.
+
+Rules: snakes move one cell per tick and die on leaving the board, on
+running into any body (their own included), or when two heads meet. A tail
+that moves away this tick is free to enter. Eating food grows the snake and
+scores ``FOOD_POINTS``; a dead snake's body turns into food. New food goes
+on a uniformly random empty cell, drawn from a free-cell index kept in step
+with the grid.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_sessionmaker
+from app.services import database as db
+from app.utils.free_cells import FreeCellIndex
+from app.models.domain import (
+    ArenaSnake, ArenaState, Direction, GameMode, Position, SessionUser
+)
+
+logger = logging.getLogger(__name__)
+
+EMPTY = 0
+FOOD = -1
+FOOD_POINTS = 10
+
+DELTAS = {
+    Direction.UP: (0, -1),
+    Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0),
+}
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
+@dataclass(slots=True)
+class Snake:
+    """A snake on the arena board; ``body`` holds cell indexes, head last."""
+    id: str
+    username: str
+    slot: int
+    body: deque[int]
+    direction: Direction
+    next_direction: Direction
+    score: int = 0
+    # Set for players' snakes, whose final score is recorded when they die
+    user: Optional[SessionUser] = None
+    joined_at: float = field(default_factory=time.time)
+
+class Arena:
+    """Board state and the tick that advances every snake at once."""
+
+    def __init__(self, width: int, height: int, food_target: int, seed: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.food_target = food_target
+        self.tick_count = 0
+        self.grid = array("i", [EMPTY]) * (width * height)
+        # Empty cells (neither food nor snake), for spawning food in O(1)
+        self.free = FreeCellIndex(width * height)
+        self.food: set[int] = set()
+        self.snakes: dict[str, Snake] = {}
+        # Grid values > 0 are 1-based slots into this list
+        self._slots: list[Optional[Snake]] = []
+        self._free_slots: list[int] = []
+        self._rng = random.Random(seed)
+        self._spawn_food(food_target)
+
+    def position(self, cell: int) -> Position:
+        return Position(x=cell % self.width, y=cell // self.width)
+
+    def spawn(
+        self,
+        snake_id: str,
+        username: str,
+        user: Optional[SessionUser] = None,
+        length: int = 3,
+        attempts: int = 100
+    ) -> Optional[Snake]:
+        """Place a new horizontal snake on a free stretch of board, or None if none was found."""
+        if snake_id in self.snakes:
+            return self.snakes[snake_id]
+        width, grid, rng = self.width, self.grid, self._rng
+        for _ in range(attempts):
+            start = self.free.choice(rng)
+            if start < 0:
+                return None
+            x, y = start % width, start // width
+            if not length <= x < width - length:
+                continue
+            # Head towards the nearer side's far edge, away from the wall behind
+            direction = Direction.RIGHT if x < width // 2 else Direction.LEFT
+            step = 1 if direction == Direction.RIGHT else -1
+            cells = [y * width + x + step * i for i in range(length)]
+            ahead = cells[-1] + step
+            if all(grid[c] == EMPTY for c in cells) and grid[ahead] == EMPTY:
+                break
+        else:
+            return None
+        return self.place(snake_id, username, cells, direction, user)
+
+    def place(
+        self,
+        snake_id: str,
+        username: str,
+        cells: list[int],
+        direction: Direction,
+        user: Optional[SessionUser] = None
+    ) -> Snake:
+        """Put a snake on the given free cells (tail first)."""
+        slot = self._free_slots.pop() if self._free_slots else len(self._slots)
+        if slot == len(self._slots):
+            self._slots.append(None)
+        snake = Snake(snake_id, username, slot, deque(cells), direction, direction, user=user)
+        self._slots[slot] = snake
+        self.snakes[snake_id] = snake
+        for cell in cells:
+            if self.grid[cell] == FOOD:
+                self.food.discard(cell)
+            else:
+                self.free.remove(cell)
+            self.grid[cell] = slot + 1
+        return snake
+
+    def turn(self, snake_id: str, direction: Direction) -> bool:
+        """Queue a direction for the next tick; reversing into the body is ignored."""
+        snake = self.snakes.get(snake_id)
+        if snake is None:
+            return False
+        if direction != OPPOSITE[snake.direction]:
+            snake.next_direction = direction
+        return True
+
+    def tick(self) -> list[Snake]:
+        """Advance every snake one cell; return the snakes that died."""
+        self.tick_count += 1
+        width, height, grid, free = self.width, self.height, self.grid, self.free
+
+        # Next head of every snake (-1 when it leaves the board) and whether it eats
+        moves = []
+        for snake in self.snakes.values():
+            snake.direction = snake.next_direction
+            dx, dy = DELTAS[snake.direction]
+            head = snake.body[-1]
+            x, y = head % width + dx, head // width + dy
+            if 0 <= x < width and 0 <= y < height:
+                cell = y * width + x
+                moves.append((snake, cell, grid[cell] == FOOD))
+            else:
+                moves.append((snake, -1, False))
+
+        # Tails move on first, so a head may follow a tail into its cell
+        for snake, cell, eats in moves:
+            if cell >= 0 and not eats:
+                tail = snake.body.popleft()
+                grid[tail] = EMPTY
+                free.add(tail)
+
+        dead: dict[str, Snake] = {}
+        heads: dict[int, Snake] = {}
+        for snake, cell, eats in moves:
+            if cell < 0 or grid[cell] > EMPTY:
+                dead[snake.id] = snake
+            elif cell in heads:
+                # Head-on: both die
+                dead[snake.id] = snake
+                dead[heads[cell].id] = heads[cell]
+            else:
+                heads[cell] = snake
+
+        for cell, snake in heads.items():
+            if snake.id in dead:
+                continue
+            if grid[cell] == FOOD:
+                snake.score += FOOD_POINTS
+                self.food.discard(cell)
+            else:
+                free.remove(cell)
+            grid[cell] = snake.slot + 1
+            snake.body.append(cell)
+
+        for snake in dead.values():
+            self._remove(snake, drop_food=True)
+        self._spawn_food(self.food_target - len(self.food))
+        return list(dead.values())
+
+    def leave(self, snake_id: str) -> Optional[Snake]:
+        """Take a snake off the board without dropping food."""
+        snake = self.snakes.get(snake_id)
+        if snake is not None:
+            self._remove(snake, drop_food=False)
+        return snake
+
+    def _remove(self, snake: Snake, drop_food: bool) -> None:
+        grid = self.grid
+        for i, cell in enumerate(snake.body):
+            if drop_food and i % 2 == 0:
+                grid[cell] = FOOD
+                self.food.add(cell)
+            else:
+                grid[cell] = EMPTY
+                self.free.add(cell)
+        del self.snakes[snake.id]
+        self._slots[snake.slot] = None
+        self._free_slots.append(snake.slot)
+
+    def _spawn_food(self, count: int) -> None:
+        """Put food on up to ``count`` uniformly random empty cells."""
+        for _ in range(count):
+            cell = self.free.choice(self._rng)
+            if cell < 0:
+                break
+            self.free.remove(cell)
+            self.grid[cell] = FOOD
+            self.food.add(cell)
+
+    def snake_state(self, snake: Snake) -> ArenaSnake:
+        return ArenaSnake(
+            id=snake.id,
+            username=snake.username,
+            score=snake.score,
+            direction=snake.direction,
+            body=[self.position(cell) for cell in snake.body]
+        )
+
+    def state(self, x: Optional[int] = None, y: Optional[int] = None, radius: Optional[int] = None) -> ArenaState:
+        """Board state; with a viewport, only snakes whose head and food within ``radius`` of (x, y)."""
+        def visible(cell: int) -> bool:
+            return radius is None or (
+                abs(cell % self.width - x) <= radius and abs(cell // self.width - y) <= radius
+            )
+        return ArenaState(
+            width=self.width,
+            height=self.height,
+            tick=self.tick_count,
+            snakes=[self.snake_state(s) for s in self.snakes.values() if visible(s.body[-1])],
+            food=[self.position(cell) for cell in self.food if visible(cell)]
+        )
+
+# The arena, created on first use
+arena: Optional[Arena] = None
+# Score recording tasks for dead players' snakes
+_recording: set[asyncio.Task] = set()
+
+def get_arena() -> Arena:
+    global arena
+    if arena is None:
+        arena = Arena(settings.ARENA_WIDTH, settings.ARENA_HEIGHT, settings.ARENA_FOOD)
+    return arena
+
+def join(user: SessionUser) -> Optional[Snake]:
+    """Spawn the user's snake (or return the one already playing); None if the arena is full."""
+    board = get_arena()
+    if user.id not in board.snakes and len(board.snakes) >= settings.ARENA_MAX_SNAKES:
+        return None
+    return board.spawn(user.id, user.username, user=user)
+
+async def record_scores(session: AsyncSession, snakes: list[Snake]) -> None:
+    """Record the final scores of players' snakes as arena games."""
+    for snake in snakes:
+        if snake.user is None:
+            continue
+        try:
+            await db.submit_score(session, snake.user, snake.score, GameMode.ARENA)
+        except Exception:
+            logger.exception("Failed to record arena score for %s", snake.user.id)
+            await session.rollback()
+
+async def _record_in_background(snakes: list[Snake]) -> None:
+    async with get_sessionmaker()() as session:
+        await record_scores(session, snakes)
+
+async def run(interval: float) -> None:
+    """Tick the arena every ``interval`` seconds until cancelled."""
+    board = get_arena()
+    deadline = time.monotonic()
+    while True:
+        deadline += interval
+        dead = board.tick()
+        if any(snake.user is not None for snake in dead):
+            task = asyncio.create_task(_record_in_background(dead))
+            _recording.add(task)
+            task.add_done_callback(_recording.discard)
+        delay = deadline - time.monotonic()
+        if delay < 0:
+            # Fell behind; skip the missed ticks rather than bursting to catch up
+            deadline = time.monotonic()
+            delay = 0
+        await asyncio.sleep(delay)
@@ -0,0 +1,327 @@
+"""Server-side bot players for the Live view.
+
+Each bot plays an ordinary single-player game on its own board, under the
+frontend's rules (10 points per food, a little faster every 50 points,
+death on its own body and, in walls mode, on the edge), and its state is
+published to ``active_players`` so spectators watch real games.
+
+Pathing follows a distance field: the BFS distance from every free cell to
+the food, with the snake's body as walls. The bot steps to the free
+neighbour with the lowest distance, after a flood fill bounded by its
+length checks the step does not seal it into a pocket too small to live
+in; if it would, the bot takes the roomiest neighbour instead. The field
+is kept between moves instead of being rebuilt for each one. Walking down
+it leaves the rest of the path valid, and the cell freed by the tail is
+patched in by relaxing distances outwards from it. The field is only
+rebuilt when the food moves or the path ahead turns out to be blocked,
+about once per food eaten. Neighbour tables depend only on the board size
+and mode, so every bot shares them.
+
+All bots run in one background task. It wakes every ``BOT_TICK_SECONDS``,
+moves the bots that are due and stops once ``BOT_BUDGET_SECONDS`` is
+spent. Bots left over move first on the next wake, so an overloaded loop
+slows the bots down rather than the requests. Move counts and the time
+spent on them are exported as metrics; their ratio is the CPU cost of one
+bot per tick.
+"""
+
+import asyncio
+import random
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+from app.core import event_bus, metrics
+from app.models.domain import ActivePlayer, Direction, GameMode, GameState, GameStatus, Position
+from app.services import database as db
+from app.utils.free_cells import FreeCellIndex
+
+BOT_PREFIX = "bot-"
+NAMES = ("Slither", "Noodle", "Viper", "Zigzag", "Mamba", "Wiggles", "Cobra", "Sidewinder")
+
+FOOD_POINTS = 10
+# Milliseconds per move, as in the frontend
+INITIAL_SPEED = 150
+MIN_SPEED = 50
+UNREACHABLE = 1 << 30
+
+# Order of the entries in each neighbour table row
+DIRECTIONS = (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT)
+
+BOT_MOVES = metrics.registry.register(metrics.Counter(
+    "snake_bot_moves_total", "Moves made by bot players."
+))
+BOT_MOVE_SECONDS = metrics.registry.register(metrics.Counter(
+    "snake_bot_move_seconds_total", "Event loop time spent moving bot players."
+))
+BOT_DEFERRED = metrics.registry.register(metrics.Counter(
+    "snake_bot_deferred_total", "Bot moves postponed to the next wake by the time budget."
+))
+
+@lru_cache(maxsize=None)
+def _neighbours(width: int, height: int, wrap: bool) -> tuple[tuple[int, ...], ...]:
+    """For every cell, the cells above, below, left and right of it (-1 off the board)."""
+    table = []
+    for cell in range(width * height):
+        x, y = cell % width, cell // width
+        row = []
+        for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+            nx, ny = x + dx, y + dy
+            if wrap:
+                nx, ny = nx % width, ny % height
+            row.append(ny * width + nx if 0 <= nx < width and 0 <= ny < height else -1)
+        table.append(tuple(row))
+    return tuple(table)
+
+class BotGame:
+    """One bot's board, snake and distance field."""
+
+    def __init__(self, bot_id: str, username: str, mode: GameMode, size: int, rng: random.Random):
+        self.id = bot_id
+        self.username = username
+        self.mode = mode
+        self.size = size
+        self.neighbours = _neighbours(size, size, mode == GameMode.PASS_THROUGH)
+        self.occupied = bytearray(size * size)
+        self.distance = array("i", [UNREACHABLE]) * (size * size)
+        self._unreached = array("i", [UNREACHABLE]) * (size * size)
+        self._rng = rng
+        self.rebuilds = 0
+        self.due = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new game: a length-3 snake in the middle heading right, as in the frontend."""
+        size = self.size
+        self.occupied[:] = bytes(size * size)
+        self.free = FreeCellIndex(size * size)
+        middle = (size // 2) * size + size // 2
+        # Cell indexes, head last
+        self.body = deque([middle - 2, middle - 1, middle])
+        for cell in self.body:
+            self.occupied[cell] = 1
+            self.free.remove(cell)
+        self.direction = Direction.RIGHT
+        self.score = 0
+        self.speed = INITIAL_SPEED
+        self.status = GameStatus.PLAYING
+        self.started_at = datetime.now()
+        self.food = self._place_food()
+        # Food the distance field leads to, and the distance at the head
+        self._field_food = -1
+        self._current = UNREACHABLE
+
+    def _place_food(self) -> int:
+        """A random free cell, or -1 when the snake fills the board."""
+        return self.free.choice(self._rng)
+
+    def _build_field(self) -> None:
+        distance, occupied, neighbours = self.distance, self.occupied, self.neighbours
+        distance[:] = self._unreached
+        distance[self.food] = 0
+        frontier, steps = [self.food], 0
+        while frontier:
+            steps += 1
+            reached = []
+            for cell in frontier:
+                for n in neighbours[cell]:
+                    if n >= 0 and not occupied[n] and distance[n] == UNREACHABLE:
+                        distance[n] = steps
+                        reached.append(n)
+            frontier = reached
+        self._field_food = self.food
+        self._current = UNREACHABLE
+        self.rebuilds += 1
+
+    def _relax(self, cell: int) -> None:
+        """Update distances for a cell that just became free, and around it."""
+        distance, occupied, neighbours = self.distance, self.occupied, self.neighbours
+        nearest = min((distance[n] for n in neighbours[cell] if n >= 0 and not occupied[n]), default=UNREACHABLE)
+        if nearest + 1 >= distance[cell]:
+            return
+        distance[cell] = nearest + 1
+        queue = deque([cell])
+        while queue:
+            c = queue.popleft()
+            steps = distance[c] + 1
+            for n in neighbours[c]:
+                if n >= 0 and not occupied[n] and distance[n] > steps:
+                    distance[n] = steps
+                    queue.append(n)
+
+    def _room(self, start: int, need: int) -> int:
+        """Free cells reachable from ``start`` (counted up to ``need``)."""
+        occupied, neighbours = self.occupied, self.neighbours
+        seen = {start}
+        stack = [start]
+        while stack and len(seen) < need:
+            for n in neighbours[stack.pop()]:
+                if n >= 0 and not occupied[n] and n not in seen:
+                    seen.add(n)
+                    stack.append(n)
+        return len(seen)
+
+    def _closest(self) -> tuple[int, int]:
+        """Free neighbour of the head with the lowest distance, and that distance."""
+        distance, occupied = self.distance, self.occupied
+        best, best_distance = -1, UNREACHABLE
+        for n in self.neighbours[self.body[-1]]:
+            if n >= 0 and not occupied[n] and distance[n] < best_distance:
+                best, best_distance = n, distance[n]
+        return best, best_distance
+
+    def _choose(self) -> int:
+        """Next cell for the head, or -1 when every neighbour is blocked."""
+        if self._field_food != self.food:
+            self._build_field()
+        cell, steps = self._closest()
+        if steps >= self._current < UNREACHABLE:
+            # The path being followed stopped going down: the field is stale there
+            self._build_field()
+            cell, steps = self._closest()
+        need = len(self.body)
+        if cell >= 0 and self._room(cell, need) >= need:
+            return cell
+        # Food unreachable or the way there is a trap: take the roomiest
+        # neighbour, preferring the one closer to the food
+        best, best_key = -1, None
+        for n in self.neighbours[self.body[-1]]:
+            if n >= 0 and not self.occupied[n]:
+                key = (self._room(n, need), -self.distance[n])
+                if best_key is None or key > best_key:
+                    best, best_key = n, key
+        return best
+
+    def step(self) -> bool:
+        """Make the bot's next move; return False if the game ended with it."""
+        cell = self._choose()
+        if cell < 0:
+            self.status = GameStatus.GAME_OVER
+            return False
+        body = self.body
+        self.direction = DIRECTIONS[self.neighbours[body[-1]].index(cell)]
+        self._current = self.distance[cell]
+        # The head's cell is a wall until the tail leaves it
+        self.distance[cell] = UNREACHABLE
+        self.occupied[cell] = 1
+        self.free.remove(cell)
+        body.append(cell)
+        if cell == self.food:
+            self.score += FOOD_POINTS
+            if self.score % 50 == 0 and self.speed > MIN_SPEED:
+                self.speed -= 10
+            self.food = self._place_food()
+            if self.food < 0:
+                self.status = GameStatus.GAME_OVER
+                return False
+        else:
+            tail = body.popleft()
+            self.occupied[tail] = 0
+            self.free.add(tail)
+            self._relax(tail)
+        return True
+
+    def advance(self, now: float) -> None:
+        """Make the move due at ``now`` (starting over if it ends the game) and schedule the next."""
+        if not self.step():
+            self.reset()
+        self.due += self.speed / 1000
+        if self.due <= now:
+            # Fell behind; resume from now rather than moving in bursts
+            self.due = now + self.speed / 1000
+
+    def player(self) -> ActivePlayer:
+        size = self.size
+        state = GameState(
+            snake=[Position(x=cell % size, y=cell // size) for cell in reversed(self.body)],
+            food=Position(x=self.food % size, y=self.food // size),
+            direction=self.direction,
+            score=self.score,
+            status=self.status,
+            mode=self.mode,
+            speed=self.speed
+        )
+        return ActivePlayer(
+            id=self.id,
+            username=self.username,
+            currentScore=self.score,
+            mode=self.mode,
+            gameState=state,
+            startedAt=self.started_at
+        )
+
+# Bot games, created by start()
+games: list[BotGame] = []
+# Where the next wake starts, so bots deferred by the budget move first
+_next = 0
+
+def roster(count: int) -> list[tuple[str, str, GameMode]]:
+    """Id, username and mode of ``count`` bots, alternating walls and pass-through."""
+    modes = (GameMode.WALLS, GameMode.PASS_THROUGH)
+    return [
+        (f"{BOT_PREFIX}{n}", f"{NAMES[n % len(NAMES)]}Bot{n // len(NAMES) or ''}", modes[n % len(modes)])
+        for n in range(count)
+    ]
+
+def start(count: int, size: int, seed: Optional[int] = None) -> list[BotGame]:
+    """Create ``count`` bot games."""
+    global _next
+    rng = random.Random(seed)
+    games[:] = [BotGame(*player, size, rng) for player in roster(count)]
+    _next = 0
+    return games
+
+def move_due(now: float, budget: float) -> tuple[int, int]:
+    """Move the bots due at ``now`` until ``budget`` seconds are spent; return (moved, deferred).
+
+    At least one bot moves per call, however small the budget.
+    """
+    global _next
+    count = len(games)
+    start_at = time.perf_counter()
+    deadline = start_at + budget
+    moved = deferred = 0
+    for k in range(count):
+        game = games[(_next + k) % count]
+        if game.due > now:
+            continue
+        if moved and time.perf_counter() >= deadline:
+            deferred = sum(1 for j in range(k, count) if games[(_next + j) % count].due <= now)
+            _next = (_next + k) % count
+            break
+        game.advance(now)
+        moved += 1
+    BOT_MOVES.inc(amount=moved)
+    BOT_MOVE_SECONDS.inc(amount=time.perf_counter() - start_at)
+    BOT_DEFERRED.inc(amount=deferred)
+    return moved, deferred
+
+def publish() -> None:
+    """Replace the bots' entries in ``active_players`` with their current games.
+
+    With the event bus enabled, the games are also sent to the other workers.
+    """
+    bots = [game.player() for game in games]
+    players = [player for player in db.active_players if not player.id.startswith(BOT_PREFIX)]
+    db.active_players[:] = players + bots
+    if event_bus.bus is not None:
+        event_bus.publish("players", [player.model_dump(mode="json") for player in bots])
+
+async def run(count: int, size: int, interval: float, budget: float, publish_interval: float) -> None:
+    """Play ``count`` bot games until cancelled."""
+    start(count, size)
+    publish()
+    published = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            move_due(now, budget)
+            if now - published >= publish_interval:
+                publish()
+                published = now
+    finally:
+        games.clear()
+        publish()
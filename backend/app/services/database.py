@@ -1,55 +1,131 @@
 """Database service."""
 
-from datetime import datetime
-from typing import Optional
-from sqlalchemy import select, desc, func
+import asyncio
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+from sqlalchemy import select, update, desc, func, and_, or_, case
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.utils.security import hash_password
+from app.utils.security import hash_password_async
+from app.utils import tokens
+from app.utils.cache import TTLCache
+from app.utils.bloom import BloomFilter
+from app.utils.prefix_index import PrefixIndex
+from app.utils.free_cells import FreeCellIndex
+from app.core import event_bus, metrics
+from app.core.config import settings
+from app.services import percentiles, player_stats
 
 from app.models.domain import (
-    User, LeaderboardEntry, ActivePlayer, GameState, 
+    User, SessionUser, LeaderboardEntry, PlayerMatch, PlayerStats, ModeStats, GameRecord,
+    ActivePlayer, GameState, 
     Position, Direction, GameMode, GameStatus
 )
-from app.models.sql import User as DBUser, Score as DBScore
+from app.models.sql import User as DBUser, Score as DBScore, ScoreArchive, UserStats, UserModeStats
+import base64
 import random
+import re
+import time
 
 # In-memory storage for active players (ephemeral game state)
 active_players: list[ActivePlayer] = []
 
+# Live players reported by other workers over the event bus: worker -> (received at, players)
+remote_players: dict[str, tuple[float, list[ActivePlayer]]] = {}
+
 # In-memory session storage (token -> user_id)
 sessions: dict[str, str] = {}
 
+metrics.registry.register(metrics.Gauge(
+    "snake_sessions", "Number of active login sessions.", lambda: len(sessions)
+))
+metrics.registry.register(metrics.Gauge(
+    "snake_active_players", "Number of players currently in a live game.", lambda: len(active_players)
+))
+
+# Recently submitted scores by (user_id, idempotency_key), so client retries
+# are answered without touching the database
+submitted_scores: TTLCache[LeaderboardEntry] = TTLCache(
+    settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS
+)
+
+_GAME_MODES = {m.value: m for m in GameMode}
+
+# Trusted constructor for user rows read from our own table. The schema
+# already guarantees types and formats, so this skips pydantic validation
+# (EmailStr checks, alias handling, datetime coercion); request input is still
+# validated by the API schemas.
+def _user_from_row(db_user: DBUser) -> User:
+    return User.model_construct(
+        id=db_user.id,
+        username=db_user.username,
+        email=db_user.email,
+        password=db_user.password,
+        high_score=db_user.high_score,
+        games_played=db_user.games_played,
+        created_at=db_user.created_at
+    )
+
 # Database operations
+def _signed_sessions() -> bool:
+    return settings.SESSION_MODE == "signed"
+
+async def get_session_user(db: AsyncSession, token: str) -> Optional[SessionUser | User]:
+    """Identify the user behind a session token.
+
+    With signed sessions this is a signature check with no storage access;
+    otherwise it resolves the in-memory session and loads the user.
+    """
+    if _signed_sessions():
+        claims = tokens.verify_session(token)
+        if claims is None:
+            return None
+        return SessionUser(id=claims.user_id, username=claims.username)
+    return await get_user_by_session_token(db, token)
+
+def session_user_id(token: str) -> Optional[str]:
+    """User id of a valid session token, without touching the database."""
+    if _signed_sessions():
+        claims = tokens.verify_session(token)
+        return claims.user_id if claims else None
+    return sessions.get(token)
+
 async def get_user_by_session_token(db: AsyncSession, token: str) -> Optional[User]:
     """Get user by session token."""
-    user_id = sessions.get(token)
+    user_id = session_user_id(token)
     if not user_id:
         return None
         
     result = await db.execute(select(DBUser).where(DBUser.id == user_id))
     db_user = result.scalar_one_or_none()
     if db_user:
-        return User.model_validate(db_user)
+        return _user_from_row(db_user)
     return None
 
-async def create_session(user_id: str) -> str:
+async def create_session(user_id: str, username: str) -> str:
     """Create a new session for user."""
+    if _signed_sessions():
+        return tokens.sign_session(user_id, username)
     import uuid
     token = str(uuid.uuid4())
     sessions[token] = user_id
+    event_bus.publish("session", {"token": token, "userId": user_id})
     return token
 
 async def delete_session(token: str) -> None:
     """Delete a session."""
-    if token in sessions:
+    if _signed_sessions():
+        tokens.revoke_session(token)
+    elif token in sessions:
         del sessions[token]
+    event_bus.publish("logout", {"token": token})
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get user by email."""
     result = await db.execute(select(DBUser).where(DBUser.email == email))
     db_user = result.scalar_one_or_none()
     if db_user:
-        return User.model_validate(db_user)
+        return _user_from_row(db_user)
     return None
 
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
@@ -57,18 +133,44 @@ async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User
     result = await db.execute(select(DBUser).where(DBUser.username == username))
     db_user = result.scalar_one_or_none()
     if db_user:
-        return User.model_validate(db_user)
+        return _user_from_row(db_user)
     return None
 
+class UserExistsError(ValueError):
+    """Signup conflicted with an existing email or username."""
+
+# How the drivers name a violation of the unique email index: SQLite reports the column,
+# Postgres the index (or the constraint, on databases created without our migrations)
+_EMAIL_CONSTRAINTS = {"users.email", "ix_users_email", "users_email_key"}
+_CONSTRAINT = re.compile(r'UNIQUE constraint failed: ([\w.]+)|unique constraint "([^"]+)"')
+
+def _violated_constraint(exc: IntegrityError) -> Optional[str]:
+    # asyncpg's error, wrapped by the SQLAlchemy adapter, carries the name itself
+    for error in (exc.orig, getattr(exc.orig, "__cause__", None)):
+        name = getattr(error, "constraint_name", None)
+        if name:
+            return name
+    match = _CONSTRAINT.search(str(exc.orig))
+    return match and (match.group(1) or match.group(2))
+
+def _conflict_message(exc: IntegrityError) -> str:
+    # Only the constraint name: the message itself may quote the conflicting username
+    if _violated_constraint(exc) in _EMAIL_CONSTRAINTS:
+        return "Email already exists"
+    return "Username already taken"
+
 async def create_user(db: AsyncSession, email: str, username: str, password: str) -> User:
-    """Create a new user."""
-    # Generate a simple ID (in production, use UUID or let DB handle it)
-    # For SQLite/Postgres with string ID, we can use UUID
+    """Create a new user with a single insert.
+
+    Duplicates are detected by the unique indexes on email and username
+    rather than by looking them up first, so there is no window between
+    check and insert; a conflict raises ``UserExistsError``.
+    """
     import uuid
     user_id = str(uuid.uuid4())
     
     # Hash the password before storing
-    hashed_pw = hash_password(password)
+    hashed_pw = await hash_password_async(password)
     db_user = DBUser(
         id=user_id,
         username=username,
@@ -78,42 +180,278 @@ async def create_user(db: AsyncSession, email: str, username: str, password: str
         games_played=0,
         created_at=datetime.now()
     )
+    user = _user_from_row(db_user)
     db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return User.model_validate(db_user)
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise UserExistsError(_conflict_message(exc)) from exc
+
+    _remember_username(username)
+    _index_player(user_id, username, 0)
+    event_bus.publish("user", {"id": user_id, "username": username})
+    return user
+
+# Usernames seen by this process, for availability checks without a query.
+# Built lazily from the users table; names taken through other workers arrive
+# over the event bus when it is enabled, and otherwise only once this process
+# reloads, so a negative answer is confirmed by signup itself.
+username_filter: Optional[BloomFilter] = None
+_usernames_added_while_loading: Optional[list[str]] = None
+_username_filter_lock = asyncio.Lock()
+
+def _remember_username(username: str) -> None:
+    if username_filter is not None:
+        username_filter.add(username)
+    elif _usernames_added_while_loading is not None:
+        _usernames_added_while_loading.append(username)
+
+async def _ensure_username_filter(db: AsyncSession) -> BloomFilter:
+    global username_filter, _usernames_added_while_loading
+    if username_filter is not None:
+        return username_filter
+
+    async with _username_filter_lock:
+        if username_filter is not None:
+            return username_filter
+        _usernames_added_while_loading = added = []
+        try:
+            count = (await db.execute(select(func.count()).select_from(DBUser))).scalar_one()
+            bloom = BloomFilter(max(settings.USERNAME_FILTER_CAPACITY, 2 * count))
+            result = await db.stream(select(DBUser.username).execution_options(yield_per=10_000))
+            async for usernames in result.scalars().partitions():
+                bloom.update(usernames)
+            bloom.update(added)
+            username_filter = bloom
+        finally:
+            _usernames_added_while_loading = None
+    return bloom
+
+async def is_username_available(db: AsyncSession, username: str) -> bool:
+    """Check whether a username is free.
+
+    Names the Bloom filter has never seen are answered from memory; possible
+    matches (taken, or a false positive) are confirmed with an indexed lookup.
+    """
+    bloom = await _ensure_username_filter(db)
+    if username not in bloom:
+        return True
+    return await get_user_by_username(db, username) is None
+
+# Prefix index for player search, built lazily from the users table and
+# kept current on signup and high score changes made through this process
+# (and through other workers, over the event bus)
+player_index: Optional[PrefixIndex] = None
+_players_indexed_while_loading: Optional[list[tuple[str, str, int]]] = None
+_player_index_lock = asyncio.Lock()
 
-async def get_leaderboard(db: AsyncSession, mode: Optional[GameMode] = None) -> list[LeaderboardEntry]:
-    """Get leaderboard entries, optionally filtered by mode."""
-    query = select(DBScore).order_by(desc(DBScore.score)).limit(10)
+def _index_player(user_id: str, username: str, high_score: int) -> None:
+    if player_index is not None:
+        player_index.add(user_id, username, high_score)
+    elif _players_indexed_while_loading is not None:
+        _players_indexed_while_loading.append((user_id, username, high_score))
+
+async def _ensure_player_index(db: AsyncSession) -> PrefixIndex:
+    global player_index, _players_indexed_while_loading
+    if player_index is not None:
+        return player_index
+
+    async with _player_index_lock:
+        if player_index is not None:
+            return player_index
+        _players_indexed_while_loading = added = []
+        try:
+            players: list[tuple[str, str, int]] = []
+            result = await db.stream(
+                select(DBUser.id, DBUser.username, DBUser.high_score).execution_options(yield_per=10_000)
+            )
+            async for rows in result.partitions():
+                players.extend(tuple(row) for row in rows)
+            index = PrefixIndex()
+            index.load(players)
+            for user_id, username, high_score in added:
+                index.add(user_id, username, high_score)
+            player_index = index
+        finally:
+            _players_indexed_while_loading = None
+    return index
+
+async def warm_indexes(db: AsyncSession) -> None:
+    """Build the username filter and player index now, unless a snapshot restored them.
+
+    Called on startup so the first signup check or search does not pay for
+    the build; the lazy path stays as a fallback if this fails.
+    """
+    await _ensure_username_filter(db)
+    await _ensure_player_index(db)
+
+async def search_players(db: AsyncSession, query: str, limit: int = 10) -> list[PlayerMatch]:
+    """Players whose username starts with ``query`` (case-insensitive), best high score first."""
+    index = await _ensure_player_index(db)
+    return [
+        PlayerMatch(id=player_id, username=username, highScore=high_score)
+        for player_id, username, high_score in index.search(query, limit)
+    ]
+
+def encode_leaderboard_cursor(entry: LeaderboardEntry) -> str:
+    """Encode the keyset position of a leaderboard entry as an opaque cursor."""
+    raw = f"{entry.score}:{entry.id}:{entry.rank}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_leaderboard_cursor(cursor: str) -> tuple[int, int, int]:
+    """Decode a leaderboard cursor into (score, score_id, rank).
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, score_id, rank = base64.urlsafe_b64decode(padded).decode().split(":")
+        return int(score), int(score_id), int(rank)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def _to_leaderboard_entry(score: DBScore, rank: int, percentile: Optional[float] = None) -> LeaderboardEntry:
+    # Validating these scalar fields is cheaper than model_construct; the
+    # per-row cost was the strftime call and rebuilding the mode list.
+    return LeaderboardEntry(
+        id=str(score.id),
+        username=score.username,
+        score=score.score,
+        mode=_GAME_MODES.get(score.mode, GameMode.WALLS),
+        date=score.date.date().isoformat(),
+        rank=rank,
+        percentile=percentile
+    )
+
+def _after(score: int, score_id: int):
+    """Rows ranked strictly below (score, score_id) in leaderboard order.
+
+    Leaderboard order is score DESC, id ASC. The leading ``score <=`` term
+    gives the planner an index range on (score DESC, id) instead of an OR scan.
+    """
+    return and_(
+        DBScore.score <= score,
+        or_(DBScore.score < score, DBScore.id > score_id)
+    )
+
+def _before(score: int, score_id: int):
+    """Rows ranked strictly above (score, score_id) in leaderboard order."""
+    return and_(
+        DBScore.score >= score,
+        or_(DBScore.score > score, DBScore.id < score_id)
+    )
+
+async def get_leaderboard(
+    db: AsyncSession,
+    mode: Optional[GameMode] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    around_user: Optional[str] = None
+) -> list[LeaderboardEntry]:
+    """Get leaderboard entries, optionally filtered by mode.
+
+    Pages are keyset-based on (score, id) so deep pages cost the same as the
+    first one. ``cursor`` continues after the last entry of a previous page
+    (see ``encode_leaderboard_cursor``); ``around_user`` centres the page on
+    that user's best score instead.
+    """
+    if around_user is not None:
+        return await _get_leaderboard_around(db, mode, limit, around_user)
+
+    query = select(DBScore).order_by(desc(DBScore.score), DBScore.id).limit(limit)
     
     if mode:
         query = query.where(DBScore.mode == mode)
+
+    start_rank = 0
+    if cursor:
+        score, score_id, start_rank = decode_leaderboard_cursor(cursor)
+        query = query.where(_after(score, score_id))
         
     result = await db.execute(query)
     scores = result.scalars().all()
     
-    entries = []
-    for i, score in enumerate(scores):
-        entries.append(LeaderboardEntry(
-            id=str(score.id),
-            username=score.username,
-            score=score.score,
-            mode=GameMode(score.mode) if score.mode in [m.value for m in GameMode] else GameMode.WALLS,
-            date=score.date.strftime('%Y-%m-%d'),
-            rank=i + 1
-        ))
-    return entries
+    return [_to_leaderboard_entry(score, start_rank + i + 1) for i, score in enumerate(scores)]
+
+async def _get_leaderboard_around(
+    db: AsyncSession,
+    mode: Optional[GameMode],
+    limit: int,
+    user_id: str
+) -> list[LeaderboardEntry]:
+    """Get a page of the leaderboard centred on a user's best score."""
+    mode_filter = [DBScore.mode == mode] if mode else []
+
+    result = await db.execute(
+        select(DBScore)
+        .where(DBScore.user_id == user_id, *mode_filter)
+        .order_by(desc(DBScore.score), DBScore.id)
+        .limit(1)
+    )
+    pivot = result.scalar_one_or_none()
+    if pivot is None:
+        return []
+
+    # Counting over the (score, id) index is the one unavoidable linear step;
+    # it never materialises rows the way OFFSET does.
+    rank_result = await db.execute(
+        select(func.count()).select_from(DBScore)
+        .where(_before(pivot.score, pivot.id), *mode_filter)
+    )
+    pivot_rank = rank_result.scalar_one() + 1
+
+    result = await db.execute(
+        select(DBScore)
+        .where(_before(pivot.score, pivot.id), *mode_filter)
+        .order_by(DBScore.score, desc(DBScore.id))
+        .limit((limit - 1) // 2)
+    )
+    above = list(reversed(result.scalars().all()))
+
+    result = await db.execute(
+        select(DBScore)
+        .where(_after(pivot.score, pivot.id), *mode_filter)
+        .order_by(desc(DBScore.score), DBScore.id)
+        .limit(limit - len(above) - 1)
+    )
+    below = result.scalars().all()
+
+    first_rank = pivot_rank - len(above)
+    return [
+        _to_leaderboard_entry(score, first_rank + i)
+        for i, score in enumerate([*above, pivot, *below])
+    ]
+
+async def submit_score(
+    db: AsyncSession,
+    user: SessionUser | User,
+    score: int,
+    mode: GameMode,
+    idempotency_key: Optional[str] = None
+) -> LeaderboardEntry:
+    """Submit a score to the leaderboard.
+
+    With an ``idempotency_key``, a retry of an already recorded submission
+    returns the original entry instead of inserting another score. Recent
+    keys are answered from ``submitted_scores``; older ones are caught by the
+    unique (user_id, idempotency_key) index. The entry's ``percentile`` is
+    the share of earlier scores in the same mode that this one beats.
+    """
+    if idempotency_key:
+        cached = submitted_scores.get((user.id, idempotency_key))
+        if cached is not None:
+            return cached
+    await percentiles.ensure_loaded(db)
 
-async def submit_score(db: AsyncSession, user: User, score: int, mode: GameMode) -> LeaderboardEntry:
-    """Submit a score to the leaderboard."""
     # Create score entry
     db_score = DBScore(
         user_id=user.id,
         username=user.username,
         score=score,
         mode=mode,
-        date=datetime.now()
+        date=datetime.now(),
+        idempotency_key=idempotency_key
     )
     db.add(db_score)
     
@@ -126,36 +464,270 @@ async def submit_score(db: AsyncSession, user: User, score: int, mode: GameMode)
         db_user.high_score = score
     
     db_user.games_played += 1
+    await player_stats.record(db, user.id, [(score, mode)], db_score.date)
     
-    await db.commit()
-    await db.refresh(db_score)
+    try:
+        await db.commit()
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        # Already recorded (e.g. by another worker); the rollback also undoes the stats update
+        await db.rollback()
+        result = await db.execute(
+            select(DBScore).where(DBScore.user_id == user.id, DBScore.idempotency_key == idempotency_key)
+        )
+        db_score = result.scalar_one()
+        percentile = percentiles.percentile_rank(db_score.mode, db_score.score)
+    else:
+        await db.refresh(db_score)
+        _index_player(user.id, user.username, score)
+        event_bus.publish("score", {"userId": user.id, "username": user.username, "mode": mode, "score": score})
+        percentile = percentiles.percentile_rank(mode, score)
+        percentiles.record(mode, score)
     
     # Calculate rank (simplified, just count how many scores are higher)
     # For a real leaderboard, we might want a separate query or cache
     rank_result = await db.execute(
-        select(func.count()).select_from(DBScore).where(DBScore.score > score)
+        select(func.count()).select_from(DBScore).where(DBScore.score > db_score.score)
     )
     rank = rank_result.scalar_one() + 1
     
-    return LeaderboardEntry(
-        id=str(db_score.id),
-        username=db_score.username,
-        score=db_score.score,
-        mode=mode,
-        date=db_score.date.strftime('%Y-%m-%d'),
-        rank=rank
+    entry = _to_leaderboard_entry(db_score, rank, percentile)
+    if idempotency_key:
+        submitted_scores.set((user.id, idempotency_key), entry)
+    return entry
+
+async def submit_scores(
+    db: AsyncSession,
+    user: SessionUser | User,
+    submissions: list[tuple[int, GameMode, Optional[str]]]
+) -> list[LeaderboardEntry]:
+    """Submit several ``(score, mode, idempotency_key)`` results for one user.
+
+    Same semantics as ``submit_score`` for each item, but new scores are
+    inserted in one transaction, the user's stats are updated with a single
+    aggregated statement and all ranks come from one query. Items repeating
+    an already recorded (or earlier in the batch) key return that entry.
+    Percentiles are relative to the scores recorded before the batch.
+    """
+    await percentiles.ensure_loaded(db)
+    entries: list[Optional[LeaderboardEntry]] = [None] * len(submissions)
+    rows: dict[int, DBScore] = {}
+
+    # Resolve keys already recorded, from the cache first and then the database
+    keys = {key for _, _, key in submissions if key}
+    recorded: dict[str, DBScore | LeaderboardEntry] = {}
+    for key in keys:
+        cached = submitted_scores.get((user.id, key))
+        if cached is not None:
+            recorded[key] = cached
+    missing = keys - recorded.keys()
+    if missing:
+        result = await db.execute(
+            select(DBScore).where(DBScore.user_id == user.id, DBScore.idempotency_key.in_(missing))
+        )
+        recorded.update((row.idempotency_key, row) for row in result.scalars())
+
+    new_rows: dict[str, DBScore] = {}
+    inserted: list[DBScore] = []
+    now = datetime.now()
+    for i, (score, mode, key) in enumerate(submissions):
+        existing = recorded.get(key) if key else None
+        if isinstance(existing, LeaderboardEntry):
+            entries[i] = existing
+            continue
+        if existing is None and key in new_rows:
+            existing = new_rows[key]
+        if existing is None:
+            existing = DBScore(
+                user_id=user.id,
+                username=user.username,
+                score=score,
+                mode=mode,
+                date=now,
+                idempotency_key=key
+            )
+            inserted.append(existing)
+            if key:
+                new_rows[key] = existing
+        rows[i] = existing
+
+    if inserted:
+        db.add_all(inserted)
+        try:
+            await db.flush()
+        except IntegrityError:
+            # A key was recorded concurrently; fall back to one submission at a time
+            await db.rollback()
+            return [await submit_score(db, user, score, mode, key) for score, mode, key in submissions]
+        best = max(row.score for row in inserted)
+        await db.execute(
+            update(DBUser)
+            .where(DBUser.id == user.id)
+            .values(
+                high_score=case((DBUser.high_score < best, best), else_=DBUser.high_score),
+                games_played=DBUser.games_played + len(inserted)
+            )
+        )
+        await player_stats.record(db, user.id, [(row.score, row.mode) for row in inserted], now)
+
+    # Rank every distinct score in one round trip, within the same transaction
+    if rows:
+        distinct = sorted({row.score for row in rows.values()})
+        counts = (await db.execute(select(*(
+            select(func.count()).select_from(DBScore).where(DBScore.score > score).scalar_subquery()
+            for score in distinct
+        )))).one()
+        ranks = {score: count + 1 for score, count in zip(distinct, counts)}
+        for i, row in rows.items():
+            entries[i] = _to_leaderboard_entry(
+                row, ranks[row.score], percentiles.percentile_rank(row.mode, row.score)
+            )
+
+    if inserted:
+        # Read before the commit expires the rows
+        new_scores = [(row.mode, row.score) for row in inserted]
+        await db.commit()
+        _index_player(user.id, user.username, best)
+        for mode, score in new_scores:
+            percentiles.record(mode, score)
+            event_bus.publish("score", {"userId": user.id, "username": user.username, "mode": mode, "score": score})
+    for entry, (_, _, key) in zip(entries, submissions):
+        if key:
+            submitted_scores.set((user.id, key), entry)
+
+    return entries
+
+def encode_history_cursor(game: GameRecord) -> str:
+    """Encode the keyset position of a history entry as an opaque cursor."""
+    raw = f"{game.playedAt.isoformat()}|{game.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a history cursor into (date, score_id).
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        played_at, score_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(played_at), int(score_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+async def get_player_history(
+    db: AsyncSession,
+    user_id: str,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> list[GameRecord]:
+    """A page of a player's games, newest first, including archived ones.
+
+    Pages are keyset-paginated on (date DESC, id DESC), so every page is a
+    range scan of the (user_id, date, id) indexes of ``scores`` and
+    ``scores_archive`` however deep it is; the two are merged here.
+    """
+    position = decode_history_cursor(cursor) if cursor else None
+    rows = []
+    for table in (DBScore, ScoreArchive):
+        query = select(table.id, table.score, table.mode, table.date).where(table.user_id == user_id)
+        if position:
+            played_at, score_id = position
+            query = query.where(
+                table.date <= played_at,
+                or_(table.date < played_at, table.id < score_id)
+            )
+        result = await db.execute(query.order_by(table.date.desc(), table.id.desc()).limit(limit))
+        rows.extend(result.all())
+    rows.sort(key=lambda row: (row.date, row.id), reverse=True)
+    return [
+        GameRecord(id=str(score_id), score=score, mode=_GAME_MODES.get(mode, GameMode.WALLS), playedAt=played_at)
+        for score_id, score, mode, played_at in rows[:limit]
+    ]
+
+async def get_player_stats(db: AsyncSession, user_id: str, history_limit: int = 10) -> Optional[PlayerStats]:
+    """A player's aggregates from user_stats/user_mode_stats plus their latest games."""
+    row = (await db.execute(
+        select(DBUser.username, UserStats)
+        .outerjoin(UserStats, UserStats.user_id == DBUser.id)
+        .where(DBUser.id == user_id)
+    )).one_or_none()
+    if row is None:
+        return None
+    username, stats = row
+
+    modes = (await db.execute(
+        select(UserModeStats).where(UserModeStats.user_id == user_id).order_by(UserModeStats.mode)
+    )).scalars().all()
+    recent = await get_player_history(db, user_id, history_limit)
+
+    if stats is None:
+        return PlayerStats(
+            id=user_id, username=username, gamesPlayed=0, averageScore=0.0, bestScore=0,
+            currentStreak=0, longestStreak=0, modes=[], recentGames=recent
+        )
+    # A streak is current until a full day passes without a game
+    streak_alive = stats.last_played_on >= datetime.now().date() - timedelta(days=1)
+    return PlayerStats(
+        id=user_id,
+        username=username,
+        gamesPlayed=stats.games_played,
+        averageScore=round(stats.total_score / stats.games_played, 1),
+        bestScore=stats.best_score,
+        currentStreak=stats.current_streak if streak_alive else 0,
+        longestStreak=stats.longest_streak,
+        lastPlayed=stats.last_played_on.isoformat(),
+        modes=[
+            ModeStats(
+                mode=_GAME_MODES.get(m.mode, GameMode.WALLS),
+                gamesPlayed=m.games_played,
+                averageScore=round(m.total_score / m.games_played, 1),
+                bestScore=m.best_score
+            )
+            for m in modes
+        ],
+        recentGames=recent
     )
 
+EXPORT_COLUMNS = ("id", "user_id", "username", "score", "mode", "date")
+
+async def stream_scores(
+    db: AsyncSession,
+    mode: Optional[GameMode] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = 5000
+) -> AsyncIterator[list[tuple]]:
+    """Stream score rows (``EXPORT_COLUMNS``) in id order, ``batch_size`` rows at a time.
+
+    Rows are fetched through a server-side cursor as plain tuples, so memory
+    stays bounded by one batch however large the table is. ``since`` is
+    inclusive and ``until`` exclusive.
+    """
+    query = select(*(getattr(DBScore, column) for column in EXPORT_COLUMNS)).order_by(DBScore.id)
+    if mode:
+        query = query.where(DBScore.mode == mode)
+    if since:
+        query = query.where(DBScore.date >= since)
+    if until:
+        query = query.where(DBScore.date < until)
+
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        yield [tuple(row) for row in rows]
+
 # Active player operations (In-memory)
-def generate_ai_game_state() -> GameState:
-    """Generate a random AI game state."""
+def generate_ai_game_state(size: int = 20) -> GameState:
+    """Generate a random AI game state on a ``size`` x ``size`` board."""
+    middle = size // 2
+    snake = [Position(x=middle - i, y=middle) for i in range(3)]
+    free = FreeCellIndex(size * size)
+    for part in snake:
+        free.remove(part.y * size + part.x)
+    food = free.choice(random)
     return GameState(
-        snake=[
-            Position(x=10, y=10),
-            Position(x=9, y=10),
-            Position(x=8, y=10),
-        ],
-        food=Position(x=random.randint(0, 19), y=random.randint(0, 19)),
+        snake=snake,
+        food=Position(x=food % size, y=food // size),
         direction=Direction.RIGHT,
         score=random.randint(0, 500),
         status=GameStatus.PLAYING,
@@ -164,13 +736,49 @@ def generate_ai_game_state() -> GameState:
     )
 
 def get_active_players() -> list[ActivePlayer]:
-    """Get all active players."""
-    # Update scores with some variation
-    for player in active_players:
-        player.currentScore += random.randint(0, 10)
-        player.gameState.score += random.randint(0, 10)
-    return active_players
+    """Get all active players, including recent reports from other workers."""
+    cutoff = time.monotonic() - settings.EVENT_BUS_PLAYERS_TTL_SECONDS
+    remote = [player for at, players in remote_players.values() if at >= cutoff for player in players]
+    return active_players + remote if remote else active_players
 
 def get_player_by_id(player_id: str) -> Optional[ActivePlayer]:
     """Get a specific active player by ID."""
-    return next((p for p in active_players if p.id == player_id), None)
+    return next((p for p in get_active_players() if p.id == player_id), None)
+
+# Event bus handlers, applying other workers' changes to this process's state
+def _on_players(worker: str, players: list[dict]) -> None:
+    remote_players[worker] = (time.monotonic(), [ActivePlayer.model_validate(p) for p in players])
+
+def _on_user(worker: str, user: dict) -> None:
+    _remember_username(user["username"])
+    _index_player(user["id"], user["username"], 0)
+
+def _on_score(worker: str, score: dict) -> None:
+    _index_player(score["userId"], score["username"], score["score"])
+
+def _on_session(worker: str, session: dict) -> None:
+    sessions[session["token"]] = session["userId"]
+
+def _on_logout(worker: str, session: dict) -> None:
+    if _signed_sessions():
+        tokens.revoke_session(session["token"])
+    else:
+        sessions.pop(session["token"], None)
+
+def _on_sessions(worker: str, state: dict) -> None:
+    sessions.update(state["sessions"])
+    tokens.revoked.update(state["revoked"])
+
+def _on_sync(worker: str, request: dict) -> None:
+    # The broker answers for everyone; a new broker hears from every worker
+    bus = event_bus.bus
+    if bus is not None and (bus.is_broker or request["broker"]):
+        event_bus.publish("sessions", {"sessions": sessions, "revoked": tokens.revoked})
+
+event_bus.subscribe("players", _on_players)
+event_bus.subscribe("user", _on_user)
+event_bus.subscribe("score", _on_score)
+event_bus.subscribe("session", _on_session)
+event_bus.subscribe("logout", _on_logout)
+event_bus.subscribe("sync", _on_sync)
+event_bus.subscribe("sessions", _on_sessions)
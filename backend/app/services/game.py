@@ -2,13 +2,38 @@
 
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.domain import User, LeaderboardEntry, GameMode
-from app.services import database as db
+from app.models.domain import User, SessionUser, LeaderboardEntry, GameMode
+from app.services import database as db, percentiles
 
-async def submit_game_score(db_session: AsyncSession, user: User, score: int, mode: GameMode) -> LeaderboardEntry:
+async def submit_game_score(
+    db_session: AsyncSession,
+    user: SessionUser | User,
+    score: int,
+    mode: GameMode,
+    idempotency_key: Optional[str] = None
+) -> LeaderboardEntry:
     """Submit a game score for a user."""
-    return await db.submit_score(db_session, user, score, mode)
+    return await db.submit_score(db_session, user, score, mode, idempotency_key)
 
-async def get_game_leaderboard(db_session: AsyncSession, mode: Optional[GameMode] = None) -> list[LeaderboardEntry]:
-    """Get the game leaderboard, optionally filtered by mode."""
-    return await db.get_leaderboard(db_session, mode)
+async def submit_game_scores(
+    db_session: AsyncSession,
+    user: SessionUser | User,
+    submissions: list[tuple[int, GameMode, Optional[str]]]
+) -> list[LeaderboardEntry]:
+    """Submit several ``(score, mode, idempotency_key)`` results for a user at once."""
+    return await db.submit_scores(db_session, user, submissions)
+
+async def get_game_leaderboard(
+    db_session: AsyncSession,
+    mode: Optional[GameMode] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    around_user: Optional[str] = None
+) -> list[LeaderboardEntry]:
+    """Get a page of the game leaderboard, optionally filtered by mode."""
+    return await db.get_leaderboard(db_session, mode, limit, cursor, around_user)
+
+async def get_score_distribution(db_session: AsyncSession, mode: GameMode) -> dict:
+    """Score count and quantiles for a game mode."""
+    await percentiles.ensure_loaded(db_session)
+    return percentiles.distribution(mode)
@@ -0,0 +1,236 @@
+"""Live games sharded across worker processes.
+
+One event loop can only move so many games per tick, so with
+``LIVE_WORKERS`` set the bot games run in a pool of worker processes
+instead. Games are assigned to workers by a hash of the player id. Each
+worker writes the frames of its games into one
+``multiprocessing.shared_memory`` segment, and the API process serves
+``/live/players`` from that memory directly, with no messages or pickling
+between the processes.
+
+Segment layout: the worker's move count (uint64), one sequence number per
+game (uint64), then a ring of ``RING_SLOTS`` frames per game. A frame is
+``_FRAME`` followed by the snake's cells (uint32, head first). The worker
+writes frame ``seq`` into slot ``seq % RING_SLOTS`` and only then publishes
+``seq``. A reader takes the latest sequence number, decodes that slot in
+place and checks the sequence number again. Once ``seq + RING_SLOTS - 1``
+is published the writer may already be writing ``seq + RING_SLOTS`` into
+the same slot, so the frame is only consistent if fewer than
+``RING_SLOTS - 1`` newer frames were published meanwhile. Otherwise the
+reader tries again with the newer frame.
+
+With several uvicorn workers only the one hosting the event bus broker runs
+the pool, and it sends the games to the others over the bus.
+"""
+
+import asyncio
+import logging
+import random
+import struct
+import time
+import zlib
+from array import array
+from datetime import datetime
+from typing import NamedTuple, Optional
+from app.core import event_bus
+from app.models.domain import ActivePlayer, GameMode, GameState, GameStatus, Position
+from app.services.bots import DIRECTIONS, BotGame, roster
+
+logger = logging.getLogger(__name__)
+
+RING_SLOTS = 4
+_COUNTER = struct.Struct("<Q")
+# started_at, score, speed, status, direction, food, length
+_FRAME = struct.Struct("<dIHBBiI")
+STATUSES = tuple(GameStatus)
+
+class LiveGame(NamedTuple):
+    """Where a game's frames live: its worker's segment and its index there."""
+    id: str
+    username: str
+    mode: GameMode
+    shard: int
+    slot: int
+
+def shard_of(player_id: str, workers: int) -> int:
+    """Worker that owns a player's game; stable across processes and restarts."""
+    return zlib.crc32(player_id.encode()) % workers
+
+def frame_size(size: int) -> int:
+    return _FRAME.size + 4 * size * size
+
+def segment_size(games: int, size: int) -> int:
+    return _COUNTER.size * (1 + games) + games * RING_SLOTS * frame_size(size)
+
+def write_frame(buf: memoryview, games: int, size: int, slot: int, seq: int, game: BotGame) -> None:
+    """Write frame ``seq`` of the game at ``slot`` and publish it."""
+    offset = _COUNTER.size * (1 + games) + (slot * RING_SLOTS + seq % RING_SLOTS) * frame_size(size)
+    body = game.body
+    _FRAME.pack_into(
+        buf, offset,
+        game.started_at.timestamp(), game.score, game.speed, STATUSES.index(game.status),
+        DIRECTIONS.index(game.direction), game.food, len(body)
+    )
+    start = offset + _FRAME.size
+    buf[start:start + 4 * len(body)] = array("I", reversed(body)).tobytes()
+    _COUNTER.pack_into(buf, _COUNTER.size * (1 + slot), seq)
+
+def read_frame(buf: memoryview, games: int, size: int, game: LiveGame) -> Optional[ActivePlayer]:
+    """Latest consistent frame of a game, or None before its first frame."""
+    seq_offset = _COUNTER.size * (1 + game.slot)
+    frames = _COUNTER.size * (1 + games) + game.slot * RING_SLOTS * frame_size(size)
+    while True:
+        (seq,) = _COUNTER.unpack_from(buf, seq_offset)
+        if not seq:
+            return None
+        offset = frames + seq % RING_SLOTS * frame_size(size)
+        started_at, score, speed, status, direction, food, length = _FRAME.unpack_from(buf, offset)
+        start = offset + _FRAME.size
+        cells = buf[start:start + 4 * min(length, size * size)].cast("I")
+        snake = [Position(x=cell % size, y=cell // size) for cell in cells]
+        cells.release()
+        if _COUNTER.unpack_from(buf, seq_offset)[0] - seq < RING_SLOTS - 1:
+            break
+    state = GameState(
+        snake=snake,
+        food=Position(x=food % size, y=food // size),
+        direction=DIRECTIONS[direction],
+        score=score,
+        status=STATUSES[status],
+        mode=game.mode,
+        speed=speed
+    )
+    return ActivePlayer(
+        id=game.id,
+        username=game.username,
+        currentScore=score,
+        mode=game.mode,
+        gameState=state,
+        startedAt=datetime.fromtimestamp(started_at)
+    )
+
+def run_shard(name: str, players: list[tuple[str, str, GameMode]], size: int, paced: bool, stop) -> None:
+    """Worker process: play ``players``' games and write their frames until ``stop`` is set.
+
+    Paced games move at their game speed; unpaced ones (for benchmarks)
+    move as fast as the worker can go.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    if not players:
+        stop.wait()
+        return
+    segment = SharedMemory(name=name)
+    buf = segment.buf
+    rng = random.Random()
+    games = [BotGame(*player, size, rng) for player in players]
+    seqs = [0] * len(games)
+    moves = 0
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            for slot, game in enumerate(games):
+                if paced and game.due > now:
+                    continue
+                game.advance(now)
+                seqs[slot] += 1
+                write_frame(buf, len(games), size, slot, seqs[slot], game)
+                moves += 1
+            _COUNTER.pack_into(buf, 0, moves)
+            if paced:
+                wait = min(game.due for game in games) - time.monotonic()
+                stop.wait(min(max(wait, 0), 0.05))
+    finally:
+        del buf
+        segment.close()
+
+class ShardPool:
+    """Worker processes playing live games, and the API process's view of their frames."""
+
+    def __init__(self, count: int, workers: int, size: int, paced: bool = True):
+        # Imported here so app startup does not pay for multiprocessing when LIVE_WORKERS is 0
+        import multiprocessing
+        from multiprocessing.shared_memory import SharedMemory
+
+        self.size = size
+        shards: list[list[tuple[str, str, GameMode]]] = [[] for _ in range(workers)]
+        self.games: dict[str, LiveGame] = {}
+        for player_id, username, mode in roster(count):
+            shard = shard_of(player_id, workers)
+            self.games[player_id] = LiveGame(player_id, username, mode, shard, len(shards[shard]))
+            shards[shard].append((player_id, username, mode))
+        self._counts = [len(players) for players in shards]
+
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self._segments = [SharedMemory(create=True, size=max(1, segment_size(n, size))) for n in self._counts]
+        self._processes = [
+            context.Process(
+                target=run_shard,
+                args=(segment.name, players, size, paced, self._stop),
+                name=f"live-shard-{shard}",
+                daemon=True
+            )
+            for shard, (segment, players) in enumerate(zip(self._segments, shards))
+        ]
+        for process in self._processes:
+            process.start()
+
+    def player(self, player_id: str) -> Optional[ActivePlayer]:
+        game = self.games.get(player_id)
+        if game is None:
+            return None
+        return read_frame(self._segments[game.shard].buf, self._counts[game.shard], self.size, game)
+
+    def players(self) -> list[ActivePlayer]:
+        players = (self.player(player_id) for player_id in self.games)
+        return [player for player in players if player is not None]
+
+    def moves(self) -> int:
+        """Moves made by all workers so far."""
+        return sum(_COUNTER.unpack_from(segment.buf, 0)[0] for segment in self._segments)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the workers and free the shared memory."""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning("Terminating unresponsive live shard %s", process.name)
+                process.terminate()
+                process.join()
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+
+# The pool, when LIVE_WORKERS is set
+pool: Optional[ShardPool] = None
+
+def start(count: int, workers: int, size: int) -> ShardPool:
+    global pool
+    pool = ShardPool(count, workers, size)
+    return pool
+
+def stop() -> None:
+    global pool
+    if pool is not None:
+        pool.close()
+        pool = None
+
+async def run(count: int, workers: int, size: int, publish_interval: float) -> None:
+    """Run the pool until cancelled, sending its games to the other workers (if any) periodically."""
+    start(count, workers, size)
+    try:
+        while True:
+            if event_bus.bus is not None:
+                event_bus.publish("players", [player.model_dump(mode="json") for player in get_players()])
+            await asyncio.sleep(publish_interval)
+    finally:
+        stop()
+
+def get_players() -> list[ActivePlayer]:
+    """Live games played in the pool (none without one)."""
+    return pool.players() if pool is not None else []
+
+def get_player(player_id: str) -> Optional[ActivePlayer]:
+    return pool.player(player_id) if pool is not None else None
@@ -0,0 +1,130 @@
+"""Per-mode score percentiles from streaming histograms.
+
+Each game mode has a ``ScoreHistogram`` of every recorded score, so "you
+beat N% of games in this mode" is a Fenwick-tree lookup instead of a count
+over ``scores``. Histograms are loaded from ``score_sketches`` on first use
+(or built from ``scores`` once, if nothing is persisted yet), updated on
+every submission, and flushed periodically: a flush adds this process's new
+counts to the persisted row and reloads the merged result, so workers pick
+up each other's submissions as they flush.
+"""
+
+import asyncio
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_sessionmaker
+from app.models.domain import GameMode
+from app.models.sql import Score as DBScore, ScoreSketch
+from app.utils.histogram import ScoreHistogram, bucket_index
+
+logger = logging.getLogger(__name__)
+
+# Quantiles reported by the distribution endpoint
+DISTRIBUTION_QUANTILES = tuple(q / 100 for q in range(5, 100, 5)) + (0.99,)
+
+histograms: Optional[dict[str, ScoreHistogram]] = None
+# Bucket counts recorded since the last flush, per mode
+_pending: dict[str, Counter[int]] = {}
+_load_lock = asyncio.Lock()
+
+async def ensure_loaded(db: AsyncSession) -> dict[str, ScoreHistogram]:
+    """Load persisted histograms, building missing modes from the scores table."""
+    global histograms
+    if histograms is not None:
+        return histograms
+    async with _load_lock:
+        if histograms is not None:
+            return histograms
+        loaded = {mode.value: ScoreHistogram() for mode in GameMode}
+        persisted = (await db.execute(select(ScoreSketch))).scalars().all()
+        for sketch in persisted:
+            if sketch.mode in loaded:
+                loaded[sketch.mode].merge(json.loads(sketch.buckets).items())
+        missing = loaded.keys() - {sketch.mode for sketch in persisted}
+        if missing:
+            result = await db.execute(
+                select(DBScore.mode, DBScore.score, func.count())
+                .where(DBScore.mode.in_(missing))
+                .group_by(DBScore.mode, DBScore.score)
+            )
+            for mode, score, count in result:
+                loaded[mode].record(score, count)
+        histograms = loaded
+    return histograms
+
+def percentile_rank(mode: GameMode | str, score: int) -> Optional[float]:
+    """Percentage of recorded scores in ``mode`` below ``score``, if loaded."""
+    if histograms is None:
+        return None
+    return round(histograms[GameMode(mode).value].percentile_rank(score), 2)
+
+def record(mode: GameMode | str, score: int) -> None:
+    """Count a newly stored score."""
+    if histograms is None:
+        return
+    mode = GameMode(mode).value
+    histograms[mode].record(score)
+    _pending.setdefault(mode, Counter())[bucket_index(score)] += 1
+
+def distribution(mode: GameMode) -> dict:
+    """Score count and quantiles for a mode."""
+    histogram = histograms[mode.value]
+    return {
+        "mode": mode.value,
+        "count": histogram.total,
+        "quantiles": {f"p{round(q * 100)}": histogram.quantile(q) for q in DISTRIBUTION_QUANTILES},
+    }
+
+async def flush(db: AsyncSession) -> None:
+    """Add pending counts to the persisted histograms and reload the merged totals."""
+    global _pending
+    if histograms is None:
+        return
+    persisted = {
+        sketch.mode: sketch
+        for sketch in (await db.execute(select(ScoreSketch).with_for_update())).scalars()
+    }
+    # No awaits between taking the pending counts and building the merged totals
+    pending, _pending = _pending, {}
+    try:
+        merged = {}
+        for mode, histogram in histograms.items():
+            merged[mode] = ScoreHistogram()
+            sketch = persisted.get(mode)
+            if sketch is None:
+                # First flush anywhere for this mode: persist everything we have
+                merged[mode].merge(histogram.counts().items())
+                sketch = ScoreSketch(mode=mode)
+                db.add(sketch)
+            else:
+                merged[mode].merge(json.loads(sketch.buckets).items())
+                merged[mode].merge(pending.get(mode, {}).items())
+            sketch.buckets = json.dumps(merged[mode].counts())
+            sketch.total = merged[mode].total
+            sketch.updated_at = datetime.now()
+        await db.commit()
+    except BaseException:
+        # Keep the counts for the next attempt
+        for mode, counts in pending.items():
+            _pending.setdefault(mode, Counter()).update(counts)
+        raise
+
+    # Scores recorded while the flush was in flight are not in the merged totals yet
+    for mode, counts in _pending.items():
+        merged[mode].merge(counts.items())
+    histograms.update(merged)
+
+async def run_flusher(interval: float) -> None:
+    """Flush every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with get_sessionmaker()() as session:
+                await flush(session)
+        except Exception:
+            logger.exception("Failed to persist score percentiles")
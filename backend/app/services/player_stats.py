@@ -0,0 +1,153 @@
+"""Incrementally maintained player aggregates.
+
+``user_stats`` and ``user_mode_stats`` hold running totals per player (and
+per player and mode), so a profile is a primary-key lookup instead of a
+``GROUP BY`` over ``scores``. ``record`` folds new results in with an
+upsert inside the caller's transaction; ``rebuild`` recomputes everything
+from ``scores`` for data loaded around the API (seeding, imports).
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterable
+from sqlalchemy import select, delete, func, case, union_all, insert as sql_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.sql import Score as DBScore, ScoreArchive, UserStats, UserModeStats
+
+def _insert(db: AsyncSession):
+    """Dialect-specific INSERT supporting ON CONFLICT DO UPDATE."""
+    # Imported here: importing a dialect package loads its async driver modules,
+    # which startup defers until the engine is created
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def _greatest(a, b):
+    return case((a > b, a), else_=b)
+
+async def record(db: AsyncSession, user_id: str, results: Iterable[tuple[int, str]], played_at: datetime) -> None:
+    """Add ``(score, mode)`` results played at ``played_at`` to a player's aggregates.
+
+    Runs in the caller's transaction, so the aggregates commit or roll back
+    with the scores themselves.
+    """
+    by_mode: dict[str, list[int]] = {}
+    for score, mode in results:
+        by_mode.setdefault(str(getattr(mode, "value", mode)), []).append(score)
+    if not by_mode:
+        return
+    scores = [score for mode_scores in by_mode.values() for score in mode_scores]
+    insert = _insert(db)
+
+    today = played_at.date()
+    streak = case(
+        (UserStats.last_played_on >= today, UserStats.current_streak),
+        (UserStats.last_played_on == today - timedelta(days=1), UserStats.current_streak + 1),
+        else_=1
+    )
+    stmt = insert(UserStats).values(
+        user_id=user_id,
+        games_played=len(scores),
+        total_score=sum(scores),
+        best_score=max(scores),
+        last_played_on=today,
+        current_streak=1,
+        longest_streak=1
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "games_played": UserStats.games_played + stmt.excluded.games_played,
+            "total_score": UserStats.total_score + stmt.excluded.total_score,
+            "best_score": _greatest(stmt.excluded.best_score, UserStats.best_score),
+            "last_played_on": _greatest(stmt.excluded.last_played_on, UserStats.last_played_on),
+            "current_streak": streak,
+            "longest_streak": _greatest(streak, UserStats.longest_streak),
+        }
+    ))
+
+    stmt = insert(UserModeStats).values([
+        {
+            "user_id": user_id,
+            "mode": mode,
+            "games_played": len(mode_scores),
+            "total_score": sum(mode_scores),
+            "best_score": max(mode_scores),
+        }
+        for mode, mode_scores in by_mode.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserModeStats.user_id, UserModeStats.mode],
+        set_={
+            "games_played": UserModeStats.games_played + stmt.excluded.games_played,
+            "total_score": UserModeStats.total_score + stmt.excluded.total_score,
+            "best_score": _greatest(stmt.excluded.best_score, UserModeStats.best_score),
+        }
+    ))
+
+def streaks(days: Iterable[date]) -> tuple[int, int]:
+    """``(current, longest)`` runs of consecutive days in ascending ``days``.
+
+    ``current`` is the run ending on the last day.
+    """
+    current = longest = 0
+    previous = None
+    for day in days:
+        if previous is not None and day == previous:
+            continue
+        current = current + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+def rebuild(conn: Connection, batch_size: int = 10_000) -> None:
+    """Recompute both aggregate tables from ``scores`` and ``scores_archive``.
+
+    Sync; use ``run_sync`` from async code.
+    """
+    games = union_all(*(
+        select(table.user_id, table.mode, table.score, table.date) for table in (DBScore, ScoreArchive)
+    )).subquery()
+    conn.execute(delete(UserModeStats))
+    conn.execute(delete(UserStats))
+    conn.execute(sql_insert(UserModeStats).from_select(
+        ["user_id", "mode", "games_played", "total_score", "best_score"],
+        select(games.c.user_id, games.c.mode, func.count(), func.sum(games.c.score), func.max(games.c.score))
+        .group_by(games.c.user_id, games.c.mode)
+    ))
+
+    # Streaks need each player's days in order, so build user_stats in one ordered pass
+    rows: list[dict] = []
+
+    def add(user_id: str, scores: list[int], days: list[date]) -> None:
+        current, longest = streaks(days)
+        rows.append({
+            "user_id": user_id,
+            "games_played": len(scores),
+            "total_score": sum(scores),
+            "best_score": max(scores),
+            "last_played_on": days[-1],
+            "current_streak": current,
+            "longest_streak": longest,
+        })
+        if len(rows) >= batch_size:
+            conn.execute(sql_insert(UserStats), rows)
+            rows.clear()
+
+    result = conn.execution_options(yield_per=batch_size).execute(
+        select(games.c.user_id, games.c.score, games.c.date).order_by(games.c.user_id, games.c.date)
+    )
+    user_id, scores, days = None, [], []
+    for row_user_id, score, played_at in result:
+        if row_user_id != user_id:
+            if user_id is not None:
+                add(user_id, scores, days)
+            user_id, scores, days = row_user_id, [], []
+        scores.append(score)
+        days.append(played_at.date())
+    if user_id is not None:
+        add(user_id, scores, days)
+    if rows:
+        conn.execute(sql_insert(UserStats), rows)
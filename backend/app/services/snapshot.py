@@ -0,0 +1,226 @@
+"""Warm-restart snapshots of in-memory state.
+
+Sessions, revoked tokens, players' live games and the username filter and player
+index only live in process memory. ``save`` writes them to a local file (on
+shutdown and every ``SNAPSHOT_INTERVAL_SECONDS``) and ``restore`` loads it
+back on startup, so a restart does not log everyone out or rebuild the
+indexes from the users table.
+
+File format: ``MAGIC``, then ``FORMAT_VERSION`` and the ``marshal`` version
+as two little-endian uint16, then marshalled parts, each preceded by its
+length as a little-endian uint64. The first part is the state with its large
+containers (sessions, revocations and the player index's arrays) taken out;
+those follow in pieces of at most ``_PIECE`` entries. ``marshal`` only
+handles builtin types, writes them faster than pickle and reads them far
+faster than JSON; its encoding may change between Python versions, so a
+file written with a different header is ignored and the indexes are rebuilt
+lazily as usual. The file holds live session tokens, so it is only readable
+by its owner.
+
+Periodic saves only copy the structures on the event loop, which takes a
+few milliseconds per 100k users. Encoding and writing happen in a thread.
+Each piece is one ``marshal`` call that holds the GIL, so the event loop
+waits at most one piece at a time rather than for the whole encoding.
+
+Loading creates millions of objects at a million users,
+so the garbage collector is paused meanwhile; with it running, collections
+triggered by the allocations make loading several times slower.
+"""
+
+import asyncio
+import gc
+import logging
+import marshal
+import os
+import struct
+import tempfile
+import time
+from contextlib import contextmanager, suppress
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.domain import ActivePlayer
+from app.models.sql import User as DBUser
+from app.services import bots, database as db
+from app.utils import tokens
+from app.utils.bloom import BloomFilter
+from app.utils.prefix_index import PrefixIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SNAS"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sHH")
+_LENGTH = struct.Struct("<Q")
+# Entries per marshalled piece of a large list or dict (about 2 ms of encoding each)
+_PIECE = 10_000
+
+@contextmanager
+def _gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def capture() -> dict:
+    """Current in-memory state as plain data, copied so it can be encoded in another thread."""
+    return {
+        "saved_at": time.time(),
+        "sessions": dict(db.sessions),
+        "revoked": dict(tokens.revoked),
+        # Bots are respawned on startup, restored they would sit frozen next to the new ones
+        "active_players": [
+            player.model_dump(mode="json") for player in db.active_players
+            if not player.id.startswith(bots.BOT_PREFIX)
+        ],
+        "username_filter": db.username_filter.state() if db.username_filter is not None else None,
+        "player_index": db.player_index.state() if db.player_index is not None else None,
+    }
+
+def _split(container) -> list:
+    """A list or dict in pieces of at most ``_PIECE`` entries (one piece if empty)."""
+    starts = range(0, max(len(container), 1), _PIECE)
+    if isinstance(container, dict):
+        items = iter(container.items())
+        return [dict(islice(items, _PIECE)) for _ in starts]
+    return [container[i:i + _PIECE] for i in starts]
+
+def _encode(state: dict) -> list[bytes]:
+    """Encode a captured state as the file's parts, header included."""
+    large = [state["sessions"], state["revoked"]]
+    meta = {**state, "sessions": None, "revoked": None}
+    if state["player_index"] is not None:
+        max_results, scan_limit, names, players, top = state["player_index"]
+        meta["player_index"] = (max_results, scan_limit)
+        large += [names, players, top]
+    pieces = [_split(container) for container in large]
+    meta["pieces"] = [len(container_pieces) for container_pieces in pieces]
+
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version)]
+    for obj in [meta, *(piece for container_pieces in pieces for piece in container_pieces)]:
+        data = marshal.dumps(obj)
+        parts += [_LENGTH.pack(len(data)), data]
+    return parts
+
+def _decode(data: memoryview) -> dict:
+    """Inverse of ``_encode`` for the data after the header."""
+    offset = 0
+
+    def part():
+        nonlocal offset
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size + length
+        if offset > len(data):
+            raise EOFError("truncated snapshot")
+        return marshal.loads(data[offset - length:offset])
+
+    state = part()
+    large = []
+    for count in state.pop("pieces"):
+        container = part()
+        for _ in range(count - 1):
+            piece = part()
+            if isinstance(container, dict):
+                container.update(piece)
+            else:
+                container.extend(piece)
+        large.append(container)
+    state["sessions"], state["revoked"] = large[:2]
+    if state["player_index"] is not None:
+        names, players, top = large[2:]
+        state["player_index"] = (*state["player_index"], names, players, top)
+    return state
+
+def _write(path: str, parts: list[bytes]) -> int:
+    # A temporary file of its own (created 0600) per write, so concurrent writers never share one
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=f"{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(parts)
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    return sum(len(part) for part in parts)
+
+def _save(path: str, state: dict) -> int:
+    return _write(path, _encode(state))
+
+def save(path: str) -> int:
+    """Write a snapshot atomically; return its size in bytes."""
+    return _save(path, capture())
+
+def load(path: str) -> Optional[dict]:
+    """Read a snapshot, or None if it is missing, from another format version or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        magic, version, marshal_version = _HEADER.unpack_from(data)
+        if (magic, version, marshal_version) != (MAGIC, FORMAT_VERSION, marshal.version):
+            logger.info("Ignoring snapshot %s with format %s/%s", path, version, marshal_version)
+            return None
+        with _gc_paused():
+            return _decode(memoryview(data)[_HEADER.size:])
+    except (struct.error, ValueError, EOFError, TypeError):
+        logger.warning("Ignoring unreadable snapshot %s", path)
+        return None
+
+def apply(snapshot: dict, max_age: float, live_games: bool = True) -> bool:
+    """Install a loaded snapshot; return whether the indexes were restored.
+
+    Sessions and revocations are always restored. Live games (unless
+    ``live_games`` is false) and indexes are only restored from snapshots
+    younger than ``max_age`` seconds; an older index is left to be rebuilt
+    from the database on first use.
+    """
+    now = time.time()
+    db.sessions.update(snapshot["sessions"])
+    tokens.revoked.update((key, exp) for key, exp in snapshot["revoked"].items() if exp > now)
+    if now - snapshot["saved_at"] > max_age:
+        return False
+    if live_games:
+        db.active_players[:] = [ActivePlayer.model_validate(player) for player in snapshot["active_players"]]
+    if snapshot["username_filter"] is not None:
+        db.username_filter = BloomFilter.from_state(snapshot["username_filter"])
+    if snapshot["player_index"] is not None:
+        db.player_index = PrefixIndex.from_state(snapshot["player_index"])
+    return True
+
+async def restore(session: AsyncSession, path: str, max_age: float, live_games: bool = True) -> bool:
+    """Restore state saved by ``save``; return whether a snapshot was applied.
+
+    Users who signed up after the snapshot was taken (e.g. through other
+    workers) are added to the restored indexes. High scores raised in the
+    meantime are picked up on those players' next submission.
+    """
+    snapshot = load(path)
+    if snapshot is None:
+        return False
+    if apply(snapshot, max_age, live_games) and (db.username_filter is not None or db.player_index is not None):
+        saved_at = snapshot["saved_at"]
+        result = await session.execute(
+            select(DBUser.id, DBUser.username, DBUser.high_score)
+            .where(DBUser.created_at >= datetime.fromtimestamp(saved_at) - timedelta(seconds=1))
+        )
+        for user_id, username, high_score in result:
+            db._remember_username(username)
+            db._index_player(user_id, username, high_score)
+    return True
+
+async def run_snapshotter(path: str, interval: float) -> None:
+    """Save a snapshot every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_save, path, capture())
+        except Exception:
+            logger.exception("Failed to write snapshot %s", path)
@@ -0,0 +1,56 @@
+"""Bloom filter for fast negative membership checks."""
+
+import hashlib
+import math
+from typing import Iterable
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    ``in`` never gives a false negative; a false positive happens with about
+    ``error_rate`` probability while no more than ``capacity`` items have
+    been added. Positions come from double hashing one SHA-256 digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        size = self.size
+        return ((h1 + i * h2) % size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        bits = self._bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def state(self) -> tuple:
+        """Plain-data state for snapshots; see ``from_state``."""
+        return self.capacity, self.error_rate, self.size, self.hashes, self.count, bytes(self._bits)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "BloomFilter":
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.error_rate, bloom.size, bloom.hashes, bloom.count, bits = state
+        bloom._bits = bytearray(bits)
+        return bloom
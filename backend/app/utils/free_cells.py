@@ -0,0 +1,49 @@
+"""Index of the free cells of a board, for uniform O(1) food spawning."""
+
+import random
+from array import array
+
+class FreeCellIndex:
+    """Set of free cell indexes supporting O(1) add, remove and uniform choice.
+
+    Free cells are packed at the front of ``_cells``; ``_position`` maps a
+    cell to its slot there, or -1 when the cell is taken. Removing a cell
+    moves the last free cell into its slot, so the array never has holes and
+    a random slot is a uniformly random free cell however full the board is,
+    unlike drawing random cells until one is free.
+    """
+
+    def __init__(self, size: int):
+        """Index ``size`` cells, all free."""
+        self._cells = array("i", range(size))
+        self._position = array("i", range(size))
+        self._count = size
+
+    def add(self, cell: int) -> None:
+        """Mark a cell free; no-op if it already is."""
+        if self._position[cell] < 0:
+            self._cells[self._count] = cell
+            self._position[cell] = self._count
+            self._count += 1
+
+    def remove(self, cell: int) -> None:
+        """Mark a cell taken; no-op if it already is."""
+        slot = self._position[cell]
+        if slot >= 0:
+            self._count -= 1
+            last = self._cells[self._count]
+            self._cells[slot] = last
+            self._position[last] = slot
+            self._position[cell] = -1
+
+    def choice(self, rng: random.Random) -> int:
+        """A uniformly random free cell, or -1 when none is free."""
+        if not self._count:
+            return -1
+        return self._cells[rng.randrange(self._count)]
+
+    def __contains__(self, cell: int) -> bool:
+        return self._position[cell] >= 0
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,108 @@
+"""Log-linear score histogram for streaming percentiles."""
+
+from typing import Iterable
+
+# Values below 2**PRECISION_BITS get exact buckets; above that each power of
+# two is split into 2**(PRECISION_BITS - 1) buckets, bounding the relative
+# bucket width (and so the value error) at 1/128 (< 0.8%), like an HDR
+# histogram with two significant digits.
+PRECISION_BITS = 8
+_SUB_BUCKETS = 1 << PRECISION_BITS
+_HALF = _SUB_BUCKETS >> 1
+MAX_VALUE = (1 << 31) - 1
+BUCKETS = _SUB_BUCKETS + (MAX_VALUE.bit_length() - PRECISION_BITS) * _HALF
+
+def bucket_index(value: int) -> int:
+    value = min(max(value, 0), MAX_VALUE)
+    if value < _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - PRECISION_BITS
+    return _SUB_BUCKETS + (shift - 1) * _HALF + (value >> shift) - _HALF
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Inclusive lower and exclusive upper value of a bucket."""
+    if index < _SUB_BUCKETS:
+        return index, index + 1
+    shift = (index - _SUB_BUCKETS) // _HALF + 1
+    lower = ((index - _SUB_BUCKETS) % _HALF + _HALF) << shift
+    return lower, lower + (1 << shift)
+
+class ScoreHistogram:
+    """Counts of non-negative integer scores in log-linear buckets.
+
+    Counts are kept in a Fenwick tree, so recording a score and asking how
+    many recorded scores fall below a value are both O(log buckets).
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._tree = [0] * (BUCKETS + 1)
+
+    def record(self, value: int, count: int = 1) -> None:
+        self.total += count
+        i = bucket_index(value) + 1
+        tree = self._tree
+        while i <= BUCKETS:
+            tree[i] += count
+            i += i & -i
+
+    def _prefix(self, index: int) -> int:
+        """Number of recorded values in buckets ``0 .. index - 1``."""
+        tree = self._tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def count_below(self, value: int) -> float:
+        """Estimated number of recorded values strictly below ``value``.
+
+        Values in the bucket containing ``value`` are assumed to be spread
+        evenly across it.
+        """
+        if value <= 0:
+            return 0.0
+        index = bucket_index(value)
+        below = self._prefix(index)
+        in_bucket = self._prefix(index + 1) - below
+        lower, upper = bucket_bounds(index)
+        return below + in_bucket * (value - lower) / (upper - lower)
+
+    def percentile_rank(self, value: int) -> float:
+        """Percentage of recorded values strictly below ``value``."""
+        return 100.0 * self.count_below(value) / self.total if self.total else 100.0
+
+    def quantile(self, q: float) -> int:
+        """Smallest bucket lower bound with at least ``q`` of the values at or below its bucket."""
+        if not self.total:
+            return 0
+        target = max(1, round(q * self.total))
+        # Descend the Fenwick tree to the first bucket whose cumulative count reaches target
+        position = 0
+        step = 1 << BUCKETS.bit_length()
+        tree = self._tree
+        while step:
+            nxt = position + step
+            if nxt <= BUCKETS and tree[nxt] < target:
+                position = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return bucket_bounds(position)[0]
+
+    def counts(self) -> dict[int, int]:
+        """Non-empty buckets as ``{index: count}``."""
+        result = {}
+        previous = 0
+        for index in range(BUCKETS):
+            cumulative = self._prefix(index + 1)
+            if cumulative != previous:
+                result[index] = cumulative - previous
+            previous = cumulative
+        return result
+
+    def merge(self, counts: Iterable[tuple[int, int]]) -> None:
+        """Add ``(bucket index, count)`` pairs, e.g. from ``counts()`` of another histogram."""
+        for index, count in counts:
+            lower, _ = bucket_bounds(int(index))
+            self.record(lower, count)
@@ -0,0 +1,124 @@
+"""In-memory case-insensitive prefix index over usernames."""
+
+import bisect
+import heapq
+from typing import Iterable
+
+# Sorts after any character a casefolded username can contain
+_PREFIX_END = "\U0010ffff"
+
+class PrefixIndex:
+    """Usernames in a sorted array, searchable by prefix and ranked by score.
+
+    Usernames are kept sorted by their casefolded form, so the matches for a
+    prefix are a contiguous slice found with two bisections. Slices of up to
+    ``scan_limit`` names are ranked on the fly. Broader prefixes keep their
+    top ``max_results`` names in a cache that is built bottom-up on load and
+    updated on every insert and score change. High scores never go down,
+    which keeps those cached lists exact.
+    """
+
+    def __init__(self, max_results: int = 50, scan_limit: int = 200):
+        self.max_results = max_results
+        self.scan_limit = scan_limit
+        # Usernames sorted by casefolded form
+        self._names: list[str] = []
+        # username -> (id, score)
+        self._players: dict[str, tuple[str, int]] = {}
+        # Broad prefix -> usernames ordered by (score desc, username)
+        self._top: dict[str, list[str]] = {}
+
+    def load(self, players: Iterable[tuple[str, str, int]]) -> None:
+        """Replace the contents with ``(id, username, score)`` tuples."""
+        self._players = {username: (player_id, score) for player_id, username, score in players}
+        self._names = sorted(self._players, key=str.casefold)
+        self._top = {}
+        self._build_top("", 0, len(self._names))
+
+    def _build_top(self, prefix: str, lo: int, hi: int) -> list[str]:
+        """Top names of ``_names[lo:hi]``, all starting with ``prefix``, caching broad prefixes."""
+        if hi - lo <= self.scan_limit:
+            return heapq.nsmallest(self.max_results, self._names[lo:hi], key=self._rank)
+        # Split the slice by the next character: names equal to the prefix, then one run per character
+        depth = len(prefix)
+        names = self._names
+        candidates = []
+        i = lo
+        while i < hi and len(names[i].casefold()) == depth:
+            candidates.append(names[i])
+            i += 1
+        while i < hi:
+            child = names[i].casefold()[:depth + 1]
+            end = bisect.bisect_left(names, child + _PREFIX_END, i, hi, key=str.casefold)
+            candidates.extend(self._build_top(child, i, end))
+            i = end
+        top = heapq.nsmallest(self.max_results, candidates, key=self._rank)
+        if prefix:
+            self._top[prefix] = top
+        return top
+
+    def add(self, player_id: str, username: str, score: int = 0) -> None:
+        if username in self._players:
+            self.update_score(username, score)
+            return
+        bisect.insort(self._names, username, key=str.casefold)
+        self._players[username] = (player_id, score)
+        self._offer(username)
+
+    def update_score(self, username: str, score: int) -> None:
+        """Raise a player's score; lower scores are ignored."""
+        player = self._players.get(username)
+        if player is None or score <= player[1]:
+            return
+        self._players[username] = (player[0], score)
+        self._offer(username)
+
+    def _rank(self, username: str) -> tuple[int, str]:
+        return -self._players[username][1], username
+
+    def _offer(self, username: str) -> None:
+        # Keep every cached list that covers this name current
+        key = username.casefold()
+        for length in range(1, len(key) + 1):
+            top = self._top.get(key[:length])
+            if top is None:
+                continue
+            if username in top:
+                top.sort(key=self._rank)
+            elif len(top) < self.max_results or self._rank(username) < self._rank(top[-1]):
+                bisect.insort(top, username, key=self._rank)
+                del top[self.max_results:]
+
+    def search(self, prefix: str, limit: int = 10) -> list[tuple[str, str, int]]:
+        """Top ``limit`` ``(id, username, score)`` whose username starts with ``prefix``."""
+        key = prefix.casefold()
+        limit = min(limit, self.max_results)
+        top = self._top.get(key)
+        if top is None:
+            lo = bisect.bisect_left(self._names, key, key=str.casefold)
+            hi = bisect.bisect_left(self._names, key + _PREFIX_END, lo, key=str.casefold)
+            if hi - lo <= self.scan_limit:
+                top = heapq.nsmallest(limit, self._names[lo:hi], key=self._rank)
+            else:
+                # Grew past the scan limit since load
+                top = self._top[key] = heapq.nsmallest(self.max_results, self._names[lo:hi], key=self._rank)
+        players = self._players
+        return [(players[name][0], name, players[name][1]) for name in top[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def state(self) -> tuple:
+        """Plain-data state for snapshots; restoring it skips the sort and top-K build of ``load``.
+
+        The containers are copied, so the state can be encoded while the index keeps changing.
+        """
+        top = {prefix: list(names) for prefix, names in self._top.items()}
+        return self.max_results, self.scan_limit, list(self._names), dict(self._players), top
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "PrefixIndex":
+        max_results, scan_limit, names, players, top = state
+        index = cls(max_results, scan_limit)
+        index._names, index._players, index._top = names, players, top
+        return index
@@ -1,7 +1,23 @@
-from passlib.context import CryptContext
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from time import perf_counter
+from app.core import profiling
+from app.core.config import settings
+from app.core.metrics import BCRYPT_DURATION
 
-# Configure the password hashing scheme
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=1)
+def _pwd_context():
+    """Build the password hashing context on first use.
+
+    passlib and its bcrypt backend are imported lazily so that importing the
+    application does not pay for them.
+    """
+    from passlib.context import CryptContext
+
+    # Configure the password hashing scheme
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
     """Hash a plain password.
@@ -11,7 +27,12 @@ def hash_password(password: str) -> str:
     Returns:
         A bcrypt hashed password string.
     """
-    return pwd_context.hash(password)
+    start = perf_counter()
+    hashed = _pwd_context().hash(password)
+    elapsed = perf_counter() - start
+    BCRYPT_DURATION.observe(elapsed, ("hash",))
+    profiling.record(("service", "bcrypt"), elapsed)
+    return hashed
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash.
@@ -22,4 +43,28 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if the password matches, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    start = perf_counter()
+    valid = _pwd_context().verify(plain_password, hashed_password)
+    elapsed = perf_counter() - start
+    BCRYPT_DURATION.observe(elapsed, ("verify",))
+    profiling.record(("service", "bcrypt"), elapsed)
+    return valid
+
+@lru_cache(maxsize=1)
+def _bcrypt_pool() -> ThreadPoolExecutor:
+    # Sized like the login/signup concurrency limit, so admitted requests never queue here
+    return ThreadPoolExecutor(max_workers=settings.BCRYPT_CONCURRENCY, thread_name_prefix="bcrypt")
+
+async def _in_bcrypt_pool(fn, *args):
+    # bcrypt releases the GIL, so hashing in threads keeps the event loop free;
+    # the context is copied so the timing lands in the request's profile
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool(), context.run, fn, *args)
+
+async def hash_password_async(password: str) -> str:
+    """``hash_password`` in the bcrypt thread pool, for use on the event loop."""
+    return await _in_bcrypt_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` in the bcrypt thread pool, for use on the event loop."""
+    return await _in_bcrypt_pool(verify_password, plain_password, hashed_password)
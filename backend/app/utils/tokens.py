@@ -0,0 +1,83 @@
+"""Stateless signed session tokens.
+
+A token is ``<payload>.<signature>``, both base64url encoded, where the
+payload is compact JSON with the user id, username, issue and expiry times,
+and the signature is HMAC-SHA256 over the encoded payload. Verifying a token
+needs only the secret, so any process sharing ``SESSION_SECRET`` can
+authenticate a request without touching session storage.
+
+Logged-out tokens are kept in a small in-memory revocation list until they
+would have expired anyway.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional
+from app.core.config import settings
+
+@dataclass(frozen=True, slots=True)
+class SessionClaims:
+    """Verified contents of a signed session token."""
+    user_id: str
+    username: str
+    issued_at: int
+    expires_at: int
+
+# Signature -> expiry timestamp for tokens revoked before they expire
+revoked: dict[str, int] = {}
+
+_fallback_secret: Optional[bytes] = None
+
+def _secret() -> bytes:
+    global _fallback_secret
+    if settings.SESSION_SECRET:
+        return settings.SESSION_SECRET.encode()
+    # Without a configured secret, tokens are only valid within this process
+    if _fallback_secret is None:
+        _fallback_secret = secrets.token_bytes(32)
+    return _fallback_secret
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_secret(), payload.encode(), hashlib.sha256).digest())
+
+def sign_session(user_id: str, username: str, now: Optional[int] = None) -> str:
+    """Issue a signed session token for a user."""
+    issued_at = int(time.time()) if now is None else now
+    claims = {"uid": user_id, "usr": username, "iat": issued_at, "exp": issued_at + settings.SESSION_TTL_SECONDS}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+def verify_session(token: str, now: Optional[int] = None) -> Optional[SessionClaims]:
+    """Return the claims of a valid, unexpired, unrevoked token, else None."""
+    payload, _, signature = token.partition(".")
+    if not signature or not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+        return None
+    if signature in revoked:
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims["exp"] <= (int(time.time()) if now is None else now):
+        return None
+    return SessionClaims(claims["uid"], claims["usr"], claims["iat"], claims["exp"])
+
+def revoke_session(token: str) -> None:
+    """Reject a token until it expires. Expired entries are pruned on each call."""
+    claims = verify_session(token)
+    now = int(time.time())
+    for signature in [s for s, expires_at in revoked.items() if expires_at <= now]:
+        del revoked[signature]
+    if claims is not None:
+        revoked[token.rpartition(".")[2]] = claims.expires_at
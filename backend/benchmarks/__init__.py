@@ -0,0 +1,4 @@
+"""Performance benchmarks for the Snake Arena backend.
+
+Each module is runnable on its own, e.g. ``python -m benchmarks.leaderboard_pagination``.
+"""
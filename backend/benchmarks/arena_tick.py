@@ -0,0 +1,72 @@
+"""Arena tick benchmark.
+
+Fills a default-size arena with 100, 500 and 1000 randomly steering snakes
+(dead ones respawn so the count stays constant) and reports the cost of a
+tick. For comparison it also times the collision check done the naive way,
+testing every head against every other snake's body, which is what the
+occupancy grid replaces.
+
+Usage:
+    python -m benchmarks.arena_tick [--ticks 500] [--snakes 100 500 1000]
+"""
+
+import argparse
+import random
+import time
+
+from app.core.config import settings
+from app.models.domain import Direction
+from app.services.arena import Arena
+from benchmarks.harness import percentile
+
+DIRECTIONS = list(Direction)
+
+def naive_collisions(board: Arena) -> int:
+    """Heads inside any body, checked pairwise: O(snakes^2 * length)."""
+    hits = 0
+    snakes = list(board.snakes.values())
+    for snake in snakes:
+        head = snake.body[-1]
+        for other in snakes:
+            if other is not snake and head in other.body:
+                hits += 1
+    return hits
+
+def run(snakes: int, ticks: int, rng: random.Random) -> tuple[list[float], list[float], float]:
+    board = Arena(settings.ARENA_WIDTH, settings.ARENA_HEIGHT, settings.ARENA_FOOD, seed=1)
+    for n in range(snakes):
+        board.spawn(f"bot-{n}", f"Bot{n}")
+
+    tick_us, naive_us, length = [], [], 0
+    for t in range(ticks):
+        for snake in board.snakes.values():
+            if rng.random() < 0.1:
+                board.turn(snake.id, rng.choice(DIRECTIONS))
+        start = time.perf_counter()
+        dead = board.tick()
+        tick_us.append((time.perf_counter() - start) * 1e6)
+        for snake in dead:
+            board.spawn(snake.id, snake.username)
+        if t % 10 == 0:
+            start = time.perf_counter()
+            naive_collisions(board)
+            naive_us.append((time.perf_counter() - start) * 1e6)
+        length += sum(len(s.body) for s in board.snakes.values()) / max(1, len(board.snakes))
+    return sorted(tick_us), sorted(naive_us), length / ticks
+
+def main(counts: list[int], ticks: int) -> None:
+    rng = random.Random(1)
+    print(f"{settings.ARENA_WIDTH}x{settings.ARENA_HEIGHT} board, {ticks} ticks")
+    print(f"{'snakes':>7}{'avg len':>9}{'tick p50 us':>13}{'p99 us':>9}{'us/snake':>10}{'naive check us':>16}")
+    for snakes in counts:
+        tick_us, naive_us, length = run(snakes, ticks, rng)
+        p50 = percentile(tick_us, 0.5)
+        print(f"{snakes:>7}{length:>9.1f}{p50:>13.0f}{percentile(tick_us, 0.99):>9.0f}"
+              f"{p50 / snakes:>10.2f}{percentile(naive_us, 0.5):>16.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--snakes", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+    main(args.snakes, args.ticks)
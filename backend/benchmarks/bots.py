@@ -0,0 +1,59 @@
+"""Bot player CPU benchmark.
+
+Runs 10, 100 and 1000 bot games on default-size boards, moving every bot
+once per tick (dead bots start a new game), and reports the CPU cost of one
+bot per tick, how many bots a wake's time budget covers at that cost, and
+how often the distance field is rebuilt per food eaten. For comparison it
+also times the naive approach of running a fresh BFS from the food before
+every move, which is what keeping the field between moves replaces.
+
+Usage:
+    python -m benchmarks.bots [--ticks 1000] [--bots 10 100 1000]
+"""
+
+import argparse
+import statistics
+import time
+
+from app.core.config import settings
+from app.services import bots
+from benchmarks.harness import percentile
+
+def run(count: int, ticks: int, naive: bool) -> tuple[list[float], float, list[int]]:
+    games = bots.start(count, settings.BOT_BOARD_SIZE, seed=1)
+    tick_us, scores = [], []
+    eaten = 0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        for game in games:
+            if naive:
+                game._field_food = -1
+            if not game.step():
+                scores.append(game.score)
+                eaten += game.score // bots.FOOD_POINTS
+                game.reset()
+        tick_us.append((time.perf_counter() - start) * 1e6 / count)
+    eaten += sum(game.score // bots.FOOD_POINTS for game in games)
+    rebuilds = sum(game.rebuilds for game in games) / max(1, eaten)
+    return sorted(tick_us), rebuilds, scores
+
+def main(counts: list[int], ticks: int) -> None:
+    size = settings.BOT_BOARD_SIZE
+    budget_us = settings.BOT_BUDGET_SECONDS * 1e6
+    print(f"{size}x{size} boards, {ticks} ticks, {budget_us / 1000:g} ms budget per wake")
+    print(f"{'bots':>6}{'us/bot/tick':>13}{'p99':>8}{'bots/budget':>13}{'rebuilds/food':>15}"
+          f"{'avg final score':>17}{'naive us/bot/tick':>19}")
+    for count in counts:
+        tick_us, rebuilds, scores = run(count, ticks, naive=False)
+        naive_us, _, _ = run(count, max(1, ticks // 10), naive=True)
+        p50 = percentile(tick_us, 0.5)
+        final = f"{statistics.mean(scores):.0f}" if scores else "-"
+        print(f"{count:>6}{p50:>13.1f}{percentile(tick_us, 0.99):>8.1f}{budget_us / p50:>13.0f}"
+              f"{rebuilds:>15.2f}{final:>17}{percentile(naive_us, 0.5):>19.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--bots", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+    main(args.bots, args.ticks)
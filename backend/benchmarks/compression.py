@@ -0,0 +1,78 @@
+"""Response compression cost vs bandwidth benchmark.
+
+Captures real payloads from the in-process app (a 100-entry leaderboard page
+and the live player list with 200 players), then reports for each gzip level
+the compressed size, the CPU time to compress, the time for a cache hit
+(digest + lookup) and the bytes saved per CPU millisecond. Finally it polls
+both routes end to end with and without ``Accept-Encoding: gzip``.
+
+Usage:
+    python -m benchmarks.compression [--requests 2000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import gzip
+import random
+import timeit
+
+from app.core.compression import CompressedBodyCache
+from app.models.domain import GameMode
+from benchmarks.harness import drive, in_process_client
+from benchmarks.scenarios import _signup, populate_active_players
+
+PATHS = {
+    "leaderboard": "/api/game/leaderboard?limit=100",
+    "live_players": "/api/live/players",
+}
+
+async def seed(client) -> None:
+    await _signup(client, "compression-bench")
+    modes = [m.value for m in GameMode]
+    for _ in range(150):
+        await client.post("/api/game/score", json={"score": random.randint(0, 5000), "mode": random.choice(modes)})
+    populate_active_players(200)
+
+def per_call_us(fn, number: int = 200) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+def report_payload(name: str, body: bytes) -> None:
+    print(f"\n{name}: {len(body)} bytes")
+    print(f"  {'level':<7}{'bytes':>9}{'ratio':>8}{'compress us':>14}{'cache hit us':>14}{'KB saved/CPU ms':>17}")
+    for level in (1, 6, 9):
+        compressed = gzip.compress(body, compresslevel=level, mtime=0)
+        cost = per_call_us(lambda: gzip.compress(body, compresslevel=level, mtime=0))
+        cache = CompressedBodyCache(16, level)
+        cache.compress(body)
+        hit = per_call_us(lambda: cache.compress(body), number=2000)
+        saved_kb_per_ms = (len(body) - len(compressed)) / 1024 / (cost / 1000)
+        print(f"  {level:<7}{len(compressed):>9}{len(compressed) / len(body):>8.2f}{cost:>14.1f}{hit:>14.2f}{saved_kb_per_ms:>17.1f}")
+
+async def main(requests: int, concurrency: int) -> None:
+    async with in_process_client() as client:
+        await seed(client)
+        for name, path in PATHS.items():
+            response = await client.get(path, headers={"Accept-Encoding": "identity"})
+            report_payload(name, response.content)
+
+        print(f"\n{'route':<16}{'encoding':<10}{'req/s':>10}{'p95 ms':>9}{'bytes/req':>11}")
+        for name, path in PATHS.items():
+            for encoding in ("identity", "gzip"):
+                transferred = 0
+
+                async def request(i: int) -> bool:
+                    nonlocal transferred
+                    async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+                        async for chunk in response.aiter_raw():
+                            transferred += len(chunk)
+                    return response.status_code == 200
+
+                result = await drive(name, request, requests, concurrency)
+                print(f"{name:<16}{encoding:<10}{result.rps:>10.1f}{result.p95_ms:>9.2f}{transferred / requests:>11.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,92 @@
+"""Cross-worker event bus benchmark.
+
+Starts 4 worker processes, each with its own event loop and bus connection
+(one of them hosts the broker, as under ``uvicorn --workers 4``). Every
+worker publishes score events as fast as it can, yielding to its loop
+every few events the way request handlers would. Each worker counts the
+events it receives from the other three until all of them have arrived.
+The run is repeated with batching off (one frame per event) and on, and
+reports delivered events per second across all workers and the
+publish-to-handler latency.
+
+Usage:
+    python -m benchmarks.event_bus [--workers 4] [--events 50000] [--batch-size 256] [--batch-delay 0.002]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+from app.core.event_bus import Bus
+from benchmarks.harness import percentile
+
+async def worker(path: str, index: int, workers: int, events: int, batch_size: int, batch_delay: float, ready, go, results) -> None:
+    expected = events * (workers - 1)
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    def on_score(worker_id: str, data: dict) -> None:
+        latencies.append(time.monotonic() - data["t"])
+        if len(latencies) == expected:
+            done.set()
+
+    bus = Bus(path, batch_size=batch_size, batch_delay=batch_delay, handlers={"score": [on_score]}, worker_id=str(index))
+    bus.start()
+    await bus.connected.wait()
+    ready.wait()
+    await asyncio.to_thread(go.wait)
+    start = time.monotonic()
+    for i in range(events):
+        bus.publish("score", {"userId": f"user-{index}-{i}", "username": f"Player{i}", "mode": "walls", "score": i, "t": time.monotonic()})
+        if i % 32 == 31:
+            await asyncio.sleep(0)
+    await asyncio.wait_for(done.wait(), 120)
+    elapsed = time.monotonic() - start
+    # Stay connected until the others have their events too
+    results.put((len(latencies) / elapsed, sorted(latencies)))
+    await asyncio.to_thread(go.wait)
+    await bus.close()
+
+def run_worker(*args) -> None:
+    asyncio.run(worker(*args))
+
+def run(workers: int, events: int, batch_size: int, batch_delay: float) -> tuple[float, float, float]:
+    context = multiprocessing.get_context("spawn")
+    path = os.path.join(tempfile.mkdtemp(), "bus.sock")
+    ready = context.Barrier(workers + 1)
+    go = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=run_worker, args=(path, i, workers, events, batch_size, batch_delay, ready, go, results))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+    go.wait()
+    collected = [results.get() for _ in range(workers)]
+    go.wait()
+    for process in processes:
+        process.join()
+    rate = sum(rate for rate, _ in collected)
+    latencies = sorted(latency for _, worker_latencies in collected for latency in worker_latencies)
+    return rate, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+
+def main(workers: int, events: int, batch_size: int, batch_delay: float) -> None:
+    print(f"{workers} workers each publishing {events:,} events, {os.cpu_count()} CPU cores")
+    print(f"{'batching':<22}{'delivered/s':>13}{'p50 ms':>9}{'p99 ms':>9}")
+    for label, size, delay in (("off", 1, 0.0), (f"{batch_size} / {batch_delay * 1000:g} ms", batch_size, batch_delay)):
+        rate, p50, p99 = run(workers, events, size, delay)
+        print(f"{label:<22}{rate:>13,.0f}{p50:>9.1f}{p99:>9.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batch-delay", type=float, default=0.002)
+    args = parser.parse_args()
+    main(args.workers, args.events, args.batch_size, args.batch_delay)
@@ -0,0 +1,122 @@
+"""Streaming score export benchmark.
+
+Seeds a SQLite file database with synthetic scores in a subprocess
+(``python -m app.seed``), so seeding memory does not count towards this
+process, then streams ``GET /api/admin/scores/export`` in-process through the
+real ``get_db`` dependency and reports rows/s, MB/s and RSS at start, while
+streaming and at peak. RSS should stay flat however many rows are exported.
+
+Usage:
+    python -m benchmarks.export_scores [--rows 1000000] [--format ndjson|csv]
+    python -m benchmarks.export_scores --rows 10000000 --db /tmp/export.db   # reuses an existing database
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SCORES_PER_USER = 5
+
+CREATE_TABLES = """
+import asyncio
+import app.models.sql
+from app.core.database import Base, get_engine
+
+async def create():
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+asyncio.run(create())
+"""
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def seed(database_url: str, rows: int) -> None:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    subprocess.run([sys.executable, "-c", CREATE_TABLES], env=env, check=True)
+    users = max(1, rows // SCORES_PER_USER)
+    subprocess.run(
+        [sys.executable, "-m", "app.seed", "--users", str(users), "--scores-per-user", str(SCORES_PER_USER),
+         "--batch-size", "50000", "--seed", "1"],
+        env=env, check=True
+    )
+
+async def export(fmt: str) -> None:
+    # Drive the ASGI app directly: httpx's ASGITransport buffers the whole body
+    from app.main import app
+
+    rss_start = rss_mb()
+    rss_max = rss_start
+    transferred = lines = 0
+    status = None
+
+    disconnected = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses wait on receive() for a client disconnect
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal rss_max, transferred, lines, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            transferred += len(body)
+            lines += body.count(b"\n")
+            rss_max = max(rss_max, rss_mb())
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/admin/scores/export", "raw_path": b"/api/admin/scores/export",
+        "query_string": f"format={fmt}".encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"x-admin-token", b"bench")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    seconds = time.perf_counter() - start
+    disconnected.set()
+    if status != 200:
+        raise SystemExit(f"export failed with status {status}")
+
+    rows = lines - (1 if fmt == "csv" else 0)
+    print(f"exported {rows:,} rows, {transferred / 2**20:,.1f} MB in {seconds:.1f}s")
+    print(f"  {rows / seconds:,.0f} rows/s, {transferred / 2**20 / seconds:,.1f} MB/s")
+    print(f"  RSS at start {rss_start:.1f} MB, max while streaming {rss_max:.1f} MB, process peak {peak_rss_mb():.1f} MB")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="approximate scores to seed")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--db", help="SQLite file to use; seeded only if it does not exist yet")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "export.db")
+    database_url = f"sqlite+aiosqlite:///{os.path.abspath(path)}"
+    if not os.path.exists(path):
+        seed(database_url, args.rows)
+
+    # Settings are read on import, so configure them before importing the app
+    os.environ.update({"DATABASE_URL": database_url, "ADMIN_TOKEN": "bench", "RATE_LIMIT_ENABLED": "false"})
+    asyncio.run(export(args.format))
+
+if __name__ == "__main__":
+    main()
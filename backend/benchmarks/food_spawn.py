@@ -0,0 +1,73 @@
+"""Food spawning benchmark at high fill ratios.
+
+Fills boards of several sizes to 50%, 90% and 99% snake, and to all but
+one cell, then times picking a random empty cell for food two ways:
+drawing random cells until one is free (what the frontend and the arena
+used to do) and drawing from a ``FreeCellIndex``. Retrying costs about
+1 / (1 - fill) draws, so it degrades as the board fills; the index costs
+the same at any fill. The index has to be kept up to date on every move,
+so the cost of that (one remove and one add) is reported too.
+
+Usage:
+    python -m benchmarks.food_spawn [--sizes 20 64 256] [--spawns 2000]
+"""
+
+import argparse
+import random
+import time
+
+from app.utils.free_cells import FreeCellIndex
+from benchmarks.harness import percentile
+
+def retry_until_free(occupied: bytearray, rng: random.Random) -> int:
+    cells = len(occupied)
+    while True:
+        cell = rng.randrange(cells)
+        if not occupied[cell]:
+            return cell
+
+def timed(fn, repeat: int) -> float:
+    """Median time of ``fn`` in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return percentile(sorted(samples), 0.5)
+
+def main(sizes: list[int], spawns: int) -> None:
+    rng = random.Random(1)
+    print(f"{'board':>9}{'fill':>8}{'free':>8}{'retry us':>10}{'p99':>10}{'index us':>10}{'update us':>11}")
+    for size in sizes:
+        cells = size * size
+        for fill in (0.5, 0.9, 0.99, None):
+            taken = cells - 1 if fill is None else int(cells * fill)
+            occupied = bytearray(cells)
+            index = FreeCellIndex(cells)
+            for cell in rng.sample(range(cells), taken):
+                occupied[cell] = 1
+                index.remove(cell)
+
+            retry = sorted(timed(lambda: retry_until_free(occupied, rng), 1) for _ in range(spawns))
+            indexed = timed(lambda: index.choice(rng), spawns)
+            moved = next(cell for cell in range(cells) if occupied[cell])
+
+            def update():
+                # A move: the head takes a free cell and the tail frees one
+                head = index.choice(rng)
+                index.remove(head)
+                index.add(moved)
+                index.remove(moved)
+                index.add(head)
+            updated = timed(update, spawns)
+
+            label = "all-1" if fill is None else f"{fill:.0%}"
+            print(f"{f'{size}x{size}':>9}{label:>8}{cells - taken:>8,}{percentile(retry, 0.5):>10.2f}"
+                  f"{percentile(retry, 0.99):>10.1f}{indexed:>10.2f}{updated / 2:>11.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 64, 256])
+    parser.add_argument("--spawns", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.sizes, args.spawns)
@@ -0,0 +1,158 @@
+"""Load-test harness shared by the benchmark scenarios.
+
+Clients are either in-process (httpx ``ASGITransport`` against ``app.main:app``
+with a throwaway SQLite file database, like ``tests/conftest.py``) or remote
+(a running uvicorn at a given base URL). Scenarios hammer the API from one
+client, so the in-process app runs without rate limits, as in the tests;
+start a remote server with ``RATE_LIMIT_ENABLED=false`` to compare.
+"""
+
+import os
+
+# Keep the rate limiter off for the in-process app; this must precede importing app.main
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import asyncio
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict, field
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+class RequestFailed(Exception):
+    """Raised by a scenario request with the reason it failed, e.g. ``HTTP 500``."""
+
+@dataclass
+class Result:
+    """Throughput and latency summary for one scenario run."""
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    # Failed requests by cause: a RequestFailed reason, an exception class or "failed"
+    error_causes: dict = field(default_factory=dict)
+    extra: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(q * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+@asynccontextmanager
+async def in_process_client() -> AsyncIterator[AsyncClient]:
+    """Client for the ASGI app backed by a fresh SQLite file database."""
+    from app.core.database import Base, get_db
+    from app.main import app
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    # Concurrent writers wait for the lock instead of failing with "database is locked"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _wal(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    async def _get_db():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+@asynccontextmanager
+async def remote_client(base_url: str) -> AsyncIterator[AsyncClient]:
+    """Client for a running server, e.g. ``http://localhost:3000``."""
+    async with AsyncClient(base_url=base_url, timeout=30) as client:
+        yield client
+
+async def drive(
+    scenario: str,
+    request: Callable[[int], Awaitable[bool]],
+    requests: int,
+    concurrency: int
+) -> Result:
+    """Issue ``requests`` calls of ``request(i)`` from ``concurrency`` workers.
+
+    ``request`` returns False (or raises) for a failed call; failures are
+    counted by cause in ``Result.error_causes``.
+    """
+    latencies: list[float] = []
+    error_causes: dict[str, int] = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            cause = None
+            try:
+                if not await request(i):
+                    cause = "failed"
+            except RequestFailed as e:
+                cause = str(e)
+            except Exception as e:
+                cause = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            if cause is not None:
+                error_causes[cause] = error_causes.get(cause, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return Result(
+        scenario=scenario,
+        requests=requests,
+        concurrency=concurrency,
+        errors=sum(error_causes.values()),
+        seconds=round(seconds, 4),
+        rps=round(requests / seconds, 1) if seconds else 0.0,
+        p50_ms=round(percentile(latencies, 0.50), 3),
+        p95_ms=round(percentile(latencies, 0.95), 3),
+        p99_ms=round(percentile(latencies, 0.99), 3),
+        max_ms=round(latencies[-1], 3) if latencies else 0.0,
+        error_causes=dict(sorted(error_causes.items(), key=lambda item: -item[1])),
+    )
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe scenarios whose req/s dropped or p95 grew by more than ``threshold``."""
+    baseline_by_name = {r["scenario"]: r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old: Optional[dict] = baseline_by_name.get(result["scenario"])
+        if old is None:
+            continue
+        if old["rps"] and result["rps"] < old["rps"] * (1 - threshold):
+            regressions.append(f"{result['scenario']}: req/s {old['rps']} -> {result['rps']}")
+        if old["p95_ms"] and result["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append(f"{result['scenario']}: p95 {old['p95_ms']} ms -> {result['p95_ms']} ms")
+    return regressions
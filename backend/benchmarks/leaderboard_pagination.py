@@ -0,0 +1,102 @@
+"""Leaderboard pagination benchmark.
+
+Compares the latency of the first leaderboard page with a deep page
+(page 10,000 by default) using keyset cursors, and shows what the same
+deep page costs with an OFFSET scan.
+
+Usage:
+    python -m benchmarks.leaderboard_pagination [--rows 200000] [--page 10000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import desc, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.database import Base
+from app.models.domain import GameMode, LeaderboardEntry
+from app.models.sql import Score
+from app.services import database as db
+
+async def seed(session: AsyncSession, rows: int) -> None:
+    """Insert ``rows`` random scores."""
+    modes = [m.value for m in GameMode]
+    batch = 10_000
+    for start in range(0, rows, batch):
+        await session.execute(insert(Score), [
+            {
+                "user_id": str(i % 5000),
+                "username": f"player{i % 5000}",
+                "score": random.randint(0, 100_000),
+                "mode": random.choice(modes),
+                "date": datetime(2024, 11, 1),
+            }
+            for i in range(start, min(start + batch, rows))
+        ])
+    await session.commit()
+
+async def timed(fn, repeat: int) -> float:
+    """Return the median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+async def main(rows: int, page: int, limit: int, repeat: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as session:
+        print(f"Seeding {rows:,} scores...")
+        await seed(session, rows)
+
+        # Build the cursor of the last row on the previous page once, outside the timing
+        offset = (page - 1) * limit
+        result = await session.execute(
+            select(Score).order_by(desc(Score.score), Score.id).offset(offset - 1).limit(1)
+        )
+        anchor = result.scalar_one()
+        cursor = db.encode_leaderboard_cursor(LeaderboardEntry(
+            id=str(anchor.id), username=anchor.username, score=anchor.score,
+            mode=GameMode(anchor.mode), date="", rank=offset
+        ))
+
+        async def first_page():
+            await db.get_leaderboard(session, limit=limit)
+
+        async def deep_page_keyset():
+            entries = await db.get_leaderboard(session, limit=limit, cursor=cursor)
+            assert entries[0].rank == offset + 1
+
+        async def deep_page_offset():
+            result = await session.execute(
+                select(Score).order_by(desc(Score.score), Score.id).offset(offset).limit(limit)
+            )
+            result.scalars().all()
+
+        print(f"{'page 1 (keyset)':<24}{await timed(first_page, repeat):8.3f} ms")
+        print(f"{f'page {page:,} (keyset)':<24}{await timed(deep_page_keyset, repeat):8.3f} ms")
+        print(f"{f'page {page:,} (OFFSET)':<24}{await timed(deep_page_offset, repeat):8.3f} ms")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.page, args.limit, args.repeat))
@@ -0,0 +1,74 @@
+"""Live game sharding benchmark.
+
+Runs the same bot games in the event loop's process (0 workers) and then
+sharded over 1, 2, 4 and 8 worker processes, with every game moving as fast
+as its worker allows. It reports total moves per second, the speedup over
+one process, and how long the API process takes to read one game's latest
+frame and the whole player list out of shared memory while the workers
+keep writing. Workers share nothing but their segments, so moves per
+second scale up to the number of CPU cores, which is printed first.
+
+Usage:
+    python -m benchmarks.live_shards [--games 2000] [--seconds 5] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import time
+
+from app.core.config import settings
+from app.services import bots
+from app.services.live_shards import ShardPool
+from benchmarks.harness import percentile
+
+def in_process(games: int, seconds: float) -> float:
+    """Moves per second with every game in this process."""
+    board = bots.start(games, settings.BOT_BOARD_SIZE, seed=1)
+    moves = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for game in board:
+            game.advance(0.0)
+        moves += len(board)
+    return moves / (time.perf_counter() - start)
+
+def sharded(games: int, workers: int, seconds: float) -> tuple[float, float, float]:
+    """Moves per second across the pool, and median single and full-list read times in us."""
+    pool = ShardPool(games, workers, settings.BOT_BOARD_SIZE, paced=False)
+    try:
+        while len(pool.players()) < games:
+            time.sleep(0.1)
+        before, start = pool.moves(), time.perf_counter()
+        time.sleep(seconds)
+        rate = (pool.moves() - before) / (time.perf_counter() - start)
+        # Reads are timed separately, so the reader's CPU does not count against the workers
+        single, full = [], []
+        for player_id in list(pool.games)[:1000]:
+            t = time.perf_counter()
+            pool.player(player_id)
+            single.append((time.perf_counter() - t) * 1e6)
+        for _ in range(5):
+            t = time.perf_counter()
+            pool.players()
+            full.append((time.perf_counter() - t) * 1e6)
+        return rate, percentile(sorted(single), 0.5), percentile(sorted(full), 0.5)
+    finally:
+        pool.close()
+
+def main(games: int, seconds: float, counts: list[int]) -> None:
+    size = settings.BOT_BOARD_SIZE
+    print(f"{games:,} games on {size}x{size} boards, {os.cpu_count()} CPU cores")
+    print(f"{'workers':>8}{'moves/s':>12}{'speedup':>9}{'read 1 us':>11}{'read all ms':>13}")
+    baseline = in_process(games, seconds)
+    print(f"{'0':>8}{baseline:>12,.0f}{1:>9.2f}{'-':>11}{'-':>13}")
+    for workers in counts:
+        rate, single, full = sharded(games, workers, seconds)
+        print(f"{workers:>8}{rate:>12,.0f}{rate / baseline:>9.2f}{single:>11.1f}{full / 1000:>13.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    main(args.games, args.seconds, args.workers)
@@ -0,0 +1,63 @@
+"""Metrics instrumentation overhead microbenchmark.
+
+Measures the cost of a single histogram observation and the per-request
+overhead added by ``MetricsMiddleware`` around a trivial ASGI app, and fails
+if the middleware costs more than the budget per request.
+
+Usage:
+    python -m benchmarks.metrics_overhead [--requests 200000] [--budget-us 5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import timeit
+
+from app.core.metrics import Histogram, MetricsMiddleware
+
+class _Route:
+    path = "/api/game/leaderboard"
+
+async def endpoint(scope, receive, send):
+    """Minimal ASGI app that matches a route and returns an empty 200."""
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def per_request_us(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/game/leaderboard"}
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def main(requests: int, budget_us: float) -> int:
+    histogram = Histogram("bench", "bench", ("route", "method"))
+    labels = ("/api/game/leaderboard", "GET")
+    observe_ns = min(timeit.repeat(
+        lambda: histogram.observe(0.0042, labels), number=requests, repeat=5
+    )) / requests * 1e9
+
+    bare = min([await per_request_us(endpoint, requests) for _ in range(3)])
+    instrumented = min([await per_request_us(MetricsMiddleware(endpoint), requests) for _ in range(3)])
+    overhead = instrumented - bare
+
+    print(f"Histogram.observe:           {observe_ns:8.0f} ns")
+    print(f"bare ASGI request:           {bare:8.2f} us")
+    print(f"with MetricsMiddleware:      {instrumented:8.2f} us")
+    print(f"middleware overhead:         {overhead:8.2f} us (budget {budget_us} us)")
+    return 0 if overhead <= budget_us else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--budget-us", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests, args.budget_us)))
@@ -0,0 +1,58 @@
+"""DB row to domain model conversion microbenchmark.
+
+Compares the previous conversions (``User.model_validate`` from attributes,
+``LeaderboardEntry(...)`` with strftime and a per-row mode list) against the
+fast paths in ``app.services.database``: ``model_construct`` for users and a
+cached mode lookup with ``date().isoformat()`` for leaderboard entries.
+
+Usage:
+    python -m benchmarks.model_conversion [--rows 100000]
+"""
+
+import argparse
+import timeit
+from datetime import datetime
+
+from app.models.domain import GameMode, LeaderboardEntry, User
+from app.models.sql import Score as DBScore, User as DBUser
+from app.services.database import _to_leaderboard_entry, _user_from_row
+
+def validated_entry(score: DBScore, rank: int) -> LeaderboardEntry:
+    """The previous, fully validated conversion."""
+    return LeaderboardEntry(
+        id=str(score.id),
+        username=score.username,
+        score=score.score,
+        mode=GameMode(score.mode) if score.mode in [m.value for m in GameMode] else GameMode.WALLS,
+        date=score.date.strftime('%Y-%m-%d'),
+        rank=rank
+    )
+
+def per_row_us(fn, rows: int) -> float:
+    return min(timeit.repeat(fn, number=rows, repeat=5)) / rows * 1e6
+
+def main(rows: int) -> None:
+    db_user = DBUser(
+        id="1", username="PixelMaster", email="pixel@game.com", password="$2b$12$" + "x" * 53,
+        high_score=1250, games_played=45, created_at=datetime(2024, 1, 15)
+    )
+    db_score = DBScore(
+        id=1, user_id="1", username="PixelMaster", score=1250,
+        mode=GameMode.WALLS.value, date=datetime(2024, 11, 25)
+    )
+
+    cases = [
+        ("User", lambda: User.model_validate(db_user), lambda: _user_from_row(db_user)),
+        ("LeaderboardEntry", lambda: validated_entry(db_score, 1), lambda: _to_leaderboard_entry(db_score, 1)),
+    ]
+    print(f"{'model':<20}{'before':>12}{'after':>12}{'speedup':>10}")
+    for name, previous, fast in cases:
+        before = per_row_us(previous, rows)
+        after = per_row_us(fast, rows)
+        print(f"{name:<20}{before:>9.2f} us{after:>9.2f} us{before / after:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,63 @@
+"""Player prefix search microbenchmark.
+
+Loads ``PrefixIndex`` with synthetic usernames and high scores, then reports
+load time and RSS growth, search latency percentiles by prefix length (broad
+prefixes are measured both on their first, uncached query and afterwards),
+and the cost of signups and high score updates.
+
+Usage:
+    python -m benchmarks.player_search [--users 1000000] [--queries 20000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from app.utils.prefix_index import PrefixIndex
+from benchmarks.export_scores import rss_mb
+from benchmarks.harness import percentile
+
+SYLLABLES = ["ka", "zu", "ne", "on", "pix", "el", "ma", "ster", "ni", "nja", "ret", "ro", "sn", "ake", "vi", "per"]
+
+def username(rng: random.Random, n: int) -> str:
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{name.capitalize()}{n}"
+
+def timed_us(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1e6
+
+def main(users: int, queries: int) -> None:
+    rng = random.Random(1)
+    players = [(str(uuid.uuid4()), username(rng, n), int(rng.lognormvariate(5.4, 0.8))) for n in range(users)]
+    names = [name for _, name, _ in players]
+
+    rss_before = rss_mb()
+    index = PrefixIndex()
+    start = time.perf_counter()
+    index.load(players)
+    print(f"loaded {len(index):,} players in {time.perf_counter() - start:.2f}s, RSS +{rss_mb() - rss_before:.0f} MB")
+
+    cold = [timed_us(index.search, prefix, 10) for prefix in "abcdefghijklmnopqrstuvwxyz"]
+    print(f"first query, 1-char prefixes: p50 {percentile(sorted(cold), 0.5):.0f} us, max {max(cold):.0f} us")
+
+    print(f"{'prefix len':<12}{'p50 us':>9}{'p99 us':>9}{'max us':>9}")
+    for length in range(1, 7):
+        samples = sorted(
+            timed_us(index.search, rng.choice(names)[:length], 10) for _ in range(queries)
+        )
+        print(f"{length:<12}{percentile(samples, 0.5):>9.1f}{percentile(samples, 0.99):>9.1f}{samples[-1]:>9.1f}")
+
+    adds = sorted(timed_us(index.add, str(uuid.uuid4()), username(rng, users + i), 0) for i in range(2000))
+    updates = sorted(timed_us(index.update_score, rng.choice(names), rng.randint(0, 5000)) for _ in range(2000))
+    print(f"add (signup):        p50 {percentile(adds, 0.5):.1f} us, p99 {percentile(adds, 0.99):.1f} us")
+    print(f"update_score:        p50 {percentile(updates, 0.5):.1f} us, p99 {percentile(updates, 0.99):.1f} us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.users, args.queries)
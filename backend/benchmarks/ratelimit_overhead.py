@@ -0,0 +1,58 @@
+"""Rate limiter overhead microbenchmark.
+
+Measures ``TokenBucketLimiter.acquire`` for a hot key and for a churn of
+distinct clients filling the bounded bucket table, and the per-request
+overhead ``RateLimitMiddleware`` adds around a trivial ASGI app.
+
+Usage:
+    python -m benchmarks.ratelimit_overhead [--requests 200000]
+"""
+
+import argparse
+import asyncio
+import time
+import timeit
+
+from app.core.ratelimit import RateLimitMiddleware, RouteLimit, TokenBucketLimiter
+from benchmarks.metrics_overhead import endpoint, receive, send
+
+async def per_request_us(app, requests: int, distinct_clients: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "method": "GET", "path": "/api/game/leaderboard",
+            "headers": [(b"cookie", f"snake_session=token-{i % distinct_clients}".encode())],
+            "client": ("10.0.0.1", 1234),
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def main(requests: int) -> None:
+    hot = TokenBucketLimiter(rate=1e9, burst=10**9)
+    hot_ns = min(timeit.repeat(lambda: hot.acquire("client"), number=requests, repeat=5)) / requests * 1e9
+
+    churn = TokenBucketLimiter(rate=1, burst=10, max_keys=100_000)
+    keys = [f"client-{i}" for i in range(requests)]
+    start = time.perf_counter()
+    for key in keys:
+        churn.acquire(key)
+    churn_ns = (time.perf_counter() - start) / requests * 1e9
+
+    middleware = RateLimitMiddleware(
+        endpoint, routes={"/api/game/leaderboard": RouteLimit(rate=1e9, burst=10**9)},
+        default=RouteLimit(rate=1e9, burst=10**9), prefix="/api"
+    )
+    bare = min([await per_request_us(endpoint, requests, 1000) for _ in range(3)])
+    limited = min([await per_request_us(middleware, requests, 1000) for _ in range(3)])
+
+    print(f"{'acquire (hot key)':<32}{hot_ns:8.0f} ns")
+    print(f"{'acquire (distinct keys)':<32}{churn_ns:8.0f} ns  ({len(churn):,} buckets kept)")
+    print(f"{'bare ASGI request':<32}{bare:8.2f} us")
+    print(f"{'with RateLimitMiddleware':<32}{limited:8.2f} us")
+    print(f"{'middleware overhead':<32}{limited - bare:8.2f} us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
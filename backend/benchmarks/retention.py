@@ -0,0 +1,95 @@
+"""Hot table size versus query latency benchmark.
+
+Seeds a SQLite file database with synthetic players whose games are spread
+over a year, then archives progressively more of it with the retention job
+(keeping everything newer than 180, 90 and 30 days). After each step it
+reports the hot table size, how long the job took, and the median latency
+of the queries that scale with ``scores``: a leaderboard page, the rank
+count done on every submission, a page centred on a player, and a deep
+player history page, which also reads the archive.
+
+Usage:
+    python -m benchmarks.retention [--users 50000] [--scores-per-user 20] [--user-top-k 3]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.database import Base
+from app.models.domain import GameMode
+from app.models.sql import Score
+from app.retention import run_retention
+from app.seed import seed_synthetic
+from app.services import database as db
+
+async def timed(fn, repeat: int) -> float:
+    """Return the median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+async def main(users: int, scores_per_user: float, user_top_k: int, mode_top_n: int, repeat: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "retention.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    print(f"Seeding {users:,} players...")
+    now = datetime.now()
+    await seed_synthetic(engine, users, scores_per_user, batch_size=20_000, tag="bench", seed=1, progress=False)
+
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        player = await session.scalar(select(Score.user_id).group_by(Score.user_id).order_by(func.count().desc()).limit(1))
+        low_score = 10
+
+    async def measure(session: AsyncSession) -> list[float]:
+        async def leaderboard():
+            await db.get_leaderboard(session, GameMode.WALLS, 10)
+
+        async def submission_rank():
+            # What submit_score counts to rank a low (i.e. typical-to-poor) score
+            await session.scalar(select(func.count()).select_from(Score).where(Score.score > low_score))
+
+        async def around_player():
+            await db.get_leaderboard(session, None, 10, None, player)
+
+        async def history():
+            await db.get_player_history(session, player, 50)
+
+        return [await timed(fn, repeat) for fn in (leaderboard, submission_rank, around_player, history)]
+
+    header = f"{'keep days':<11}{'hot rows':>12}{'job s':>8}{'top 10':>10}{'rank':>10}{'around':>10}{'history':>10}"
+    print(f"{header}\n{'':<41}{'(median ms)':>40}")
+    for days in (None, 180, 90, 30):
+        seconds = 0.0
+        if days is not None:
+            start = time.perf_counter()
+            await run_retention(engine, days, user_top_k, mode_top_n, batch_users=2000, now=now, progress=False)
+            seconds = time.perf_counter() - start
+        async with Session() as session:
+            hot = await session.scalar(select(func.count()).select_from(Score))
+            latencies = await measure(session)
+        print(f"{days or 'all':<11}{hot:>12,}{seconds:>8.1f}" + "".join(f"{ms:>10.2f}" for ms in latencies))
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--scores-per-user", type=float, default=20)
+    parser.add_argument("--user-top-k", type=int, default=3)
+    parser.add_argument("--mode-top-n", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.scores_per_user, args.user_top_k, args.mode_top_n, args.repeat))
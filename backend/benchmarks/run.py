@@ -0,0 +1,98 @@
+"""Backend load-test runner.
+
+Runs the scenarios in ``benchmarks.scenarios`` either in-process (default)
+or against a running server, prints req/s and p50/p95/p99 latency, and can
+save results as JSON and compare them with a previous run.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --scenarios score_burst,leaderboard_polling --requests 2000
+    python -m benchmarks.run --url http://localhost:3000 --concurrency 50
+    python -m benchmarks.run --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --compare results/main.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.harness import compare, drive, in_process_client, remote_client
+from benchmarks.scenarios import SCENARIOS
+
+# bcrypt-bound scenarios are capped so a default run finishes quickly
+SLOW_SCENARIOS = {"signup_storm": 100, "login_storm": 100}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def run(names: list[str], requests: int, concurrency: int, url: str | None) -> dict:
+    results = []
+    for name in names:
+        # Each scenario gets a fresh client (and, in-process, a fresh database)
+        client_context = remote_client(url) if url else in_process_client()
+        async with client_context as client:
+            request = await SCENARIOS[name](client, url is None)
+            count = min(requests, SLOW_SCENARIOS.get(name, requests))
+            result = await drive(name, request, count, concurrency)
+        results.append(result.to_dict())
+        print(
+            f"{name:<22}{result.rps:>10.1f} req/s  p50 {result.p50_ms:>8.2f} ms  "
+            f"p95 {result.p95_ms:>8.2f} ms  p99 {result.p99_ms:>8.2f} ms  errors {result.errors}"
+        )
+        for cause, count in result.error_causes.items():
+            print(f"{'':<22}{count:>6} x {cause}")
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "target": url or "in-process",
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--url", help="base URL of a running server; in-process when omitted")
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    report = asyncio.run(run(names, args.requests, args.concurrency, args.url))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        print(f"\nCompared with {baseline.get('commit', '?')}: "
+              f"{'no regressions' if not regressions else f'{len(regressions)} regression(s)'}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Load-test scenarios.
+
+Each scenario takes a client and whether it talks to the app in-process,
+performs any setup, and returns the per-request coroutine function
+that ``harness.drive`` calls.
+"""
+
+import random
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from httpx import AsyncClient
+
+from app.models.domain import ActivePlayer, GameMode
+from benchmarks.harness import RequestFailed
+
+RequestFn = Callable[[int], Awaitable[bool]]
+
+def _ok(response) -> bool:
+    if response.status_code != 200:
+        raise RequestFailed(f"HTTP {response.status_code}")
+    body = response.json()
+    if body.get("success", True) is not True:
+        raise RequestFailed(str(body.get("error"))[:80])
+    return True
+
+async def _signup(client: AsyncClient, name: str) -> bool:
+    response = await client.post("/api/auth/signup", json={
+        "email": f"{name}@bench.example.com",
+        "password": "bench-password",
+        "username": name
+    })
+    return _ok(response)
+
+async def signup_storm(client: AsyncClient, in_process: bool) -> RequestFn:
+    """Many distinct users signing up at once (bcrypt hash per request)."""
+    run = uuid.uuid4().hex[:8]
+
+    async def request(i: int) -> bool:
+        return await _signup(client, f"signup-{run}-{i}")
+
+    return request
+
+async def login_storm(client: AsyncClient, in_process: bool) -> RequestFn:
+    """Repeated logins against a small pool of users (bcrypt verify per request)."""
+    run = uuid.uuid4().hex[:8]
+    names = [f"login-{run}-{i}" for i in range(10)]
+    for name in names:
+        await _signup(client, name)
+
+    async def request(i: int) -> bool:
+        name = names[i % len(names)]
+        response = await client.post("/api/auth/login", json={
+            "email": f"{name}@bench.example.com",
+            "password": "bench-password"
+        })
+        return _ok(response)
+
+    return request
+
+async def score_burst(client: AsyncClient, in_process: bool) -> RequestFn:
+    """One logged-in player submitting scores as fast as possible."""
+    await _signup(client, f"scorer-{uuid.uuid4().hex[:8]}")
+    modes = [m.value for m in GameMode]
+
+    async def request(i: int) -> bool:
+        response = await client.post("/api/game/score", json={
+            "score": random.randint(0, 5000),
+            "mode": modes[i % len(modes)]
+        })
+        return _ok(response)
+
+    return request
+
+async def score_batch(client: AsyncClient, in_process: bool) -> RequestFn:
+    """Offline sync uploading batches of 20 results per request."""
+    await _signup(client, f"syncer-{uuid.uuid4().hex[:8]}")
+    modes = [m.value for m in GameMode]
+
+    async def request(i: int) -> bool:
+        response = await client.post("/api/game/scores/batch", json={"scores": [
+            {"score": random.randint(0, 5000), "mode": modes[j % len(modes)], "gameId": f"{i}-{j}"}
+            for j in range(20)
+        ]})
+        return _ok(response)
+
+    return request
+
+async def leaderboard_polling(client: AsyncClient, in_process: bool) -> RequestFn:
+    """Clients polling the first leaderboard page, with and without a mode filter."""
+    await _signup(client, f"poller-{uuid.uuid4().hex[:8]}")
+    for _ in range(200):
+        await client.post("/api/game/score", json={
+            "score": random.randint(0, 5000),
+            "mode": random.choice([m.value for m in GameMode])
+        })
+    paths = ["/api/game/leaderboard", "/api/game/leaderboard?mode=walls"]
+
+    async def request(i: int) -> bool:
+        return _ok(await client.get(paths[i % len(paths)]))
+
+    return request
+
+def populate_active_players(count: int) -> None:
+    """Fill the in-process live player list (in-process runs only)."""
+    from app.services import database as db
+
+    db.active_players[:] = [
+        ActivePlayer(
+            id=f"bench-{i}",
+            username=f"bench-{i}",
+            currentScore=0,
+            mode=GameMode.WALLS,
+            gameState=db.generate_ai_game_state(),
+            startedAt=datetime.now()
+        )
+        for i in range(count)
+    ]
+
+async def live_polling(client: AsyncClient, in_process: bool) -> RequestFn:
+    """Spectators polling the live player list and individual streams."""
+    if in_process:
+        populate_active_players(50)
+
+    async def request(i: int) -> bool:
+        if i % 2:
+            return _ok(await client.get("/api/live/players"))
+        return (await client.get(f"/api/live/players/bench-{i % 50}")).status_code == 200
+
+    return request
+
+SCENARIOS: dict[str, Callable[[AsyncClient, bool], Awaitable[RequestFn]]] = {
+    "signup_storm": signup_storm,
+    "login_storm": login_storm,
+    "score_burst": score_burst,
+    "score_batch": score_batch,
+    "leaderboard_polling": leaderboard_polling,
+    "live_polling": live_polling,
+}
@@ -0,0 +1,66 @@
+"""Session authentication benchmark.
+
+Compares authenticating a request from the ``snake_session`` cookie with
+in-memory sessions (dict lookup plus a user query) against signed tokens
+(HMAC verification only).
+
+Usage:
+    python -m benchmarks.session_tokens [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.sql import User
+from app.services import database as db
+from app.utils import tokens
+
+async def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        assert await fn() is not None
+    return (time.perf_counter() - start) / iterations * 1e6
+
+async def main(iterations: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as session:
+        session.add(User(
+            id="1", username="PixelMaster", email="pixel@game.com", password="x",
+            high_score=0, games_played=0, created_at=datetime.now()
+        ))
+        await session.commit()
+
+        settings.SESSION_MODE = "memory"
+        memory_token = await db.create_session("1", "PixelMaster")
+        memory = await per_call_us(lambda: db.get_session_user(session, memory_token), iterations)
+
+        settings.SESSION_MODE = "signed"
+        settings.SESSION_SECRET = "benchmark-secret"
+        signed_token = await db.create_session("1", "PixelMaster")
+        signed = await per_call_us(lambda: db.get_session_user(session, signed_token), iterations)
+
+    verify_start = time.perf_counter()
+    for _ in range(iterations):
+        tokens.verify_session(signed_token)
+    verify = (time.perf_counter() - verify_start) / iterations * 1e6
+
+    print(f"{'memory session + user query':<32}{memory:8.2f} us")
+    print(f"{'signed token (get_session_user)':<32}{signed:8.2f} us")
+    print(f"{'signed token (verify only)':<32}{verify:8.2f} us")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
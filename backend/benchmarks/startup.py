@@ -0,0 +1,78 @@
+"""Startup (cold import) benchmark.
+
+Imports ``app.main`` in fresh interpreters with ``python -X importtime`` and
+reports the median cumulative import time, the slowest top-level packages,
+and whether modules that should be deferred were pulled in eagerly.
+
+Exits non-zero when the median exceeds the budget or a deferred module is
+imported, so it can gate CI.
+
+Usage:
+    python -m benchmarks.startup [--runs 7] [--budget-ms 800]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# Modules that must only be imported on first use, never at startup
+DEFERRED_MODULES = (
+    "passlib",
+    "bcrypt",
+    "aiosqlite",
+    "asyncpg",
+    "sqlalchemy.dialects.sqlite.aiosqlite",
+    "sqlalchemy.dialects.postgresql.asyncpg",
+)
+
+def import_profile(module: str) -> dict[str, tuple[int, int]]:
+    """Import ``module`` in a fresh interpreter; return {name: (self_us, cumulative_us)}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+def main(module: str, runs: int, budget_ms: float, top: int) -> int:
+    profiles = [import_profile(module) for _ in range(runs)]
+    totals = [p[module][1] / 1000 for p in profiles]
+    median_ms = statistics.median(totals)
+
+    # Attribute self time to top-level packages, using the median run
+    median_profile = profiles[totals.index(sorted(totals)[len(totals) // 2])]
+    by_package: dict[str, int] = defaultdict(int)
+    for name, (self_us, _) in median_profile.items():
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"import {module}: median {median_ms:.1f} ms over {runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}), budget {budget_ms:.0f} ms")
+    print(f"\nTop {top} packages by self time:")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {package:<24}{self_us / 1000:8.1f} ms")
+
+    eager = [name for name in DEFERRED_MODULES if name in median_profile]
+    failed = False
+    if eager:
+        print(f"\nFAIL: deferred modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if median_ms > budget_ms:
+        print(f"\nFAIL: median import time {median_ms:.1f} ms exceeds budget {budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=800.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(main(args.module, args.runs, args.budget_ms, args.top))
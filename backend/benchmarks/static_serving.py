@@ -0,0 +1,105 @@
+"""SPA shell and asset serving benchmark.
+
+Builds a synthetic frontend build (index.html, a JS bundle and a stylesheet
+under ``assets/``) in a temporary directory and compares serving it with
+``StaticFiles``/``FileResponse`` from disk against the in-memory
+precompressed ``mount_spa`` routes, reporting req/s and bytes transferred
+per request for first loads and for ``If-None-Match`` revalidations.
+
+Usage:
+    python -m benchmarks.static_serving [--requests 2000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from httpx import AsyncClient, ASGITransport
+
+from app.core import static
+from benchmarks.harness import drive
+
+BROWSER_ENCODINGS = "gzip, deflate, br"
+
+def write_build(directory: str) -> None:
+    """Write a build with Vite-like sizes: a few KB shell, a few hundred KB bundle."""
+    rng = random.Random(7)
+    words = ["snake", "score", "board", "player", "render", "state", "mode", "tick", "grid", "food"]
+    os.makedirs(os.path.join(directory, "assets"))
+    with open(os.path.join(directory, "index.html"), "w") as f:
+        f.write('<!doctype html><html lang="en"><head><meta charset="UTF-8" />')
+        f.write("".join(f'<meta name="{w}{i}" content="{w} arena {i}" />' for i, w in enumerate(words * 8)))
+        f.write('<script type="module" src="/assets/index-4f9a1c2e.js"></script>')
+        f.write('<link rel="stylesheet" href="/assets/index-8b3d0e71.css"></head><body><div id="root"></div></body></html>')
+    with open(os.path.join(directory, "assets", "index-4f9a1c2e.js"), "w") as f:
+        for i in range(6000):
+            a, b = rng.sample(words, 2)
+            f.write(f"function {a}{i}({b}){{return {b}.{a}+{rng.randint(0, 9999)}}}\n")
+    with open(os.path.join(directory, "assets", "index-8b3d0e71.css"), "w") as f:
+        for i in range(800):
+            f.write(f".{rng.choice(words)}-{i}{{margin:{rng.randint(0, 32)}px;color:#{rng.randint(0, 0xFFFFFF):06x}}}\n")
+
+def disk_app(directory: str) -> FastAPI:
+    """The previous setup: StaticFiles for assets, FileResponse for the shell."""
+    app = FastAPI()
+    app.mount("/assets", StaticFiles(directory=os.path.join(directory, "assets")), name="assets")
+
+    @app.get("/{full_path:path}")
+    async def serve_spa(full_path: str):
+        return FileResponse(os.path.join(directory, "index.html"))
+
+    return app
+
+def memory_app(directory: str) -> FastAPI:
+    app = FastAPI()
+    static.mount_spa(app, directory, "/api").load()
+    return app
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int, revalidate: bool) -> tuple[float, float]:
+    """Return (req/s, bytes transferred per request)."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        headers = {"Accept-Encoding": BROWSER_ENCODINGS}
+        if revalidate:
+            first = await client.get(path, headers=headers)
+            headers["If-None-Match"] = first.headers.get("etag", "")
+        transferred = 0
+
+        async def request(i: int) -> bool:
+            nonlocal transferred
+            # Count wire bytes, not the decoded body
+            async with client.stream("GET", path, headers=headers) as response:
+                async for chunk in response.aiter_raw():
+                    transferred += len(chunk)
+            return response.status_code in (200, 304)
+
+        result = await drive(path, request, requests, concurrency)
+    return result.rps, transferred / requests
+
+async def main(requests: int, concurrency: int) -> None:
+    directory = tempfile.mkdtemp()
+    write_build(directory)
+    apps = {"disk": disk_app(directory), "memory": memory_app(directory)}
+    print(f"brotli available: {static.brotli is not None}")
+    print(f"{'request':<36}{'server':<8}{'req/s':>10}{'bytes/req':>12}")
+    cases = [
+        ("/ (first load)", "/", False),
+        ("/ (revalidate)", "/", True),
+        ("/assets/index-4f9a1c2e.js", "/assets/index-4f9a1c2e.js", False),
+        ("/assets/index-8b3d0e71.css", "/assets/index-8b3d0e71.css", False),
+    ]
+    for label, path, revalidate in cases:
+        for name, app in apps.items():
+            rps, size = await run(app, path, requests, concurrency, revalidate)
+            print(f"{label:<36}{name:<8}{rps:>10.0f}{size:>12.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -18,6 +18,15 @@ until alembic upgrade head; do
 done
 
 
-# Start server
-echo "Starting server on port ${PORT:-8000}..."
-exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
+# Start server; workers keep their in-memory state in sync over the event bus
+WORKERS=${WORKERS:-1}
+if [ "$WORKERS" -gt 1 ]; then
+  export EVENT_BUS_SOCKET=${EVENT_BUS_SOCKET:-/tmp/snake_arena_bus.sock}
+  # The arena keeps its board in one process, so it is off with several workers
+  export ARENA_TICK_SECONDS=${ARENA_TICK_SECONDS:-0}
+fi
+echo "Starting server on port ${PORT:-8000} with $WORKERS worker(s)..."
+# Behind the platform's proxy, take the client IP from X-Forwarded-For so
+# rate limits key on real clients rather than the proxy
+exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000} --workers $WORKERS \
+  --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-*}"
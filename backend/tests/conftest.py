@@ -1,5 +1,10 @@
 """Test configuration."""
 
+import os
+
+# Rate limits are exercised explicitly in tests; keep them off for the shared app
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 import pytest
 import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
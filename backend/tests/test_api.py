@@ -38,6 +38,13 @@ async def seed_db(db_session):
     db_session.add_all(scores)
     await db_session.commit()
 
+@pytest.fixture(autouse=True)
+def reset_percentiles(monkeypatch):
+    """Start each test without histograms cached from another test's database."""
+    from app.services import percentiles
+    monkeypatch.setattr(percentiles, "histograms", None)
+    monkeypatch.setattr(percentiles, "_pending", {})
+
 @pytest.mark.asyncio
 class TestAuth:
     """Test authentication endpoints."""
@@ -54,6 +61,30 @@ class TestAuth:
         assert data["data"]["username"] == "PixelMaster"
         assert data["error"] is None
     
+    async def test_bcrypt_runs_off_the_event_loop(self, client, monkeypatch):
+        """Test concurrent logins and signups hash in the bcrypt pool, not on the event loop."""
+        import asyncio
+        import threading
+        from app.utils import security
+        threads = []
+
+        def traced(fn):
+            def wrapper(*args):
+                threads.append(threading.current_thread().name)
+                return fn(*args)
+            return wrapper
+        monkeypatch.setattr(security, "verify_password", traced(security.verify_password))
+        monkeypatch.setattr(security, "hash_password", traced(security.hash_password))
+
+        logins = [client.post("/api/auth/login", json={"email": "pixel@game.com", "password": "password123"})
+                  for _ in range(3)]
+        signup = client.post("/api/auth/signup", json={
+            "email": "pooled@game.com", "password": "password123", "username": "Pooled"
+        })
+        responses = await asyncio.gather(*logins, signup)
+        assert all(response.json()["success"] for response in responses)
+        assert len(threads) == 4 and all(name.startswith("bcrypt") for name in threads)
+
     async def test_login_invalid_email(self, client):
         """Test login with invalid email."""
         response = await client.post("/api/auth/login", json={
@@ -103,6 +134,63 @@ class TestAuth:
         data = response.json()
         assert data["success"] is False
         assert data["error"] == "Username already taken"
+
+    async def test_conflict_messages_name_the_constraint(self):
+        """Test conflicts are told apart by constraint name, not by words in the driver message."""
+        from sqlalchemy.exc import IntegrityError
+        from app.services.database import _conflict_message
+
+        def conflict(message, constraint=None):
+            orig = Exception(message)
+            orig.constraint_name = constraint
+            return _conflict_message(IntegrityError("INSERT", {}, orig))
+
+        assert conflict("UNIQUE constraint failed: users.email") == "Email already exists"
+        assert conflict("UNIQUE constraint failed: users.username") == "Username already taken"
+        postgres = 'duplicate key value violates unique constraint "{}"\nDETAIL:  Key ({})=(my-email-fan) already exists.'
+        assert conflict(postgres.format("ix_users_username", "username")) == "Username already taken"
+        assert conflict(postgres.format("users_email_key", "email")) == "Email already exists"
+        assert conflict("duplicate key: my-email-fan", constraint="ix_users_username") == "Username already taken"
+        assert conflict("duplicate key", constraint="ix_users_email") == "Email already exists"
+
+    async def test_username_available(self, client, monkeypatch):
+        """Test availability checks, including names registered after the filter loaded."""
+        from app.services import database as db
+        monkeypatch.setattr(db, "username_filter", None)
+
+        async def available(username):
+            response = await client.get("/api/auth/username-available", params={"username": username})
+            return response.json()["data"]["available"]
+
+        assert await available("PixelMaster") is False
+        assert await available("FreshName") is True
+
+        await client.post("/api/auth/signup", json={
+            "email": "fresh@email.com",
+            "password": "password123",
+            "username": "FreshName"
+        })
+        assert "FreshName" in db.username_filter
+        assert await available("FreshName") is False
+
+    async def test_username_filter_concurrent_cold_load(self, db_session, monkeypatch):
+        """Test concurrent first checks share one load instead of racing on a half-built filter."""
+        import asyncio
+        from app.services import database as db
+        monkeypatch.setattr(db, "username_filter", None)
+
+        results = await asyncio.gather(*(db.is_username_available(db_session, name) for name in ("PixelMaster", "Nobody")))
+        assert results == [False, True]
+
+    async def test_bloom_filter_error_rate(self):
+        """Test the Bloom filter has no false negatives and about the configured false positive rate."""
+        from app.utils.bloom import BloomFilter
+
+        bloom = BloomFilter(10_000, error_rate=0.01)
+        bloom.update(f"user-{i}" for i in range(10_000))
+        assert all(f"user-{i}" in bloom for i in range(10_000))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        assert false_positives < 200
     
     async def test_logout(self, client):
         """Test logout."""
@@ -142,6 +230,50 @@ class TestAuth:
         assert data["data"]["username"] == "PixelMaster"
 
 
+@pytest.mark.asyncio
+class TestSignedSessions:
+    """Test stateless signed session tokens."""
+
+    @pytest.fixture(autouse=True)
+    def signed_mode(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "SESSION_MODE", "signed")
+        monkeypatch.setattr(settings, "SESSION_SECRET", "test-secret")
+
+    async def test_signed_session_flow(self, client):
+        """Test login, authenticated calls and logout revocation with signed tokens."""
+        from app.services import database as db
+        sessions_before = len(db.sessions)
+
+        response = await client.post("/api/auth/login", json={
+            "email": "pixel@game.com",
+            "password": "password123"
+        })
+        token = response.cookies["snake_session"]
+        assert len(db.sessions) == sessions_before
+
+        response = await client.get("/api/auth/me")
+        assert response.json()["data"]["username"] == "PixelMaster"
+
+        response = await client.post("/api/game/score", json={"score": 10, "mode": "walls"})
+        assert response.json()["data"]["username"] == "PixelMaster"
+
+        await client.post("/api/auth/logout")
+        client.cookies.set("snake_session", token)
+        response = await client.get("/api/auth/me")
+        assert response.json()["success"] is False
+
+    async def test_signed_token_rejects_tampering_and_expiry(self):
+        """Test that altered or expired tokens do not verify."""
+        from app.utils import tokens
+        token = tokens.sign_session("1", "PixelMaster", now=1_000)
+        assert tokens.verify_session(token, now=1_001).user_id == "1"
+
+        signature = token.split(".")[1]
+        forged = tokens.sign_session("2", "NeonNinja", now=1_000).split(".")[0]
+        assert tokens.verify_session(f"{forged}.{signature}", now=1_001) is None
+        assert tokens.verify_session(token, now=10**10) is None
+
 @pytest.mark.asyncio
 class TestGame:
     """Test game endpoints."""
@@ -162,7 +294,55 @@ class TestGame:
         data = response.json()
         assert data["success"] is True
         assert all(entry["mode"] == "walls" for entry in data["data"])
-    
+
+    async def test_get_leaderboard_cursor_pagination(self, client, db_session):
+        """Test walking the leaderboard with keyset cursors."""
+        db_session.add_all([
+            Score(user_id='2', username='NeonNinja', score=500, mode=GameMode.WALLS.value, date=datetime(2024, 11, 20))
+            for _ in range(5)
+        ])
+        await db_session.commit()
+
+        response = await client.get("/api/game/leaderboard?limit=3")
+        first_page = response.json()["data"]
+        assert [e["rank"] for e in first_page] == [1, 2, 3]
+        cursor = response.headers["X-Next-Cursor"]
+
+        response = await client.get(f"/api/game/leaderboard?limit=3&cursor={cursor}")
+        second_page = response.json()["data"]
+        assert [e["rank"] for e in second_page] == [4, 5, 6]
+
+        response = await client.get(f"/api/game/leaderboard?limit=3&cursor={response.headers['X-Next-Cursor']}")
+        last_page = response.json()["data"]
+        assert [e["rank"] for e in last_page] == [7]
+        assert "X-Next-Cursor" not in response.headers
+
+        ids = [e["id"] for e in first_page + second_page + last_page]
+        assert len(set(ids)) == 7
+
+    async def test_get_leaderboard_invalid_cursor(self, client):
+        """Test leaderboard with a malformed cursor."""
+        response = await client.get("/api/game/leaderboard?cursor=not-a-cursor")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert data["error"] == "Invalid cursor"
+
+    async def test_get_leaderboard_around_user(self, client, db_session):
+        """Test leaderboard page centred on a user's best score."""
+        db_session.add_all([
+            Score(user_id='9', username='Filler', score=1500 - i * 100, mode=GameMode.WALLS.value, date=datetime(2024, 11, 20))
+            for i in range(10)
+        ])
+        await db_session.commit()
+
+        response = await client.get("/api/game/leaderboard?limit=3&around_user=2")
+        data = response.json()
+        assert data["success"] is True
+        entries = data["data"]
+        assert [e["score"] for e in entries] == [1000, 980, 900]
+        assert [e["rank"] for e in entries] == [7, 8, 9]
+
     async def test_submit_score_not_logged_in(self, client):
         """Test submitting score when not logged in."""
         response = await client.post("/api/game/score", json={
@@ -194,6 +374,359 @@ class TestGame:
         assert data["data"]["username"] == "PixelMaster"
 
 
+    async def test_submit_score_idempotent_retry(self, client):
+        """Test that retries with the same Idempotency-Key are recorded once."""
+        from app.services import database as db
+        await client.post("/api/auth/login", json={
+            "email": "pixel@game.com",
+            "password": "password123"
+        })
+
+        headers = {"Idempotency-Key": "retry-test-1"}
+        first = await client.post("/api/game/score", json={"score": 700, "mode": "walls"}, headers=headers)
+        retry = await client.post("/api/game/score", json={"score": 700, "mode": "walls"}, headers=headers)
+        assert retry.json()["data"] == first.json()["data"]
+
+        # Past the cache, the unique index still prevents a second row
+        db.submitted_scores.clear()
+        retry = await client.post("/api/game/score", json={"score": 700, "mode": "walls", "gameId": "retry-test-1"})
+        assert retry.json()["data"]["id"] == first.json()["data"]["id"]
+
+        response = await client.get("/api/auth/me")
+        assert response.json()["data"]["gamesPlayed"] == 46
+
+    async def test_submit_scores_batch(self, client):
+        """Test batch submission ranks each item, dedupes game ids and aggregates stats."""
+        from app.services import database as db
+        await client.post("/api/auth/login", json={
+            "email": "neon@game.com",
+            "password": "password123"
+        })
+        single = await client.post("/api/game/score", json={"score": 500, "mode": "walls", "gameId": "g-0"})
+        db.submitted_scores.clear()
+
+        response = await client.post("/api/game/scores/batch", json={"scores": [
+            {"score": 2000, "mode": "walls", "gameId": "g-1"},
+            {"score": 1100, "mode": "pass-through", "gameId": "g-2"},
+            {"score": 500, "mode": "walls", "gameId": "g-0"},
+            {"score": 2000, "mode": "walls", "gameId": "g-1"},
+            {"score": 300, "mode": "walls"},
+        ]})
+        entries = response.json()["data"]
+
+        assert [e["rank"] for e in entries] == [1, 3, 5, 1, 6]
+        assert entries[2]["id"] == single.json()["data"]["id"]
+        assert entries[3] == entries[0]
+        assert entries[1]["mode"] == "pass-through"
+
+        me = (await client.get("/api/auth/me")).json()["data"]
+        assert me["highScore"] == 2000
+        assert me["gamesPlayed"] == 32 + 1 + 3
+
+    async def test_submit_scores_batch_not_logged_in(self, client):
+        """Test batch submission requires a session."""
+        response = await client.post("/api/game/scores/batch", json={"scores": [{"score": 10, "mode": "walls"}]})
+        assert response.json()["success"] is False
+
+    async def _seed_random_scores(self, db_session, n=300):
+        import random
+        rng = random.Random(42)
+        db_session.add_all(
+            Score(user_id='2', username='NeonNinja', score=int(rng.lognormvariate(5.4, 0.8)),
+                  mode=GameMode.WALLS.value, date=datetime(2024, 11, 1))
+            for _ in range(n)
+        )
+        await db_session.commit()
+
+    async def test_submit_score_percentile_matches_sql(self, client, db_session):
+        """Test the submitted entry's percentile against an exact count over scores."""
+        from sqlalchemy import select, func
+        await self._seed_random_scores(db_session)
+        await client.post("/api/auth/login", json={
+            "email": "pixel@game.com",
+            "password": "password123"
+        })
+
+        for score in [1, 50, 120, 221, 400, 999, 5000]:
+            walls = Score.mode == GameMode.WALLS.value
+            below = (await db_session.execute(select(func.count()).where(walls, Score.score < score))).scalar_one()
+            total = (await db_session.execute(select(func.count()).where(walls))).scalar_one()
+            response = await client.post("/api/game/score", json={"score": score, "mode": "walls"})
+            assert abs(response.json()["data"]["percentile"] - 100 * below / total) < 1.0
+
+    async def test_score_distribution_matches_sql(self, client, db_session):
+        """Test distribution quantiles against the sorted scores, within the histogram's 1% precision."""
+        from sqlalchemy import select
+        await self._seed_random_scores(db_session)
+        exact = (await db_session.execute(
+            select(Score.score).where(Score.mode == GameMode.WALLS.value).order_by(Score.score)
+        )).scalars().all()
+
+        data = (await client.get("/api/game/distribution", params={"mode": "walls"})).json()["data"]
+        assert data["count"] == len(exact)
+        for name, value in data["quantiles"].items():
+            expected = exact[max(1, round(int(name[1:]) / 100 * len(exact))) - 1]
+            assert value <= expected < value * 1.01 + 1
+
+    async def test_percentile_lookup_faster_than_sql(self, db_session):
+        """Test histogram lookups are faster than the equivalent count query."""
+        import time
+        from sqlalchemy import select, func
+        from app.services import percentiles
+        await self._seed_random_scores(db_session)
+        await percentiles.ensure_loaded(db_session)
+
+        start = time.perf_counter()
+        for score in range(1000):
+            percentiles.percentile_rank(GameMode.WALLS, score)
+        sketch = (time.perf_counter() - start) / 1000
+
+        start = time.perf_counter()
+        for score in range(0, 1000, 10):
+            await db_session.execute(
+                select(func.count()).where(Score.mode == GameMode.WALLS.value, Score.score < score)
+            )
+        sql = (time.perf_counter() - start) / 100
+
+        assert sketch < sql
+
+    async def test_percentile_flush_round_trip(self, db_session, monkeypatch):
+        """Test flushed histograms reload as persisted and later flushes add only new counts."""
+        from app.services import percentiles
+        await self._seed_random_scores(db_session, 50)
+        await percentiles.ensure_loaded(db_session)
+        percentiles.record(GameMode.WALLS, 700)
+        await percentiles.flush(db_session)
+        before = {mode: h.counts() for mode, h in percentiles.histograms.items()}
+
+        monkeypatch.setattr(percentiles, "histograms", None)
+        await percentiles.ensure_loaded(db_session)
+        assert {mode: h.counts() for mode, h in percentiles.histograms.items()} == before
+        assert percentiles.histograms["walls"].total == 52
+
+        percentiles.record(GameMode.PASS_THROUGH, 10)
+        await percentiles.flush(db_session)
+        await percentiles.flush(db_session)
+        assert percentiles.histograms["pass-through"].total == 2
+        assert percentiles.histograms["walls"].total == 52
+
+@pytest.mark.asyncio
+class TestPlayers:
+    """Test player endpoints."""
+
+    async def test_search_players_by_prefix(self, client, monkeypatch):
+        """Test prefix search is case-insensitive, ranked by high score and kept current."""
+        from app.services import database as db
+        monkeypatch.setattr(db, "player_index", None)
+
+        async def search(q):
+            response = await client.get("/api/players/search", params={"q": q})
+            return [(p["username"], p["highScore"]) for p in response.json()["data"]]
+
+        assert await search("pIX") == [("PixelMaster", 1250)]
+        assert await search("zzz") == []
+
+        await client.post("/api/auth/signup", json={
+            "email": "pixie@game.com",
+            "password": "password123",
+            "username": "Pixie"
+        })
+        assert await search("pix") == [("PixelMaster", 1250), ("Pixie", 0)]
+
+        await client.post("/api/game/score", json={"score": 2000, "mode": "walls"})
+        assert await search("pix") == [("Pixie", 2000), ("PixelMaster", 1250)]
+
+    async def test_player_index_concurrent_cold_load(self, db_session, monkeypatch):
+        """Test concurrent first searches share one load instead of racing on a half-built index."""
+        import asyncio
+        from app.services import database as db
+        monkeypatch.setattr(db, "player_index", None)
+
+        results = await asyncio.gather(*(db.search_players(db_session, q) for q in ("pix", "pix")))
+        assert [[m.username for m in matches] for matches in results] == [["PixelMaster"], ["PixelMaster"]]
+
+    async def test_prefix_index_cached_prefixes_match_scan(self):
+        """Test cached top lists for broad prefixes stay equal to a full scan."""
+        import random
+        from app.utils.prefix_index import PrefixIndex
+
+        rng = random.Random(3)
+        index = PrefixIndex(max_results=5, scan_limit=3)
+        players = {}
+        index.load([])
+        for i in range(400):
+            name = "".join(rng.choice("abc") for _ in range(4)) + str(i)
+            if rng.random() < 0.5 or not players:
+                players[name] = 0
+                index.add(str(i), name)
+            else:
+                name = rng.choice(list(players))
+                players[name] = max(players[name], rng.randint(0, 1000))
+                index.update_score(name, players[name])
+            prefix = rng.choice(["a", "b", "ab", "c", "ca"])
+            expected = sorted((n for n in players if n.startswith(prefix)), key=lambda n: (-players[n], n))[:5]
+            assert [name for _, name, _ in index.search(prefix, 5)] == expected
+
+    async def test_player_stats_maintained_on_submit(self, client, db_session):
+        """Test stats rebuilt from scores stay equal to aggregates over scores as games are submitted."""
+        from app.services import player_stats
+        conn = await db_session.connection()
+        await conn.run_sync(player_stats.rebuild)
+        await db_session.commit()
+
+        await client.post("/api/auth/login", json={
+            "email": "pixel@game.com",
+            "password": "password123"
+        })
+        await client.post("/api/game/score", json={"score": 100, "mode": "walls"})
+        await client.post("/api/game/score", json={"score": 300, "mode": "pass-through"})
+        await client.post("/api/game/scores/batch", json={"scores": [
+            {"score": 50, "mode": "walls"},
+            {"score": 700, "mode": "pass-through"},
+        ]})
+
+        response = await client.get("/api/players/1/stats")
+        stats = response.json()["data"]
+        assert stats["gamesPlayed"] == 5
+        assert stats["averageScore"] == 480.0
+        assert stats["bestScore"] == 1250
+        assert (stats["currentStreak"], stats["longestStreak"]) == (1, 1)
+        assert stats["lastPlayed"] == datetime.now().date().isoformat()
+        assert stats["modes"] == [
+            {"mode": "pass-through", "gamesPlayed": 2, "averageScore": 500.0, "bestScore": 700},
+            {"mode": "walls", "gamesPlayed": 3, "averageScore": 466.7, "bestScore": 1250},
+        ]
+        assert [g["score"] for g in stats["recentGames"]] == [700, 50, 300, 100, 1250]
+        assert "X-Next-Cursor" not in response.headers
+
+        missing = await client.get("/api/players/nobody/stats")
+        assert missing.json()["error"] == "Player not found"
+
+    async def test_player_history_keyset_pages_and_streaks(self, client, db_session):
+        """Test history pages cover every game once, newest first, and rebuilt streaks."""
+        from datetime import timedelta
+        from app.services import player_stats
+        start = datetime(2024, 10, 1, 12)
+        days = [0, 1, 2, 2, 2, 5, 6, 7, 8, 10, 10, 11]
+        db_session.add_all(
+            Score(user_id='2', username='NeonNinja', score=i * 10, mode=GameMode.WALLS.value, date=start + timedelta(days=d))
+            for i, d in enumerate(days)
+        )
+        await db_session.commit()
+        conn = await db_session.connection()
+        await conn.run_sync(player_stats.rebuild)
+        await db_session.commit()
+
+        games, cursor = [], None
+        while True:
+            params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/players/2/history", params=params)
+            games.extend(response.json()["data"])
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        ordered = sorted(games, key=lambda g: (g["playedAt"], int(g["id"])), reverse=True)
+        assert games == ordered
+        assert len({g["id"] for g in games}) == len(days) + 1
+
+        stats = (await client.get("/api/players/2/stats")).json()["data"]
+        assert stats["longestStreak"] == 4
+        assert stats["currentStreak"] == 0
+        assert stats["lastPlayed"] == "2024-11-24"
+        assert player_stats.streaks([start.date() + timedelta(days=d) for d in days]) == (2, 4)
+
+        invalid = await client.get("/api/players/2/history", params={"cursor": "bad"})
+        assert invalid.json()["success"] is False
+
+
+@pytest.mark.asyncio
+class TestArena:
+    """Test the shared-board arena."""
+
+    async def test_food_spawns_on_free_cells(self):
+        """Test the free-cell index tracks the grid and food fills the last empty cells."""
+        import random
+        from app.models.domain import Direction
+        from app.services.arena import Arena, EMPTY
+        from app.utils.free_cells import FreeCellIndex
+
+        index = FreeCellIndex(5)
+        index.remove(1)
+        index.remove(4)
+        index.remove(1)
+        index.add(4)
+        assert len(index) == 4 and 1 not in index and 4 in index
+        rng = random.Random(1)
+        assert {index.choice(rng) for _ in range(200)} == {0, 2, 3, 4}
+
+        # A 10x4 board with rows 0-2 filled by snakes leaves 10 empty cells for 10 food
+        board = Arena(10, 4, food_target=0, seed=1)
+        for row in range(3):
+            board.place(f"s{row}", f"S{row}", [row * 10 + x for x in range(10)], Direction.RIGHT)
+        board._spawn_food(20)
+        assert board.food == set(range(30, 40)) and len(board.free) == 0
+        assert all(cell not in board.free for cell in range(40) if board.grid[cell] != EMPTY)
+
+    async def test_tick_moves_eats_and_collides(self):
+        """Test growth on food, wall and head-on deaths, bodies turning to food, and tail following."""
+        from app.models.domain import Direction
+        from app.services.arena import Arena, FOOD
+        board = Arena(10, 10, food_target=0)
+        board.grid[3] = FOOD
+        board.food.add(3)
+        eater = board.place("eater", "Eater", [0, 1, 2], Direction.RIGHT)
+        board.place("wall", "Wall", [92, 91, 90], Direction.LEFT)
+        board.place("left", "Left", [50, 51], Direction.RIGHT)
+        board.place("right", "Right", [54, 53], Direction.LEFT)
+        board.place("leader", "Leader", [70, 71, 72], Direction.RIGHT)
+        follower = board.place("follower", "Follower", [81, 80], Direction.UP)
+
+        dead = board.tick()
+
+        assert {s.id for s in dead} == {"wall", "left", "right"}
+        assert list(eater.body) == [0, 1, 2, 3] and eater.score == 10
+        assert list(follower.body) == [80, 70]
+        assert board.grid[70] == follower.slot + 1
+        # Every other cell of a dead body becomes food
+        assert board.food == {92, 90, 51, 53}
+        assert set(board.snakes) == {"eater", "leader", "follower"}
+
+        # Reversing is ignored; running into a body kills
+        assert board.turn("eater", Direction.LEFT)
+        board.place("crasher", "Crasher", [52, 62], Direction.DOWN)
+        dead = board.tick()
+        assert [s.id for s in dead] == ["crasher"]
+        assert eater.direction == Direction.RIGHT
+
+    async def test_join_turn_state_and_record(self, client, db_session, monkeypatch):
+        """Test the arena endpoints and that a player's final score is recorded as an arena game."""
+        from app.services import arena
+        monkeypatch.setattr(arena, "arena", arena.Arena(40, 20, food_target=5, seed=1))
+
+        assert (await client.post("/api/arena/join")).json()["success"] is False
+        await client.post("/api/auth/login", json={"email": "pixel@game.com", "password": "password123"})
+        joined = (await client.post("/api/arena/join")).json()["data"]
+        assert joined["username"] == "PixelMaster" and len(joined["body"]) == 3
+        assert (await client.post("/api/arena/join")).json()["data"] == joined
+
+        response = await client.post("/api/arena/turn", json={"direction": "UP"})
+        assert response.json()["success"] is True
+        state = (await client.get("/api/arena/state")).json()["data"]
+        assert (state["width"], state["height"], len(state["food"])) == (40, 20, 5)
+        assert [s["id"] for s in state["snakes"]] == ["1"]
+        head = joined["body"][-1]
+        far = (await client.get("/api/arena/state", params={"x": (head["x"] + 20) % 40, "y": head["y"], "radius": 1})).json()
+        assert far["data"]["snakes"] == []
+
+        dead = []
+        while not dead:
+            dead = arena.arena.tick()
+        await arena.record_scores(db_session, dead)
+        board = (await client.get("/api/game/leaderboard", params={"mode": "arena"})).json()["data"]
+        assert [(e["username"], e["score"]) for e in board] == [("PixelMaster", dead[0].score)]
+        assert (await client.post("/api/arena/turn", json={"direction": "UP"})).json()["success"] is False
+
+
 @pytest.mark.asyncio
 class TestLive:
     """Test live player endpoints."""
@@ -218,6 +751,291 @@ class TestLive:
         assert data["success"] is False
         assert data["error"] == "Player not found"
 
+    async def test_bots_play_real_games(self, client, monkeypatch):
+        """Test bot games follow the rules and are served as live players."""
+        from app.services import bots, database as db
+        monkeypatch.setattr(db, "active_players", [])
+        monkeypatch.setattr(bots, "games", [])
+        games = bots.start(4, 20, seed=1)
+        for _ in range(500):
+            for game in games:
+                assert game.step()
+                body = list(game.body)
+                assert len(set(body)) == len(body) == sum(game.occupied)
+                assert all(b in game.neighbours[a] for a, b in zip(body, body[1:]))
+                assert game.food not in game.body
+        bots.publish()
+
+        players = (await client.get("/api/live/players")).json()["data"]
+        assert [p["id"] for p in players] == ["bot-0", "bot-1", "bot-2", "bot-3"]
+        assert [p["mode"] for p in players[:2]] == ["walls", "pass-through"]
+        assert all(p["currentScore"] > 0 for p in players)
+        stream = (await client.get("/api/live/players/bot-1")).json()["data"]
+        assert stream["gameState"] == games[1].player().model_dump(mode="json")["gameState"]
+        assert len(stream["gameState"]["snake"]) == 3 + games[1].score // 10
+
+    async def test_bot_pathing_and_budget(self, monkeypatch):
+        """Test bots take shortest paths and a wake stops at its time budget."""
+        from app.services import bots
+        monkeypatch.setattr(bots, "games", [])
+        games = bots.start(3, 20, seed=1)
+        game = games[0]
+        # Head at (10, 10) heading right; food at (15, 3) is 5 + 7 moves away
+        game.food = 3 * 20 + 15
+        moves = 0
+        while game.score == 0:
+            assert game.step()
+            moves += 1
+        assert moves == 12 and game.rebuilds == 1
+
+        for g in games:
+            g.due = 0.0
+        assert bots.move_due(now=1.0, budget=0) == (1, 2)
+        assert games[1].due == 0.0 and games[2].due == 0.0
+        # The bots deferred move first on the next wake
+        assert bots.move_due(now=1.0, budget=0) == (1, 1)
+        assert games[1].due > 1.0 and games[2].due == 0.0
+
+    async def test_sharded_live_games(self, client, monkeypatch):
+        """Test games played in worker processes are served from their shared memory frames."""
+        import asyncio
+        import random
+        from app.services import live_shards
+        from app.services.bots import BotGame
+        from app.models.domain import GameMode
+
+        # The newest frame wins, whichever ring slot it landed in
+        game = BotGame("bot-0", "Bot", GameMode.WALLS, 10, random.Random(1))
+        buf = memoryview(bytearray(live_shards.segment_size(1, 10)))
+        entry = live_shards.LiveGame("bot-0", "Bot", GameMode.WALLS, 0, 0)
+        assert live_shards.read_frame(buf, 1, 10, entry) is None
+        for seq in range(1, 7):
+            game.step()
+            live_shards.write_frame(buf, 1, 10, 0, seq, game)
+        assert live_shards.read_frame(buf, 1, 10, entry).gameState == game.player().gameState
+
+        pool = live_shards.ShardPool(6, 2, 10)
+        monkeypatch.setattr(live_shards, "pool", pool)
+        try:
+            assert {g.shard for g in pool.games.values()} == {0, 1}
+            for _ in range(200):
+                if len(pool.players()) == 6 and pool.moves() > 12:
+                    break
+                await asyncio.sleep(0.05)
+            players = (await client.get("/api/live/players")).json()["data"]
+            assert sorted(p["id"] for p in players) == [f"bot-{n}" for n in range(6)]
+            stream = (await client.get("/api/live/players/bot-3")).json()["data"]
+            snake = [(p["x"], p["y"]) for p in stream["gameState"]["snake"]]
+            assert stream["username"] == "ZigzagBot" and len(snake) >= 3
+            assert all(abs(ax - bx) + abs(ay - by) in (1, 9) for (ax, ay), (bx, by) in zip(snake, snake[1:]))
+        finally:
+            pool.close()
+
+    async def test_shard_reader_racing_writer(self, monkeypatch):
+        """Test a reader never accepts a ring slot the writer has started to reuse."""
+        import random
+        from app.services import live_shards
+        from app.services.bots import BotGame
+        from app.models.domain import GameMode
+
+        size, slots = 10, live_shards.RING_SLOTS
+        game = BotGame("bot-0", "Bot", GameMode.WALLS, size, random.Random(1))
+        buf = memoryview(bytearray(live_shards.segment_size(1, size)))
+        entry = live_shards.LiveGame("bot-0", "Bot", GameMode.WALLS, 0, 0)
+        live_shards.write_frame(buf, 1, size, 0, 1, game)
+        frame = live_shards._FRAME
+        published = []
+
+        class Racing:
+            """The frame struct, letting the writer run right after the reader took frame 1."""
+            size = frame.size
+            raced = False
+
+            def pack_into(self, *args):
+                frame.pack_into(*args)
+
+            def unpack_from(self, data, offset):
+                if not self.raced:
+                    self.raced = True
+                    for seq in range(2, slots + 1):
+                        game.step()
+                        live_shards.write_frame(buf, 1, size, 0, seq, game)
+                    published.append(game.player().gameState)
+                    # Frame slots + 1 goes into frame 1's slot; only its header is written so far
+                    frame.pack_into(buf, offset, 0.0, 999, 0, 0, 0, 0, 1)
+                return frame.unpack_from(data, offset)
+
+        monkeypatch.setattr(live_shards, "_FRAME", Racing())
+        assert live_shards.read_frame(buf, 1, size, entry).gameState == published[0]
+
+    async def test_multi_worker_features(self, client, tmp_path, monkeypatch):
+        """Test the shard pool sends its games over the bus, and the per-process arena is off with several workers."""
+        import asyncio
+        from app.core import event_bus
+        from app.core.config import settings
+        from app.main import app, lifespan
+        from app.services import live_shards
+
+        path = str(tmp_path / "bus.sock")
+        broker = event_bus.Bus(path, worker_id="broker")
+        received = []
+        other = event_bus.Bus(path, worker_id="other", handlers={"players": [lambda w, d: received.append(d)]})
+        broker.start()
+        await asyncio.wait_for(broker.connected.wait(), 5)
+        other.start()
+        await asyncio.wait_for(other.connected.wait(), 5)
+        monkeypatch.setattr(event_bus, "bus", broker)
+        task = asyncio.create_task(live_shards.run(4, 1, 10, 0.05))
+        try:
+            for _ in range(200):
+                if received and len(received[-1]) == 4:
+                    break
+                await asyncio.sleep(0.05)
+            assert sorted(p["id"] for p in received[-1]) == [f"bot-{n}" for n in range(4)]
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await other.close()
+            await broker.close()
+        assert live_shards.pool is None
+
+        monkeypatch.setattr(settings, "EVENT_BUS_SOCKET", path)
+        with pytest.raises(RuntimeError, match="ARENA_TICK_SECONDS=0"):
+            async with lifespan(app):
+                pass
+        monkeypatch.setattr(settings, "ARENA_TICK_SECONDS", 0)
+        response = (await client.get("/api/arena/state")).json()
+        assert response["success"] is False and response["error"] == "The arena is disabled"
+
+    async def test_shutdown_survives_a_failed_flush(self, tmp_path, monkeypatch):
+        """Test a database error flushing percentiles on shutdown still saves the snapshot and disposes the engine."""
+        import app.main as main
+        from app.core.config import settings
+        from app.services import percentiles, snapshot
+        from tests.conftest import TestingSessionLocal
+        path = str(tmp_path / "state.snapshot")
+        monkeypatch.setattr(settings, "BOTS", 0)
+        monkeypatch.setattr(settings, "SNAPSHOT_PATH", path)
+        monkeypatch.setattr(main, "get_sessionmaker", lambda: TestingSessionLocal)
+        disposed = []
+
+        async def dispose_engine():
+            disposed.append(True)
+
+        async def flush(session):
+            raise OSError("database is gone")
+        monkeypatch.setattr(main, "dispose_engine", dispose_engine)
+        monkeypatch.setattr(percentiles, "flush", flush)
+
+        async with main.lifespan(main.app):
+            pass
+        assert snapshot.load(path) is not None and disposed == [True]
+
+    async def test_startup_warms_indexes(self, db_session, tmp_path, monkeypatch):
+        """Test startup builds the username filter and player index, reusing those restored from a snapshot."""
+        import app.main as main
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from app.core.config import settings
+        from app.services import database as db
+        from tests.conftest import TestingSessionLocal
+        monkeypatch.setattr(settings, "BOTS", 0)
+        monkeypatch.setattr(settings, "SNAPSHOT_PATH", str(tmp_path / "state.snapshot"))
+        monkeypatch.setattr(main, "get_sessionmaker", lambda: TestingSessionLocal)
+
+        async def dispose_engine():
+            pass
+        monkeypatch.setattr(main, "dispose_engine", dispose_engine)
+        monkeypatch.setattr(db, "username_filter", None)
+        monkeypatch.setattr(db, "player_index", None)
+        scans = []
+        stream = AsyncSession.stream
+
+        def counted_stream(self, *args, **kwargs):
+            scans.append(args[0])
+            return stream(self, *args, **kwargs)
+        monkeypatch.setattr(AsyncSession, "stream", counted_stream)
+
+        async with main.lifespan(main.app):
+            assert "PixelMaster" in db.username_filter
+            assert [m.username for m in await db.search_players(db_session, "pix")] == ["PixelMaster"]
+        assert len(scans) == 2
+
+        # Restart: both come back from the snapshot saved on shutdown, without scanning users
+        monkeypatch.setattr(db, "username_filter", None)
+        monkeypatch.setattr(db, "player_index", None)
+        async with main.lifespan(main.app):
+            assert db.username_filter is not None and db.player_index is not None
+        assert len(scans) == 2
+
+    async def test_event_bus_syncs_workers(self, client, tmp_path, monkeypatch):
+        """Test events reach the other worker in one batch, update its state, and the broker fails over."""
+        import asyncio
+        import random
+        from app.core import event_bus
+        from app.services import database as db
+        from app.services.bots import BotGame
+        from app.utils import tokens
+        from app.utils.bloom import BloomFilter
+        monkeypatch.setattr(db, "remote_players", {})
+        monkeypatch.setattr(db, "username_filter", BloomFilter(100))
+        monkeypatch.setattr(db, "sessions", {"t-0": "u-0"})
+        monkeypatch.setattr(tokens, "revoked", {"sig": 1})
+
+        path = str(tmp_path / "bus.sock")
+        first = event_bus.Bus(path, worker_id="first")
+        monkeypatch.setattr(event_bus, "bus", first)
+        frames = []
+        dispatch = first._dispatch
+        monkeypatch.setattr(first, "_dispatch", lambda payload: (frames.append(payload), dispatch(payload)))
+        first.start()
+        await asyncio.wait_for(first.connected.wait(), 5)
+        received, synced = [], []
+        second = event_bus.Bus(path, worker_id="second", handlers={
+            "user": [lambda w, d: received.append((w, d))],
+            "sessions": [lambda w, d: synced.append(d)]
+        })
+        second.start()
+        await asyncio.wait_for(second.connected.wait(), 5)
+        assert first.is_broker and not second.is_broker
+
+        # On connecting, the new worker gets the sessions published before it joined
+        for _ in range(100):
+            if synced:
+                break
+            await asyncio.sleep(0.01)
+        assert synced == [{"sessions": {"t-0": "u-0"}, "revoked": {"sig": 1}}]
+        frames.clear()
+
+        game = BotGame("bot-9", "RemoteBot", GameMode.WALLS, 20, random.Random(1))
+        second.publish("user", {"id": "u-1", "username": "FarAway"})
+        second.publish("session", {"token": "t-1", "userId": "u-1"})
+        second.publish("players", [game.player().model_dump(mode="json")])
+        for _ in range(100):
+            if db.remote_players:
+                break
+            await asyncio.sleep(0.01)
+        assert len(frames) == 1 and received == []
+        assert "FarAway" in db.username_filter and db.sessions == {"t-0": "u-0", "t-1": "u-1"}
+        stream = (await client.get("/api/live/players/bot-9")).json()["data"]
+        assert stream["username"] == "RemoteBot" and db.remote_players["second"][1][0].id == "bot-9"
+
+        first.publish("user", {"id": "u-2", "username": "Back"})
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+        assert received == [("first", {"id": "u-2", "username": "Back"})]
+
+        # The broker's worker goes away; the other one takes over
+        await first.close()
+        for _ in range(100):
+            if second.is_broker and second.connected.is_set():
+                break
+            await asyncio.sleep(0.05)
+        assert second.is_broker
+        await second.close()
+
 
 @pytest.mark.asyncio
 class TestRoot:
@@ -229,3 +1047,467 @@ class TestRoot:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
+
+    async def test_metrics(self, client):
+        """Test metrics endpoint exposes route, bcrypt and gauge metrics."""
+        await client.post("/api/auth/login", json={
+            "email": "pixel@game.com",
+            "password": "password123"
+        })
+        await client.get("/api/live/players/some-id")
+
+        response = await client.get("/api/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'snake_http_request_duration_seconds_count{route="/api/auth/login",method="POST"}' in body
+        assert 'route="/api/live/players/{player_id}"' in body
+        assert 'snake_bcrypt_duration_seconds_count{operation="verify"}' in body
+        assert "snake_sessions " in body
+        assert "snake_active_players " in body
+
+
+@pytest.mark.asyncio
+class TestRateLimit:
+    """Test rate limiting middleware."""
+
+    async def test_login_budget_returns_429(self):
+        """Test that exceeding the login budget is rejected with Retry-After."""
+        from httpx import AsyncClient, ASGITransport
+        from app.core.ratelimit import RateLimitMiddleware, RouteLimit
+        from app.main import app
+
+        limited_app = RateLimitMiddleware(
+            app,
+            routes={"/api/auth/login": RouteLimit(rate=0.01, burst=2)},
+            default=RouteLimit(rate=100, burst=100),
+            prefix="/api"
+        )
+        credentials = {"email": "pixel@game.com", "password": "wrong"}
+        async with AsyncClient(transport=ASGITransport(app=limited_app), base_url="http://test") as c:
+            statuses = [(await c.post("/api/auth/login", json=credentials)).status_code for _ in range(3)]
+            response = await c.post("/api/auth/login", json=credentials)
+            assert (await c.get("/api/health")).status_code == 200
+
+        assert statuses == [200, 200, 429]
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert response.json()["error"] == "Too many requests"
+
+    async def test_unverified_session_cookies_share_the_address_bucket(self, monkeypatch):
+        """Test random session cookies do not buy fresh budgets, while verified sessions get their own."""
+        from httpx import AsyncClient, ASGITransport
+        from app.core.ratelimit import RateLimitMiddleware, RouteLimit
+        from app.main import app
+        from app.services import database as db
+        monkeypatch.setattr(db, "sessions", {"valid": "1"})
+
+        limited_app = RateLimitMiddleware(
+            app,
+            routes={"/api/auth/login": RouteLimit(rate=0.01, burst=2, by_address=True)},
+            default=RouteLimit(rate=0.01, burst=2),
+            prefix="/api",
+            session_user=db.session_user_id
+        )
+        credentials = {"email": "pixel@game.com", "password": "wrong"}
+        async with AsyncClient(transport=ASGITransport(app=limited_app), base_url="http://test") as c:
+            async def status(path, token, **kwargs):
+                c.cookies.set("snake_session", token)
+                return (await c.request("POST" if "login" in path else "GET", path, **kwargs)).status_code
+
+            logins = [await status("/api/auth/login", f"random-{i}", json=credentials) for i in range(3)]
+            assert logins == [200, 200, 429]
+            assert await status("/api/auth/login", "valid", json=credentials) == 429
+
+            assert [await status("/api/health", f"random-{i}") for i in range(3)] == [200, 200, 429]
+            assert [await status("/api/health", "valid") for _ in range(3)] == [200, 200, 429]
+
+    async def test_bucket_table_is_bounded(self):
+        """Test that idle buckets expire and the table never exceeds max_keys."""
+        from app.core.ratelimit import TokenBucketLimiter
+        limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=100)
+        for i in range(1000):
+            limiter.acquire(f"client-{i}", now=0.0)
+        assert len(limiter) == 100
+        assert limiter.acquire("client-999", now=0.0) > 0
+
+        for i in range(10):
+            limiter.acquire(f"late-{i}", now=60.0)
+        assert len(limiter) < 100
+
+@pytest.mark.asyncio
+class TestAdmin:
+    """Test admin endpoints."""
+
+    async def test_profile_requires_admin_token(self, client):
+        """Test admin endpoints are refused without a configured token."""
+        response = await client.post("/api/admin/profile/dump", headers={"X-Admin-Token": ""})
+        data = response.json()
+        assert data["success"] is False
+        assert data["error"] == "Not authorized"
+
+    async def test_export_scores_streams_ndjson_and_csv(self, client, monkeypatch):
+        """Test score export streams every row, honouring mode and date filters."""
+        import json
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        headers = {"X-Admin-Token": "secret"}
+
+        response = await client.get("/api/admin/scores/export", headers=headers)
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["score"] for row in rows] == [1250, 980]
+        assert rows[0]["username"] == "PixelMaster"
+
+        response = await client.get("/api/admin/scores/export?format=csv&mode=walls", headers=headers)
+        assert response.text.splitlines() == [
+            "id,user_id,username,score,mode,date",
+            f"{rows[0]['id']},1,PixelMaster,1250,walls,{rows[0]['date'].replace('T', ' ')}",
+        ]
+
+        response = await client.get("/api/admin/scores/export?since=2030-01-01T00:00:00", headers=headers)
+        assert response.text == ""
+
+        response = await client.get("/api/admin/scores/export")
+        assert response.json()["error"] == "Not authorized"
+
+    async def test_sampled_profile_dump(self, monkeypatch, tmp_path):
+        """Test sampled requests are broken down and dumped as collapsed stacks."""
+        from httpx import AsyncClient, ASGITransport
+        from app.core.config import settings
+        from app.core.profiling import ProfilingMiddleware
+        from app.main import app
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+        monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+        sampled_app = ProfilingMiddleware(app, sample_rate=1.0)
+
+        async with AsyncClient(transport=ASGITransport(app=sampled_app), base_url="http://test") as c:
+            await c.post("/api/auth/login", json={
+                "email": "pixel@game.com",
+                "password": "password123"
+            })
+            await c.get("/api/game/leaderboard")
+            response = await c.post("/api/admin/profile/dump", headers={"X-Admin-Token": "secret"})
+
+        data = response.json()
+        assert data["success"] is True
+        with open(data["data"]["path"]) as f:
+            stacks = dict(line.rsplit(" ", 1) for line in f.read().splitlines())
+        assert "POST /api/auth/login;service;bcrypt" in stacks
+        assert "GET /api/game/leaderboard;service" in stacks
+        assert "GET /api/game/leaderboard;serialization" in stacks
+
+
+@pytest.mark.asyncio
+class TestCompression:
+    """Test response compression."""
+
+    async def test_opted_in_routes_compressed_once(self):
+        """Test large opted-in responses are gzipped and identical bodies reuse the cache."""
+        from httpx import AsyncClient, ASGITransport
+        from app.core.compression import CompressionMiddleware
+        from app.main import app
+
+        compressed_app = CompressionMiddleware(app, paths={"/api/game/leaderboard"}, minimum_size=100)
+        async with AsyncClient(transport=ASGITransport(app=compressed_app), base_url="http://test") as c:
+            first = await c.get("/api/game/leaderboard", headers={"Accept-Encoding": "gzip"})
+            second = await c.get("/api/game/leaderboard", headers={"Accept-Encoding": "gzip"})
+            plain = await c.get("/api/game/leaderboard", headers={"Accept-Encoding": "identity"})
+            other = await c.get("/api/health", headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in first.headers["vary"]
+        assert first.json() == second.json() == plain.json()
+        assert "content-encoding" not in plain.headers
+        assert "content-encoding" not in other.headers
+        assert len(compressed_app.cache) == 1
+
+    async def test_small_responses_not_compressed(self):
+        """Test responses under the size threshold are sent as is."""
+        from httpx import AsyncClient, ASGITransport
+        from app.core.compression import CompressionMiddleware
+        from app.main import app
+
+        compressed_app = CompressionMiddleware(app, paths={"/api/game/leaderboard"}, minimum_size=1_000_000)
+        async with AsyncClient(transport=ASGITransport(app=compressed_app), base_url="http://test") as c:
+            response = await c.get("/api/game/leaderboard", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json()["success"] is True
+
+
+@pytest.mark.asyncio
+class TestSeed:
+    """Test synthetic data generation."""
+
+    async def test_seed_synthetic_consistent_rows(self, db_session):
+        """Test bulk seeding inserts users whose stats match their generated scores."""
+        from sqlalchemy import func, select
+        from app.models.sql import UserStats
+        from app.seed import seed_synthetic
+        from tests.conftest import engine
+
+        users, scores = await seed_synthetic(
+            engine, 250, scores_per_user=3, batch_size=100, tag="bulk", seed=1, progress=False
+        )
+
+        assert users == 250
+        assert await db_session.scalar(select(func.count()).select_from(User).where(User.username.like("bulk_%"))) == 250
+        assert await db_session.scalar(select(func.count()).select_from(Score).where(Score.username.like("bulk_%"))) == scores
+        played = await db_session.scalar(select(func.sum(User.games_played)).where(User.username.like("bulk_%")))
+        assert played == scores
+        user = (await db_session.execute(
+            select(User).where(User.games_played > 0, User.username.like("bulk_%"))
+        )).scalars().first()
+        best = await db_session.scalar(select(func.max(Score.score)).where(Score.user_id == user.id))
+        assert user.high_score == best
+        stats_games = await db_session.scalar(
+            select(func.sum(UserStats.games_played)).where(UserStats.user_id == user.id)
+        )
+        assert stats_games == user.games_played
+
+
+@pytest.mark.asyncio
+class TestRetention:
+    """Test the score retention job."""
+
+    async def test_archives_old_scores_outside_top_k_and_top_n(self, client, db_session):
+        """Test only old scores outside both the player's top K and the mode's top N move, and dry runs move nothing."""
+        import random
+        from datetime import timedelta
+        from sqlalchemy import func, select
+        from app.models.sql import ScoreArchive
+        from app.retention import run_retention
+        from tests.conftest import engine
+
+        rng = random.Random(7)
+        now = datetime(2025, 6, 1)
+        db_session.add_all(
+            Score(user_id=str(u), username=f"p{u}", score=rng.randint(0, 500), mode=rng.choice(["walls", "pass-through"]),
+                  date=now - timedelta(days=rng.randint(0, 60)))
+            for u in range(20) for _ in range(rng.randint(0, 15))
+        )
+        await db_session.commit()
+        rows = (await db_session.execute(select(Score.id, Score.user_id, Score.score, Score.mode, Score.date))).all()
+
+        def top(group, n):
+            return {r.id for r in sorted(group, key=lambda r: (-r.score, r.id))[:n]}
+        keep = {r.id for r in rows if r.date >= now - timedelta(days=30)}
+        for key in {r.user_id for r in rows}:
+            keep |= top([r for r in rows if r.user_id == key], 3)
+        for mode in ("walls", "pass-through"):
+            keep |= top([r for r in rows if r.mode == mode], 5)
+
+        args = dict(days=30, user_top_k=3, mode_top_n=5, batch_users=4, now=now, progress=False)
+        assert await run_retention(engine, dry_run=True, **args) == (len(rows) - len(keep), len(keep))
+        assert await db_session.scalar(select(func.count()).select_from(ScoreArchive)) == 0
+
+        assert await run_retention(engine, **args) == (len(rows) - len(keep), len(keep))
+        assert set((await db_session.execute(select(Score.id))).scalars()) == keep
+        archived = set((await db_session.execute(select(ScoreArchive.id))).scalars())
+        assert archived == {r.id for r in rows} - keep
+
+        # History still lists archived games
+        history = (await client.get("/api/players/5/history", params={"limit": 100})).json()["data"]
+        assert len(history) == sum(1 for r in rows if r.user_id == "5")
+
+        assert await run_retention(engine, **args) == (0, len(keep))
+
+    async def test_archived_score_ids_are_not_reused(self, client, db_session):
+        """Test archiving the newest score does not hand its id to the next one."""
+        from datetime import timedelta
+        from sqlalchemy import func, select
+        from app.models.sql import ScoreArchive
+        from app.retention import run_retention
+        from tests.conftest import engine
+
+        now = datetime(2025, 6, 1)
+        args = dict(days=30, user_top_k=1, mode_top_n=1, now=now, progress=False)
+
+        def old_score(points):
+            return Score(user_id="9", username="Retired", score=points, mode="walls", date=now - timedelta(days=60))
+        db_session.add_all([old_score(500), old_score(20)])
+        await db_session.commit()
+        await run_retention(engine, **args)
+        newest = await db_session.scalar(select(func.max(ScoreArchive.id)))
+        assert newest == await db_session.scalar(select(func.max(ScoreArchive.id)).where(ScoreArchive.score == 20))
+
+        db_session.add(old_score(10))
+        await db_session.commit()
+        assert await db_session.scalar(select(Score.id).where(Score.score == 10)) > newest
+        await run_retention(engine, **args)
+        history = (await client.get("/api/players/9/history", params={"limit": 100})).json()["data"]
+        assert len({game["id"] for game in history}) == len(history) == 3
+
+
+@pytest.mark.asyncio
+class TestSnapshot:
+    """Test warm-restart snapshots of in-memory state."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_state(self, monkeypatch):
+        from app.services import database as db
+        from app.utils import tokens
+        monkeypatch.setattr(db, "sessions", {})
+        monkeypatch.setattr(db, "active_players", [])
+        monkeypatch.setattr(db, "username_filter", None)
+        monkeypatch.setattr(db, "player_index", None)
+        monkeypatch.setattr(tokens, "revoked", {})
+
+    async def test_restore_round_trip(self, client, db_session, tmp_path, monkeypatch):
+        """Test sessions, live games and indexes survive a restart and catch up on later signups."""
+        import time
+        from app.services import database as db, snapshot
+        from app.utils import tokens
+        path = str(tmp_path / "state.snapshot")
+        # Several pieces per container
+        monkeypatch.setattr(snapshot, "_PIECE", 2)
+
+        await client.post("/api/auth/login", json={"email": "pixel@game.com", "password": "password123"})
+        await client.get("/api/players/search", params={"q": "pix"})
+        await client.get("/api/auth/username-available", params={"username": "Nobody"})
+        from app.models.domain import ActivePlayer
+        db.active_players.append(ActivePlayer(
+            id="1", username="PixelMaster", currentScore=30, mode=GameMode.WALLS,
+            gameState=db.generate_ai_game_state(), startedAt=datetime.now()
+        ))
+        tokens.revoked["sig"] = int(time.time()) + 60
+        tokens.revoked["expired"] = int(time.time()) - 1
+        before = (dict(db.sessions), [p.model_dump() for p in db.active_players])
+        # Bots are respawned on startup rather than restored
+        db.active_players.append(ActivePlayer(
+            id="bot-1", username="Bot", currentScore=30, mode=GameMode.WALLS,
+            gameState=db.generate_ai_game_state(), startedAt=datetime.now()
+        ))
+        assert snapshot.save(path) > 0
+
+        # Restart: in-memory state is gone, and someone signs up elsewhere meanwhile
+        monkeypatch.setattr(db, "sessions", {})
+        monkeypatch.setattr(db, "active_players", [])
+        monkeypatch.setattr(db, "username_filter", None)
+        monkeypatch.setattr(db, "player_index", None)
+        monkeypatch.setattr(tokens, "revoked", {})
+        db_session.add(User(id='3', username='PixelPioneer', email='pioneer@game.com', password='x',
+                            high_score=40, games_played=1, created_at=datetime.now()))
+        await db_session.commit()
+
+        assert await snapshot.restore(db_session, path, max_age=60)
+        assert (db.sessions, [p.model_dump() for p in db.active_players]) == before
+        assert set(tokens.revoked) == {"sig"}
+        assert "PixelPioneer" in db.username_filter
+        assert [m.username for m in await db.search_players(db_session, "pix")] == ["PixelMaster", "PixelPioneer"]
+        me = await client.get("/api/auth/me")
+        assert me.json()["data"]["username"] == "PixelMaster"
+
+    async def test_stale_or_incompatible_snapshots(self, client, db_session, tmp_path):
+        """Test old snapshots restore only sessions and other format versions are ignored."""
+        from app.services import database as db, snapshot
+        path = str(tmp_path / "state.snapshot")
+        db.sessions["token"] = "1"
+        await client.get("/api/players/search", params={"q": "pix"})
+        snapshot.save(path)
+        db.sessions.clear()
+        db.player_index = None
+
+        assert await snapshot.restore(db_session, path, max_age=-1)
+        assert db.sessions == {"token": "1"}
+        assert db.player_index is None
+
+        with open(path, "r+b") as f:
+            f.seek(4)
+            f.write((snapshot.FORMAT_VERSION + 1).to_bytes(2, "little"))
+        assert snapshot.load(path) is None
+        assert snapshot.load(str(tmp_path / "missing")) is None
+
+        size = snapshot.save(path)
+        with open(path, "r+b") as f:
+            f.truncate(size - 1)
+        assert snapshot.load(path) is None
+
+    async def test_concurrent_writers(self, tmp_path):
+        """Test concurrent saves to one path never tear the file or leave temp files, and only the owner can read it."""
+        import os
+        from concurrent.futures import ThreadPoolExecutor
+        from app.services import database as db, snapshot
+        db.sessions.update((f"token-{n}", str(n)) for n in range(20_000))
+        path = str(tmp_path / "state.snapshot")
+
+        with ThreadPoolExecutor(4) as pool:
+            sizes = list(pool.map(lambda _: snapshot.save(path), range(8)))
+        assert len(set(sizes)) == 1
+        assert snapshot.load(path)["sessions"] == db.sessions
+        assert os.listdir(tmp_path) == ["state.snapshot"]
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+@pytest.mark.asyncio
+class TestStatic:
+    """Test in-memory SPA serving."""
+
+    async def test_precompressed_assets_and_revalidation(self, tmp_path):
+        """Test encoding negotiation, cache headers, ETag revalidation and SPA fallback."""
+        from fastapi import FastAPI
+        from httpx import AsyncClient, ASGITransport
+        from app.core.static import mount_spa
+
+        (tmp_path / "assets").mkdir()
+        (tmp_path / "index.html").write_text("<html><body>" + "snake " * 200 + "</body></html>")
+        (tmp_path / "assets" / "index-abc123.js").write_text("console.log('snake');" * 100)
+        spa_app = FastAPI()
+        mount_spa(spa_app, str(tmp_path), "/api")
+
+        async with AsyncClient(transport=ASGITransport(app=spa_app), base_url="http://test") as c:
+            asset = await c.get("/assets/index-abc123.js", headers={"Accept-Encoding": "gzip"})
+            assert asset.headers["content-encoding"] == "gzip"
+            assert "immutable" in asset.headers["cache-control"]
+            assert asset.text == "console.log('snake');" * 100
+
+            plain = await c.get("/assets/index-abc123.js", headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in plain.headers
+            assert plain.headers["etag"] != asset.headers["etag"]
+
+            shell = await c.get("/leaderboard", headers={"Accept-Encoding": "gzip"})
+            assert shell.headers["cache-control"] == "no-cache"
+            assert "snake" in shell.text
+
+            revalidated = await c.get("/", headers={
+                "Accept-Encoding": "gzip",
+                "If-None-Match": shell.headers["etag"]
+            })
+            assert revalidated.status_code == 304
+            assert revalidated.content == b""
+
+            missing = await c.get("/assets/missing.js")
+            assert missing.status_code == 404
+
+    async def test_missing_index_is_not_found(self, tmp_path):
+        """Test a build without index.html answers SPA paths with 404 rather than failing."""
+        from fastapi import FastAPI
+        from httpx import AsyncClient, ASGITransport
+        from app.core.static import mount_spa
+
+        (tmp_path / "robots.txt").write_text("User-agent: *")
+        spa_app = FastAPI()
+        mount_spa(spa_app, str(tmp_path), "/api")
+
+        async with AsyncClient(transport=ASGITransport(app=spa_app), base_url="http://test") as c:
+            assert (await c.get("/robots.txt")).status_code == 200
+            assert (await c.get("/")).status_code == 404
+            assert (await c.get("/leaderboard")).status_code == 404
+
+
+class TestStartup:
+    """Test application startup cost."""
+
+    def test_import_defers_heavy_modules(self):
+        """Test that importing the app does not build the engine or hashing context."""
+        import subprocess
+        import sys
+        code = (
+            "import sys, app.main; "
+            "print(','.join(m for m in ('passlib', 'aiosqlite', 'asyncpg') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ""